@@ -16,7 +16,14 @@ sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 # sys.path.insert(0, dirname(dirname(dirname(abspath(__file__)))))
 
 from src.infrastructure.persistence.db import Base
-from src.infrastructure.persistence.db.schema import Order, OrderItem, OutboxMessage  # noqa: F401
+from src.infrastructure.persistence.db.schema import (  # noqa: F401
+    Order,
+    OrderItem,
+    OrderArchive,
+    OrderItemArchive,
+    IdempotencyKey,
+    OutboxMessage,
+)
 import os
 
 # this is the Alembic Config object, which provides
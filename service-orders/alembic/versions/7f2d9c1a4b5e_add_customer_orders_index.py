@@ -0,0 +1,41 @@
+"""add customer orders index
+
+Revision ID: 7f2d9c1a4b5e
+Revises: 3c7457de4f26
+Create Date: 2026-10-19 10:12:41.520318
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7f2d9c1a4b5e'
+down_revision: Union[str, Sequence[str], None] = '3c7457de4f26'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY не блокирует запись в orders, но не работает внутри транзакции
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_orders_customer_id_created_at_id',
+            'orders',
+            ['customer_id', 'created_at', 'id'],
+            unique=False,
+            postgresql_include=['status'],
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_orders_customer_id_created_at_id',
+            table_name='orders',
+            postgresql_concurrently=True,
+        )
@@ -0,0 +1,79 @@
+"""add orders archive partitions
+
+Revision ID: a91e4c27d3f8
+Revises: 7f2d9c1a4b5e
+Create Date: 2026-10-19 11:03:27.804162
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a91e4c27d3f8'
+down_revision: Union[str, Sequence[str], None] = '7f2d9c1a4b5e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('orders_archive',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('customer_id', sa.String(), nullable=False),
+    sa.Column('status', postgresql.ENUM(name='orderstatus', create_type=False), nullable=False),
+    sa.Column('order_amount', sa.Numeric(precision=10, scale=2), nullable=False),
+    sa.Column('archived_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id', 'created_at'),
+    postgresql_partition_by='RANGE (created_at)'
+    )
+    op.create_index('ix_orders_archive_customer_id_created_at', 'orders_archive', ['customer_id', 'created_at'], unique=False)
+    op.create_table('order_items_archive',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('order_id', sa.UUID(), nullable=False),
+    sa.Column('product_id', sa.String(), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.Column('price', sa.String(), nullable=False),
+    sa.PrimaryKeyConstraint('id', 'created_at'),
+    postgresql_partition_by='RANGE (created_at)'
+    )
+    op.create_index(op.f('ix_order_items_archive_order_id'), 'order_items_archive', ['order_id'], unique=False)
+
+    # Помесячные секции создает архиватор; DEFAULT страхует от вставки вне диапазона
+    op.execute('CREATE TABLE orders_archive_default PARTITION OF orders_archive DEFAULT')
+    op.execute('CREATE TABLE order_items_archive_default PARTITION OF order_items_archive DEFAULT')
+
+    with op.get_context().autocommit_block():
+        # Без индекса по FK каждое удаление из orders сканирует order_items целиком
+        op.create_index(
+            op.f('ix_order_items_order_id'),
+            'order_items',
+            ['order_id'],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_orders_terminal_created_at',
+            'orders',
+            ['created_at'],
+            unique=False,
+            postgresql_where=sa.text("status IN ('COMPLETED', 'FAILED', 'CANCELLED')"),
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_orders_terminal_created_at', table_name='orders', postgresql_concurrently=True)
+        op.drop_index(op.f('ix_order_items_order_id'), table_name='order_items', postgresql_concurrently=True)
+
+    op.drop_index(op.f('ix_order_items_archive_order_id'), table_name='order_items_archive')
+    op.drop_table('order_items_archive')
+    op.drop_index('ix_orders_archive_customer_id_created_at', table_name='orders_archive')
+    op.drop_table('orders_archive')
@@ -0,0 +1,40 @@
+"""add orders export index
+
+Revision ID: b3d6e8f21c47
+Revises: e2a4f7c90b13
+Create Date: 2026-10-19 12:41:08.203715
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3d6e8f21c47'
+down_revision: Union[str, Sequence[str], None] = 'e2a4f7c90b13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY не блокирует запись в orders, но не работает внутри транзакции
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_orders_created_at_id',
+            'orders',
+            ['created_at', 'id'],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_orders_created_at_id',
+            table_name='orders',
+            postgresql_concurrently=True,
+        )
@@ -0,0 +1,46 @@
+"""add idempotency keys
+
+Revision ID: c5b8e13f6a20
+Revises: a91e4c27d3f8
+Create Date: 2026-10-19 15:03:27.184602
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5b8e13f6a20'
+down_revision: Union[str, Sequence[str], None] = 'a91e4c27d3f8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'idempotency_keys',
+        sa.Column('user_id', sa.String(length=255), nullable=False),
+        sa.Column('key', sa.String(length=255), nullable=False),
+        sa.Column('request_hash', sa.String(length=64), nullable=False),
+        sa.Column('order_id', sa.UUID(), nullable=True),
+        sa.Column('order_status', postgresql.ENUM(name='orderstatus', create_type=False), nullable=True),
+        sa.Column('order_created_at', sa.DateTime(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('user_id', 'key'),
+    )
+    op.create_index(
+        op.f('ix_idempotency_keys_created_at'),
+        'idempotency_keys',
+        ['created_at'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_idempotency_keys_created_at'), table_name='idempotency_keys')
+    op.drop_table('idempotency_keys')
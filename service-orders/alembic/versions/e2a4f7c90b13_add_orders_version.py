@@ -0,0 +1,32 @@
+"""add orders version
+
+Revision ID: e2a4f7c90b13
+Revises: c5b8e13f6a20
+Create Date: 2026-10-19 18:22:05.417930
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2a4f7c90b13'
+down_revision: Union[str, Sequence[str], None] = 'c5b8e13f6a20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Константный DEFAULT не переписывает таблицу (PostgreSQL 11+)
+    op.add_column(
+        'orders',
+        sa.Column('version', sa.Integer(), server_default=sa.text('1'), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('orders', 'version')
@@ -0,0 +1,88 @@
+"""
+Микробенчмарк накладных расходов DI на один запрос new_order/get_order_status.
+
+Сравнивает разрешение зависимости Provide[Container.usecase.order_usecase]:
+  * factory   - прежняя схема: на каждый запрос новый OrderUseCase и
+                неиспользуемый OrderRepository с новой AsyncSession
+  * singleton - текущая схема: один OrderUseCase на процесс
+
+БД и брокер не нужны: сессии и engine создаются, но соединения не открываются.
+Запуск из каталога service-orders:
+
+    python -m benchmarks.bench_di_overhead --requests 200000
+"""
+
+import argparse
+import gc
+import time
+
+from dependency_injector import providers
+
+from src.container import Container
+from src.infrastructure.persistence.repositories.orders import OrderRepository
+from src.settings import settings
+from src.usecase.orders.orders_usecase import OrderUseCase
+
+
+def legacy_usecase_provider(container: Container) -> providers.Factory:
+    """
+    Граф зависимостей usecase в том виде, каким он был до перехода на Singleton.
+    """
+    infrastructure = container.infrastructure
+    session_factory = providers.Factory(
+        lambda db: db.session_factory(),
+        db=infrastructure.db,
+    )
+    order_repository = providers.Factory(
+        OrderRepository,
+        session=session_factory,
+    )
+    return providers.Factory(
+        lambda repository, **kwargs: OrderUseCase(**kwargs),
+        repository=order_repository,
+        uow=infrastructure.uow,
+        rabbitmq_client=infrastructure.rabbitmq_client,
+        status_hub=infrastructure.order_status_hub,
+        idempotency_cache=infrastructure.idempotency_cache,
+        rate_limiter=infrastructure.order_rate_limiter,
+        replica_staleness_seconds=settings.DB_REPLICA_STALENESS_SECONDS,
+    )
+
+
+def measure(provider, requests: int) -> float:
+    """
+    Среднее время разрешения зависимости на запрос, мкс (с учетом сборки мусора).
+    """
+    gc.collect()
+    started = time.perf_counter()
+    for _ in range(requests):
+        provider()
+    gc.collect()
+    return (time.perf_counter() - started) / requests * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200000)
+    args = parser.parse_args()
+
+    container = Container()
+    container.config.from_pydantic(settings)
+
+    providers_to_compare = (
+        ("factory", legacy_usecase_provider(container)),
+        ("singleton", container.usecase.order_usecase),
+    )
+
+    # Прогрев: engine, пулы и singleton-ы инфраструктуры создаются один раз
+    for _, provider in providers_to_compare:
+        measure(provider, 1000)
+
+    results = {name: measure(provider, args.requests) for name, provider in providers_to_compare}
+    for name, per_request in results.items():
+        print(f"{name:<10} {per_request:>8.2f} us/request")
+    print(f"{'saved':<10} {results['factory'] - results['singleton']:>8.2f} us/request")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Бенчмарк масштабирования API по числу воркеров gunicorn.
+
+Для каждого значения --workers поднимает gunicorn -c gunicorn.conf.py с
+APP_ROLE=api и WEB_CONCURRENCY=N, дает нагрузку на
+GET /api/v1/orders/{id}/status и печатает запросы/сек и долю ошибок.
+
+Нужны поднятые БД (с примененными миграциями) и RabbitMQ service-orders.
+Бенчмарк создает --orders тестовых заказов через POST /api/v1/orders/new/.
+Генератор нагрузки - отдельный процесс на той же машине: для честных цифр
+ему нужны свободные ядра, иначе он сам становится узким местом.
+Запуск из каталога service-orders:
+
+    python -m benchmarks.bench_http_workers --workers 1 2 4 8 --duration 20 --concurrency 64
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import signal
+import subprocess
+import sys
+import time
+
+import httpx
+
+BASE_URL = "http://127.0.0.1:{port}/api/v1"
+
+
+def start_server(workers: int, port: int) -> subprocess.Popen:
+    env = dict(
+        os.environ,
+        APP_ROLE="api",
+        WEB_CONCURRENCY=str(workers),
+        API_PORT=str(port),
+        ADMISSION_ENABLED="false",
+        ORDER_RATE_LIMIT_PER_SECOND="0",
+    )
+    return subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "src.asgi:app"],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+
+def stop_server(server: subprocess.Popen) -> None:
+    server.send_signal(signal.SIGTERM)
+    try:
+        server.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        server.kill()
+
+
+async def wait_ready(client: httpx.AsyncClient, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            await client.get("/openapi.json")
+            return
+        except httpx.TransportError:
+            await asyncio.sleep(0.5)
+    raise RuntimeError("gunicorn did not start in %s seconds" % timeout)
+
+
+async def seed_orders(client: httpx.AsyncClient, count: int) -> list[str]:
+    order_ids = []
+    for i in range(count):
+        response = await client.post("/orders/new/", json={
+            "user_id": f"bench_user_{i % 50}",
+            "products": [{"product_id": "bench_product", "quantity": 1}],
+            "amount": "10.00",
+        })
+        response.raise_for_status()
+        order_ids.append(response.json()["id"])
+    return order_ids
+
+
+async def load(client: httpx.AsyncClient, order_ids: list[str], duration: float, concurrency: int) -> tuple[float, float]:
+    done = 0
+    failed = 0
+    deadline = time.monotonic() + duration
+
+    async def worker():
+        nonlocal done, failed
+        while time.monotonic() < deadline:
+            try:
+                response = await client.get(f"/orders/{random.choice(order_ids)}/status")
+                failed += response.status_code != 200
+            except httpx.TransportError:
+                failed += 1
+            done += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return done / elapsed, failed / max(done, 1)
+
+
+async def bench(workers: int, args: argparse.Namespace) -> tuple[float, float]:
+    server = start_server(workers, args.port)
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    try:
+        async with httpx.AsyncClient(base_url=BASE_URL.format(port=args.port), limits=limits) as client:
+            await wait_ready(client)
+            order_ids = await seed_orders(client, args.orders)
+            # Прогрев: пулы соединений всех воркеров и кеш скомпилированных запросов
+            await load(client, order_ids, 3.0, args.concurrency)
+            return await load(client, order_ids, args.duration, args.concurrency)
+    finally:
+        stop_server(server)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--orders", type=int, default=200)
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--port", type=int, default=8100)
+    args = parser.parse_args()
+
+    baseline = None
+    print(f"{'workers':>8} {'req/s':>10} {'scaling':>8} {'errors':>7}")
+    for workers in args.workers:
+        rps, error_rate = await bench(workers, args)
+        baseline = baseline or rps
+        print(f"{workers:>8} {rps:>10.0f} {rps / baseline:>7.2f}x {error_rate:>6.1%}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,108 @@
+"""
+Бенчмарк сериализации ответа order endpoints.
+
+Сравнивает два способа отдать Order:
+  * response_model - handler собирает OrderResponse, FastAPI валидирует его
+                     по response_model и кодирует в JSON
+  * adapter        - handler возвращает OrderJSONResponse: предкомпилированный
+                     TypeAdapter кодирует dataclass Order сразу в bytes
+
+Меряется полный проход запроса через ASGI приложение FastAPI (без сети и
+без БД: usecase заменен константой), чтобы учесть накладные расходы
+роутинга и разница была видна на фоне всего запроса.
+Запуск из каталога service-orders:
+
+    python -m benchmarks.bench_order_serialization --requests 20000
+"""
+
+import argparse
+import asyncio
+import time
+from datetime import datetime
+from uuid import uuid4
+
+import fastapi
+
+from src.api.handlers.orders.responses import OrderJSONResponse
+from src.api.schemas.response_schemas.schemas import OrderResponse
+from src.entity.orders import Order, OrderId, OrderStatus
+
+ORDER = Order(id=OrderId(uuid4()), status=OrderStatus.IN_PROGRESS, created_at=datetime.utcnow())
+
+
+def create_bench_app() -> fastapi.FastAPI:
+    app = fastapi.FastAPI()
+
+    @app.get("/response_model/{order_id}", response_model=OrderResponse)
+    async def response_model_status(order_id: str):
+        return OrderResponse(id=ORDER.id, status=ORDER.status, created_at=ORDER.created_at)
+
+    @app.get("/adapter/{order_id}", response_model=OrderResponse, response_class=OrderJSONResponse)
+    async def adapter_status(order_id: str):
+        return OrderJSONResponse(ORDER)
+
+    return app
+
+
+async def call(app: fastapi.FastAPI, path: str) -> bytes:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"bench")],
+        "server": ("bench", 80),
+        "client": ("bench", 1),
+    }
+    body = b""
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal body
+        if message["type"] == "http.response.body":
+            body += message.get("body", b"")
+
+    await app(scope, receive, send)
+    return body
+
+
+async def measure(app: fastapi.FastAPI, path: str, requests: int) -> float:
+    """
+    Среднее время запроса, мкс.
+    """
+    started = time.perf_counter()
+    for _ in range(requests):
+        await call(app, path)
+    return (time.perf_counter() - started) / requests * 1e6
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20000)
+    args = parser.parse_args()
+
+    app = create_bench_app()
+    paths = {name: f"/{name}/{ORDER.id}" for name in ("response_model", "adapter")}
+
+    bodies = {name: await call(app, path) for name, path in paths.items()}
+    assert bodies["response_model"] == bodies["adapter"], bodies
+
+    # Прогрев кешей роутинга и сериализаторов
+    for path in paths.values():
+        await measure(app, path, 1000)
+
+    results = {name: await measure(app, path, args.requests) for name, path in paths.items()}
+    for name, per_request in results.items():
+        print(f"{name:<15} {per_request:>8.2f} us/request")
+    print(f"{'saved':<15} {results['response_model'] - results['adapter']:>8.2f} us/request")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,95 @@
+"""
+Бенчмарк чтения статуса заказа: ORM путь против core-проекции.
+
+Сравнивает запросы/сек для:
+  * orm        - select(OrderModel) + гидратация модели + _to_entity
+  * projection - OrderRepository.get_order_by_id (id, status, created_at строкой)
+
+Нужна поднятая БД service-orders с примененными миграциями (make migrate).
+Бенчмарк создает --orders тестовых заказов клиентов bench_user_*.
+Запуск из каталога service-orders:
+
+    python -m benchmarks.bench_order_status_read --orders 1000 --requests 20000 --concurrency 20
+"""
+
+import argparse
+import asyncio
+import random
+import time
+
+from sqlalchemy import select
+
+from src.entity.orders import CreateOrder
+from src.infrastructure.container import get_db_url
+from src.infrastructure.persistence.db import Database
+from src.infrastructure.persistence.db.schema import Order as OrderModel
+from src.infrastructure.persistence.repositories.orders import OrderRepository
+from src.settings import settings
+
+
+async def seed_orders(db: Database, count: int) -> list:
+    order_ids = []
+    async with db.connection() as session:
+        repository = OrderRepository(session, auto_commit=False)
+        for i in range(count):
+            order = await repository.create_order(
+                CreateOrder(
+                    user_id=f"bench_user_{i % 50}",
+                    products=[{"product_id": "bench_product", "quantity": 1}],
+                    amount="10.00",
+                )
+            )
+            order_ids.append(order.id)
+        await session.commit()
+    return order_ids
+
+
+async def orm_lookup(session, order_id):
+    result = await session.execute(select(OrderModel).where(OrderModel.id == order_id))
+    return OrderRepository._to_entity(result.scalar_one())
+
+
+async def projection_lookup(session, order_id):
+    return await OrderRepository(session).get_order_by_id(order_id)
+
+
+async def run(db: Database, lookup, order_ids: list, requests: int, concurrency: int) -> float:
+    per_worker = requests // concurrency
+
+    async def worker():
+        for _ in range(per_worker):
+            async with db.connection() as session:
+                await lookup(session, random.choice(order_ids))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return per_worker * concurrency / (time.perf_counter() - started)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--orders", type=int, default=1000)
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+
+    db = Database(get_db_url(
+        settings.DB_USER, settings.DB_PASS, settings.DB_HOST, settings.DB_PORT, settings.DB_NAME
+    ))
+    db.engine.echo = False
+
+    order_ids = await seed_orders(db, args.orders)
+
+    # Прогрев пула соединений и кеша скомпилированных запросов
+    await run(db, projection_lookup, order_ids, args.concurrency * 10, args.concurrency)
+    await run(db, orm_lookup, order_ids, args.concurrency * 10, args.concurrency)
+
+    for name, lookup in (("orm", orm_lookup), ("projection", projection_lookup)):
+        rps = await run(db, lookup, order_ids, args.requests, args.concurrency)
+        print(f"{name:<12} {rps:>10.0f} req/s")
+
+    await db.engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,31 @@
+"""
+Production профиль gunicorn для API роли service-orders.
+
+    gunicorn -c gunicorn.conf.py src.asgi:app
+
+Число воркеров задается WEB_CONCURRENCY (по умолчанию - число CPU). Приложение
+загружается в мастере до fork (импорт модулей, сборка контейнера, роутинг),
+а пулы соединений БД и подключение к RabbitMQ каждый воркер создает сам:
+в post_fork и в lifespan. DB_POOL_SIZE и DB_MAX_OVERFLOW - общий бюджет
+соединений API роли, он делится поровну между воркерами.
+"""
+import multiprocessing
+import os
+
+# До загрузки приложения, чтобы Settings увидели итоговое число воркеров
+os.environ.setdefault("WEB_CONCURRENCY", str(multiprocessing.cpu_count()))
+
+bind = f"{os.getenv('API_HOST', '0.0.0.0')}:{os.getenv('API_PORT', '8000')}"
+workers = int(os.environ["WEB_CONCURRENCY"])
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+graceful_timeout = 30
+timeout = 60
+keepalive = 5
+
+
+def post_fork(server, worker):
+    from src.asgi import app
+    from src.main import reset_worker_resources
+
+    reset_worker_resources(app.container)
@@ -0,0 +1,41 @@
+"""
+Скрипт для запуска service-orders в выбранной роли.
+
+    python run.py --role api        # HTTP API
+    python run.py --role relay      # публикация outbox, очистка ключей, архивация
+    python run.py --role consumer   # обработка событий order.processed
+    python run.py --role all        # все в одном процессе
+
+Без --role используется APP_ROLE из настроек.
+"""
+import argparse
+import asyncio
+import os
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="service-orders")
+    parser.add_argument(
+        "--role",
+        choices=["api", "relay", "consumer", "all"],
+        help="Роль процесса (по умолчанию APP_ROLE)",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.role:
+        # До импорта src.settings, чтобы роль увидели и дочерние процессы uvicorn
+        os.environ["APP_ROLE"] = args.role
+
+    from src.settings import AppRole, settings
+
+    if settings.APP_ROLE in (AppRole.API, AppRole.ALL):
+        import uvicorn
+
+        uvicorn.run("src.asgi:app", host=settings.API_HOST, port=settings.API_PORT)
+    else:
+        from src.main import run_worker
+
+        asyncio.run(run_worker(settings.APP_ROLE))
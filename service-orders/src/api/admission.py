@@ -0,0 +1,89 @@
+"""
+Admission control для API: ограничение одновременных запросов на маршрут.
+
+Лимиты адаптируются по сигналам перегрузки (ожидание пула БД и лаг event
+loop), лишние запросы сразу получают 503 с Retry-After вместо того, чтобы
+ждать в очереди пула соединений.
+"""
+
+from collections.abc import Collection, Sequence
+
+from starlette.responses import JSONResponse
+from starlette.routing import BaseRoute, Match
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from src.infrastructure.admission.limits import AdaptiveConcurrencyLimit
+from src.infrastructure.admission.load_monitor import LoadMonitor
+
+
+class AdmissionControlMiddleware:
+    """
+    Чистый ASGI middleware: не буферизует тело и не ломает streaming ответы.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        routes: Sequence[BaseRoute],
+        load_monitor: LoadMonitor,
+        initial_limit: int = 64,
+        min_limit: int = 4,
+        max_limit: int = 512,
+        pool_wait_target: float = 0.05,
+        loop_lag_target: float = 0.1,
+        retry_after: int = 1,
+        exempt_routes: Collection[str] = ()
+    ) -> None:
+        self.app = app
+        self._load_monitor = load_monitor
+        self._pool_wait_target = pool_wait_target
+        self._loop_lag_target = loop_lag_target
+        self._retry_after = retry_after
+        # Долгоживущие подключения (SSE, long-poll) не держат соединение с БД
+        self._routes = [route for route in routes if getattr(route, "name", None) not in exempt_routes]
+        self.limits: dict[str, AdaptiveConcurrencyLimit] = {
+            route.name: AdaptiveConcurrencyLimit(
+                initial_limit=initial_limit,
+                min_limit=min_limit,
+                max_limit=max_limit,
+            )
+            for route in self._routes
+        }
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        limit = self._match_limit(scope)
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+
+        if not limit.try_acquire():
+            response = JSONResponse(
+                {"detail": "Service is overloaded, retry later"},
+                status_code=503,
+                headers={"Retry-After": str(self._retry_after)},
+            )
+            await response(scope, receive, send)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limit.release(overloaded=self._overloaded())
+
+    def _match_limit(self, scope: Scope) -> AdaptiveConcurrencyLimit | None:
+        for route in self._routes:
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                return self.limits[route.name]
+        return None
+
+    def _overloaded(self) -> bool:
+        return (
+            self._load_monitor.pool_wait > self._pool_wait_target
+            or self._load_monitor.loop_lag > self._loop_lag_target
+        )
@@ -0,0 +1,124 @@
+"""
+Сериализация потоковой выгрузки заказов в NDJSON и CSV.
+
+Строки копятся в буфере и отдаются кусками по ~64 КБ, чтобы не делать
+отдельную запись в сокет на каждый заказ. Статус 200 уже отправлен, поэтому
+ошибка посреди выгрузки отмечается последней строкой (EXPORT_ERROR_MARKER),
+чтобы клиент отличил обрезанный файл от полного.
+"""
+
+import csv
+import io
+import json
+from collections.abc import AsyncIterator
+from datetime import datetime, timezone
+from enum import Enum
+
+from src.entity.orders import OrderExport
+from src.exceptions import AppError
+from src.logger import logger
+
+FLUSH_THRESHOLD_BYTES = 64 * 1024
+
+EXPORT_ERROR_MARKER = "export_interrupted"
+
+CSV_HEADER = (
+    "order_id",
+    "customer_id",
+    "status",
+    "order_amount",
+    "created_at",
+    "product_id",
+    "quantity",
+    "price",
+)
+
+
+class ExportFormat(str, Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+    @property
+    def media_type(self) -> str:
+        if self is ExportFormat.CSV:
+            return "text/csv"
+        return "application/x-ndjson"
+
+
+def to_naive_utc(value: datetime | None) -> datetime | None:
+    """
+    created_at хранится как naive UTC. Время с часовым поясом ("...Z",
+    "+03:00") приводится к UTC до старта потока: иначе asyncpg отклонит
+    сравнение уже после отправки статуса 200.
+    """
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def _write_ndjson(buffer: io.StringIO, order: OrderExport) -> None:
+    buffer.write(json.dumps({
+        "id": str(order.id),
+        "customer_id": order.customer_id,
+        "status": order.status.value,
+        "order_amount": str(order.amount),
+        "created_at": order.created_at.isoformat(),
+        "items": [
+            {
+                "product_id": item.product_id,
+                "quantity": item.quantity,
+                "price": item.price,
+            }
+            for item in order.items
+        ],
+    }))
+    buffer.write("\n")
+
+
+def _csv_rows(order: OrderExport) -> list[tuple]:
+    head = (
+        str(order.id),
+        order.customer_id,
+        order.status.value,
+        str(order.amount),
+        order.created_at.isoformat(),
+    )
+    if not order.items:
+        return [head + ("", "", "")]
+    return [head + (item.product_id, item.quantity, item.price) for item in order.items]
+
+
+async def serialize_orders(
+    orders: AsyncIterator[OrderExport],
+    export_format: ExportFormat,
+) -> AsyncIterator[bytes]:
+    """
+    Превращает поток заказов в поток байтов выбранного формата.
+    """
+    buffer = io.StringIO()
+    csv_writer = csv.writer(buffer)
+
+    if export_format is ExportFormat.CSV:
+        csv_writer.writerow(CSV_HEADER)
+
+    try:
+        async for order in orders:
+            if export_format is ExportFormat.CSV:
+                csv_writer.writerows(_csv_rows(order))
+            else:
+                _write_ndjson(buffer, order)
+
+            if buffer.tell() >= FLUSH_THRESHOLD_BYTES:
+                yield buffer.getvalue().encode()
+                buffer.seek(0)
+                buffer.truncate()
+    except AppError as e:
+        logger.error("Order export interrupted: %s", e, exc_info=True)
+        if export_format is ExportFormat.CSV:
+            csv_writer.writerow((f"#{EXPORT_ERROR_MARKER}", str(e)))
+        else:
+            buffer.write(json.dumps({"error": EXPORT_ERROR_MARKER, "message": str(e)}))
+            buffer.write("\n")
+
+    if buffer.tell():
+        yield buffer.getvalue().encode()
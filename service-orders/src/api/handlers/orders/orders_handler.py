@@ -1,13 +1,39 @@
+import json
+import math
+from datetime import datetime
 from uuid import UUID
 from dependency_injector.wiring import Provide, inject
-from fastapi import APIRouter, Depends, status, HTTPException, Path
+from fastapi import APIRouter, Depends, status, HTTPException, Header, Path, Query
+from fastapi.responses import Response, StreamingResponse
+from starlette.background import BackgroundTask
 
 from src.container import Container
-from src.api.schemas.response_schemas.schemas import OrderResponse
-from src.api.schemas.request_schemas.schemas import CreateNewOrder
+from src.settings import settings
+from src.infrastructure.messaging.status_hub import StatusSubscription
+from src.api.handlers.orders.export import ExportFormat, serialize_orders, to_naive_utc
+from src.api.handlers.orders.responses import (
+    OrderJSONResponse,
+    OrdersPageJSONResponse,
+    etag_matches,
+    order_etag,
+)
+from src.api.schemas.response_schemas.schemas import (
+    OrderListResponse,
+    OrderResponse,
+    OrderStatusBatchResponse,
+)
+from src.api.schemas.request_schemas.schemas import CreateNewOrder, OrderStatusBatchRequest
 from src.usecase.orders.orders_usecase import OrderUseCase
-from src.entity.orders import CreateOrder, OrderId
-from src.exceptions import OrderNotFoundError, OrderCreationError, RepositoryError, AppError
+from src.entity.orders import CreateOrder, Order, OrderId, OrderStatus, TERMINAL_ORDER_STATUSES
+from src.exceptions import (
+    OrderNotFoundError,
+    OrderCreationError,
+    IdempotencyKeyConflictError,
+    RateLimitExceededError,
+    InvalidCursorError,
+    RepositoryError,
+    AppError,
+)
 
 router = APIRouter(
     prefix="/api/v1",
@@ -17,11 +43,19 @@ router = APIRouter(
 @router.post(
     "/orders/new/",
     response_model=OrderResponse,
+    response_class=OrderJSONResponse,
     status_code=status.HTTP_201_CREATED
 )
 @inject
 async def new_order(
         body: CreateNewOrder,
+        idempotency_key: str | None = Header(
+            None,
+            alias="Idempotency-Key",
+            min_length=1,
+            max_length=255,
+            description="Ключ идемпотентности: повтор запроса вернет уже созданный заказ"
+        ),
         uc: OrderUseCase = Depends(Provide[Container.usecase.order_usecase])
 ):
     """
@@ -34,8 +68,19 @@ async def new_order(
     )
 
     try:
-        result = await uc.create_order(payload)
-        return result
+        result = await uc.create_order(payload, idempotency_key=idempotency_key)
+        return OrderJSONResponse(result, status_code=status.HTTP_201_CREATED)
+    except RateLimitExceededError as e:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=str(e),
+            headers={"Retry-After": str(math.ceil(e.retry_after))}
+        ) from e
+    except IdempotencyKeyConflictError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        ) from e
     except OrderCreationError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -51,22 +96,35 @@ async def new_order(
 @router.get(
     "/orders/{order_id}/status",
     response_model=OrderResponse,
+    response_class=OrderJSONResponse,
     status_code=status.HTTP_200_OK
 )
 @inject
 async def get_order_status(
         order_id: UUID = Path(..., description="ID заказа"),
+        if_none_match: str | None = Header(
+            None,
+            alias="If-None-Match",
+            description="ETag из предыдущего ответа: 304, если статус не изменился"
+        ),
         uc: OrderUseCase = Depends(Provide[Container.usecase.order_usecase])
 ):
     """
-    Endpoint для получения статуса заказа по ID
+    Endpoint для получения статуса заказа по ID с поддержкой ETag
     """
+    if if_none_match:
+        # Поллинг без изменений обслуживается из кэша, без запроса в БД
+        cached = uc.get_cached_order_status(OrderId(order_id))
+        if cached is not None and etag_matches(if_none_match, order_etag(cached)):
+            return _not_modified(cached)
+
     try:
         order = await uc.get_order_status(OrderId(order_id))
-        return OrderResponse(
-            id=order.id,
-            status=order.status,
-            created_at=order.created_at
+        if if_none_match and etag_matches(if_none_match, order_etag(order)):
+            return _not_modified(order)
+        return OrderJSONResponse(
+            order,
+            headers={"ETag": order_etag(order), "Cache-Control": "no-cache"}
         )
     except OrderNotFoundError as e:
         raise HTTPException(
@@ -78,3 +136,211 @@ async def get_order_status(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error: %s" % str(e)
         ) from e
+
+
+def _not_modified(order: Order) -> Response:
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={"ETag": order_etag(order), "Cache-Control": "no-cache"}
+    )
+
+
+@router.get(
+    "/orders/{order_id}/status/wait",
+    response_model=OrderResponse,
+    response_class=OrderJSONResponse,
+    status_code=status.HTTP_200_OK
+)
+@inject
+async def wait_order_status(
+        order_id: UUID = Path(..., description="ID заказа"),
+        since: OrderStatus | None = Query(None, description="Последний известный клиенту статус"),
+        timeout: float = Query(
+            settings.ORDER_STATUS_WAIT_MAX_SECONDS,
+            gt=0,
+            le=settings.ORDER_STATUS_WAIT_MAX_SECONDS,
+            description="Максимальное время ожидания, сек"
+        ),
+        uc: OrderUseCase = Depends(Provide[Container.usecase.order_usecase])
+):
+    """
+    Long-poll endpoint: отвечает, как только статус заказа отличается от since,
+    либо по истечении timeout с текущим статусом
+    """
+    try:
+        order, subscription = await uc.subscribe_order_status(OrderId(order_id))
+    except OrderNotFoundError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        ) from e
+    except (RepositoryError, AppError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error: %s" % str(e)
+        ) from e
+
+    with subscription:
+        current_status = order.status
+        if current_status == since and current_status not in TERMINAL_ORDER_STATUSES:
+            current_status = await subscription.next_status(timeout) or current_status
+
+    return OrderJSONResponse(
+        Order(id=order.id, status=current_status, created_at=order.created_at)
+    )
+
+
+@router.get(
+    "/orders/{order_id}/events",
+    response_class=StreamingResponse,
+    status_code=status.HTTP_200_OK
+)
+@inject
+async def order_events(
+        order_id: UUID = Path(..., description="ID заказа"),
+        uc: OrderUseCase = Depends(Provide[Container.usecase.order_usecase])
+):
+    """
+    Server-Sent Events endpoint: текущий статус заказа и все его изменения
+    до терминального статуса
+    """
+    try:
+        order, subscription = await uc.subscribe_order_status(OrderId(order_id))
+    except OrderNotFoundError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        ) from e
+    except (RepositoryError, AppError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error: %s" % str(e)
+        ) from e
+
+    return StreamingResponse(
+        _order_status_events(order, subscription),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        # Закрываем подписку и при обрыве соединения клиентом
+        background=BackgroundTask(subscription.close)
+    )
+
+
+async def _order_status_events(order: Order, subscription: StatusSubscription):
+    with subscription:
+        current_status = order.status
+        yield _sse_status_event(order, current_status)
+
+        while current_status not in TERMINAL_ORDER_STATUSES:
+            new_status = await subscription.next_status(settings.ORDER_EVENTS_KEEPALIVE_SECONDS)
+            if new_status is None:
+                yield b": keepalive\n\n"
+                continue
+            current_status = new_status
+            yield _sse_status_event(order, current_status)
+
+
+def _sse_status_event(order: Order, order_status: OrderStatus) -> bytes:
+    data = json.dumps({
+        "id": str(order.id),
+        "status": order_status.value,
+        "created_at": order.created_at.isoformat(),
+    })
+    return f"event: status\ndata: {data}\n\n".encode()
+
+
+@router.post(
+    "/orders/status:batch",
+    response_model=OrderStatusBatchResponse,
+    status_code=status.HTTP_200_OK
+)
+@inject
+async def get_order_statuses_batch(
+        body: OrderStatusBatchRequest,
+        uc: OrderUseCase = Depends(Provide[Container.usecase.order_usecase])
+):
+    """
+    Endpoint получения статусов нескольких заказов одним запросом
+    """
+    try:
+        orders = await uc.get_order_statuses([OrderId(order_id) for order_id in body.ids])
+        return OrderStatusBatchResponse(
+            statuses={order_id: order.status for order_id, order in orders.items()},
+            unknown_ids=[
+                OrderId(order_id) for order_id in dict.fromkeys(body.ids)
+                if order_id not in orders
+            ]
+        )
+    except (RepositoryError, AppError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error: %s" % str(e)
+        ) from e
+
+
+@router.get(
+    "/customers/{customer_id}/orders",
+    response_model=OrderListResponse,
+    response_class=OrdersPageJSONResponse,
+    status_code=status.HTTP_200_OK
+)
+@inject
+async def list_customer_orders(
+        customer_id: str = Path(..., min_length=1, max_length=255, description="ID клиента"),
+        limit: int = Query(20, ge=1, le=100, description="Размер страницы"),
+        cursor: str | None = Query(None, description="Курсор из next_cursor предыдущей страницы"),
+        order_status: OrderStatus | None = Query(None, alias="status", description="Фильтр по статусу"),
+        uc: OrderUseCase = Depends(Provide[Container.usecase.order_usecase])
+):
+    """
+    Endpoint истории заказов клиента с keyset пагинацией
+    """
+    try:
+        page = await uc.list_customer_orders(
+            customer_id,
+            limit,
+            cursor=cursor,
+            status=order_status
+        )
+        return OrdersPageJSONResponse(page)
+    except InvalidCursorError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        ) from e
+    except (RepositoryError, AppError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error: %s" % str(e)
+        ) from e
+
+
+@router.get(
+    "/orders/export",
+    response_class=StreamingResponse,
+    status_code=status.HTTP_200_OK
+)
+@inject
+async def export_orders(
+        export_format: ExportFormat = Query(ExportFormat.NDJSON, alias="format", description="Формат выгрузки"),
+        created_from: datetime | None = Query(None, description="Начало периода (включительно)"),
+        created_to: datetime | None = Query(None, description="Конец периода (не включительно)"),
+        order_status: OrderStatus | None = Query(None, alias="status", description="Фильтр по статусу"),
+        uc: OrderUseCase = Depends(Provide[Container.usecase.order_usecase])
+):
+    """
+    Endpoint потоковой выгрузки заказов с позициями в NDJSON или CSV.
+    Обрыв выгрузки из-за ошибки БД отмечается последней строкой export_interrupted.
+    """
+    orders = uc.export_orders(
+        created_from=to_naive_utc(created_from),
+        created_to=to_naive_utc(created_to),
+        status=order_status
+    )
+    return StreamingResponse(
+        serialize_orders(orders, export_format),
+        media_type=export_format.media_type,
+        headers={
+            "Content-Disposition": f"attachment; filename=orders.{export_format.value}"
+        }
+    )
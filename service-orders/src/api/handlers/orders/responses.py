@@ -0,0 +1,52 @@
+"""
+Быстрая сериализация ответов order endpoints.
+
+TypeAdapter-ы компилируются один раз при импорте и кодируют dataclass-ы
+entity слоя сразу в JSON bytes. Endpoint возвращает готовый JSONResponse,
+поэтому FastAPI не валидирует его повторно по response_model: модель
+остается только для OpenAPI схемы.
+"""
+
+import typing
+
+from pydantic import TypeAdapter
+from starlette.responses import JSONResponse
+
+from src.entity.orders import Order, OrdersPage
+
+
+class AdapterJSONResponse(JSONResponse):
+    adapter: typing.ClassVar[TypeAdapter]
+    exclude: typing.ClassVar[typing.Any] = None
+
+    def render(self, content: typing.Any) -> bytes:
+        return self.adapter.dump_json(content, exclude=self.exclude)
+
+
+class OrderJSONResponse(AdapterJSONResponse):
+    adapter = TypeAdapter(Order)
+    exclude = {"version"}
+
+
+class OrdersPageJSONResponse(AdapterJSONResponse):
+    adapter = TypeAdapter(OrdersPage)
+    exclude = {"items": {"__all__": {"version"}}}
+
+
+def order_etag(order: Order) -> str:
+    """
+    ETag ответа со статусом заказа: меняется вместе с версией заказа.
+    """
+    return f'"{order.id.hex}-{order.version}-{order.status.value}"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """
+    Сравнение по If-None-Match (RFC 9110): список тегов или "*", слабое сравнение.
+    """
+    if if_none_match.strip() == "*":
+        return True
+    return any(
+        candidate.strip().removeprefix("W/") == etag
+        for candidate in if_none_match.split(",")
+    )
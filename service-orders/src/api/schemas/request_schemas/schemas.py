@@ -1,5 +1,9 @@
+from uuid import UUID
+
 from pydantic import BaseModel, Field, field_validator
 
+from src.settings import settings
+
 class Product(BaseModel):
     """
     Модель товара в заказе
@@ -16,3 +20,12 @@ class CreateNewOrder(BaseModel):
         description="Список товаров в заказе"
     )
     amount: str = Field(..., min_length=1, max_length=255, description="Сумма заказа")
+
+
+class OrderStatusBatchRequest(BaseModel):
+    ids: list[UUID] = Field(
+        ...,
+        min_length=1,
+        max_length=settings.ORDER_STATUS_BATCH_MAX_IDS,
+        description="Список ID заказов"
+    )
@@ -6,3 +6,13 @@ class OrderResponse(BaseModel):
     id: OrderId
     status: OrderStatus
     created_at: datetime
+
+
+class OrderListResponse(BaseModel):
+    items: list[OrderResponse]
+    next_cursor: str | None = Field(None, description="Курсор следующей страницы")
+
+
+class OrderStatusBatchResponse(BaseModel):
+    statuses: dict[OrderId, OrderStatus] = Field(..., description="Статусы найденных заказов")
+    unknown_ids: list[OrderId] = Field(..., description="ID заказов, которые не найдены")
@@ -0,0 +1,9 @@
+"""
+ASGI приложение API роли: gunicorn/uvicorn загружают src.asgi:app.
+
+Приложение собирается при импорте этого модуля, поэтому фоновые роли
+импортируют src.main и не создают лишний контейнер.
+"""
+from src.main import create_app
+
+app = create_app()
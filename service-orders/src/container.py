@@ -22,7 +22,11 @@ class Container(containers.DeclarativeContainer):
 
     usecase = providers.Container(
         UseCaseContainer,
-        order_repository=infrastructure.order_repository,
         uow=infrastructure.uow,
         rabbitmq_client=infrastructure.rabbitmq_client,
+        status_hub=infrastructure.order_status_hub,
+        idempotency_cache=infrastructure.idempotency_cache,
+        rate_limiter=infrastructure.order_rate_limiter,
+        status_cache=infrastructure.order_status_cache,
+        replica_staleness_seconds=config.DB_REPLICA_STALENESS_SECONDS,
     )
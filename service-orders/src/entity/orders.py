@@ -2,8 +2,9 @@ from __future__ import annotations
 
 import typing
 import uuid
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
+from decimal import Decimal
 from enum import Enum
 
 OrderId = typing.NewType("OrderID", uuid.UUID)
@@ -15,6 +16,12 @@ class OrderStatus(str, Enum):
     FAILED = "FAILED"
     CANCELLED = "CANCELLED"
 
+TERMINAL_ORDER_STATUSES = frozenset({
+    OrderStatus.COMPLETED,
+    OrderStatus.FAILED,
+    OrderStatus.CANCELLED,
+})
+
 @dataclass(slots=True)
 class CreateOrder:
     user_id: str
@@ -26,3 +33,36 @@ class Order:
     id: OrderId
     status: OrderStatus
     created_at: datetime
+    version: int = 1
+
+@dataclass(slots=True)
+class IdempotencyRecord:
+    request_hash: str
+    order: Order
+
+@dataclass(slots=True)
+class StatusBatchResult:
+    updated: dict[OrderId, OrderStatus]
+    missing: list[str]
+    invalid: list[str]
+    versions: dict[OrderId, int] = field(default_factory=dict)
+
+@dataclass(slots=True)
+class OrdersPage:
+    items: list[Order]
+    next_cursor: str | None = None
+
+@dataclass(slots=True)
+class OrderExportItem:
+    product_id: str
+    quantity: int
+    price: str
+
+@dataclass(slots=True)
+class OrderExport:
+    id: OrderId
+    customer_id: str
+    status: OrderStatus
+    amount: Decimal
+    created_at: datetime
+    items: list[OrderExportItem]
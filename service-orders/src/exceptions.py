@@ -174,3 +174,28 @@ class OutboxPublishError(MessagingError):
     """
     Ошибка при публикации сообщения из outbox.
     """
+
+
+class InvalidCursorError(AppError):
+    """
+    Некорректный курсор пагинации.
+    """
+
+
+class IdempotencyKeyConflictError(AppError):
+    """
+    Idempotency-Key уже использован с другим телом запроса.
+    """
+
+
+@dataclass
+class RateLimitExceededError(AppError):
+    """
+    Клиент превысил допустимую частоту создания заказов.
+    """
+    user_id: Any
+    retry_after: float
+    message: str = "Too many orders, retry later"
+
+    def __post_init__(self) -> None:
+        self.context = {"user_id": str(self.user_id), "retry_after": self.retry_after}
@@ -0,0 +1,79 @@
+import time
+
+from src.infrastructure.cache.ttl_lru import TTLLRUCache
+
+
+class AdaptiveConcurrencyLimit:
+    """
+    Лимит одновременных запросов с AIMD адаптацией.
+
+    Без перегрузки лимит растет на 1 за каждые limit завершенных запросов,
+    при перегрузке умножается на backoff, но не чаще раза в decrease_interval.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = 64,
+        min_limit: int = 4,
+        max_limit: int = 512,
+        backoff: float = 0.9,
+        decrease_interval: float = 0.5
+    ) -> None:
+        self._min_limit = min_limit
+        self._max_limit = max_limit
+        self._backoff = backoff
+        self._decrease_interval = decrease_interval
+        self._last_decrease = 0.0
+        self.limit: float = float(initial_limit)
+        self.in_flight = 0
+
+    def try_acquire(self) -> bool:
+        if self.in_flight >= int(self.limit):
+            return False
+        self.in_flight += 1
+        return True
+
+    def release(self, overloaded: bool) -> None:
+        self.in_flight -= 1
+
+        if overloaded:
+            now = time.monotonic()
+            if now - self._last_decrease >= self._decrease_interval:
+                self.limit = max(self._min_limit, self.limit * self._backoff)
+                self._last_decrease = now
+        else:
+            self.limit = min(self._max_limit, self.limit + 1 / self.limit)
+
+
+class TokenBucketLimiter:
+    """
+    Token bucket по ключу (например, user_id).
+
+    Полностью восстановленный bucket неотличим от нового, поэтому bucket
+    хранится в LRU кэше ровно столько, сколько нужно на восстановление.
+    """
+
+    def __init__(self, rate: float, burst: int, max_keys: int = 100000) -> None:
+        self._rate = rate
+        self._burst = burst
+        ttl = burst / rate if rate > 0 else 0.0
+        self._buckets: TTLLRUCache[tuple[float, float]] = TTLLRUCache(maxsize=max_keys, ttl=ttl)
+
+    def acquire(self, key: str) -> float:
+        """
+        Забрать токен. Возвращает 0, если токен выдан, иначе сколько секунд ждать следующего.
+        """
+        if self._rate <= 0:
+            return 0.0
+
+        now = time.monotonic()
+        bucket = self._buckets.get(key)
+        tokens, updated_at = bucket if bucket is not None else (float(self._burst), now)
+        tokens = min(float(self._burst), tokens + (now - updated_at) * self._rate)
+
+        if tokens < 1:
+            self._buckets.set(key, (tokens, now))
+            return (1 - tokens) / self._rate
+
+        self._buckets.set(key, (tokens - 1, now))
+        return 0.0
@@ -0,0 +1,57 @@
+import asyncio
+from typing import Optional
+
+from src.logger import logger
+
+
+class LoadMonitor:
+    """
+    Сигналы перегрузки процесса: время ожидания соединения из пула БД и лаг event loop.
+
+    Оба значения сглажены экспоненциальным скользящим средним.
+    """
+
+    def __init__(self, probe_interval: float = 0.1, smoothing: float = 0.2) -> None:
+        self._probe_interval = probe_interval
+        self._smoothing = smoothing
+        self.pool_wait: float = 0.0
+        self.loop_lag: float = 0.0
+        self._running = False
+        self._task: Optional[asyncio.Task] = None
+
+    def observe_pool_wait(self, seconds: float) -> None:
+        self.pool_wait += self._smoothing * (seconds - self.pool_wait)
+
+    def observe_loop_lag(self, seconds: float) -> None:
+        self.loop_lag += self._smoothing * (seconds - self.loop_lag)
+
+    async def start(self) -> None:
+        if self._running:
+            return
+
+        self._running = True
+        self._task = asyncio.create_task(self._probe_loop())
+        logger.info("LoadMonitor started")
+
+    async def stop(self) -> None:
+        self._running = False
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        logger.info("LoadMonitor stopped")
+
+    async def _probe_loop(self) -> None:
+        """
+        Лаг event loop: насколько sleep(interval) проснулся позже запланированного.
+        """
+        loop = asyncio.get_running_loop()
+        while self._running:
+            started = loop.time()
+            try:
+                await asyncio.sleep(self._probe_interval)
+            except asyncio.CancelledError:
+                break
+            self.observe_loop_lag(max(0.0, loop.time() - started - self._probe_interval))
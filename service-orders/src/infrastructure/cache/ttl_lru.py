@@ -0,0 +1,48 @@
+import time
+from collections import OrderedDict
+from collections.abc import Hashable
+from typing import Generic, Optional, TypeVar
+
+V = TypeVar("V")
+
+
+class TTLLRUCache(Generic[V]):
+    """
+    In-memory LRU кэш с ограничением по размеру и времени жизни записей.
+
+    Не потокобезопасен: рассчитан на использование внутри одного event loop.
+    """
+
+    def __init__(self, maxsize: int = 10000, ttl: float = 3600.0) -> None:
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._data: OrderedDict[Hashable, tuple[float, V]] = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[V]:
+        item = self._data.get(key)
+        if item is None:
+            return None
+
+        expires_at, value = item
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            return None
+
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: V) -> None:
+        if self._maxsize <= 0:
+            return
+
+        self._data[key] = (time.monotonic() + self._ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self._maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: Hashable) -> Optional[V]:
+        item = self._data.pop(key, None)
+        return item[1] if item is not None else None
+
+    def __len__(self) -> int:
+        return len(self._data)
@@ -5,10 +5,16 @@
 from dependency_injector import containers, providers
 
 from src.infrastructure.persistence.db import Database
-from src.infrastructure.persistence.repositories.orders import OrderRepository
 from src.infrastructure.persistence.uow import UnitOfWork
+from src.infrastructure.persistence.archiver import OrderArchiver
+from src.infrastructure.persistence.idempotency_sweeper import IdempotencyKeySweeper
 from src.infrastructure.messaging.rabbitmq_client import RabbitMQClient
 from src.infrastructure.messaging.outbox_publisher import OutboxPublisher
+from src.infrastructure.messaging.status_hub import OrderStatusHub
+from src.infrastructure.cache.ttl_lru import TTLLRUCache
+from src.infrastructure.admission.limits import TokenBucketLimiter
+from src.infrastructure.admission.load_monitor import LoadMonitor
+from src.settings import AppRole
 
 
 def get_db_url(
@@ -21,6 +27,27 @@ def get_db_url(
     return f"postgresql+asyncpg://{pg_user}:{pg_password}@{pg_host}:{pg_port}/{pg_db}"
 
 
+def get_worker_pool_size(total: int, workers: int) -> int:
+    """
+    Доля общего бюджета соединений на один процесс-воркер.
+    """
+    return max(1, total // max(1, workers))
+
+
+def get_role_pool_size(role: str, total: int, workers: int, background_total: int) -> int:
+    """
+    Размер пула процесса по роли. API (и all) делит общий бюджет между
+    воркерами gunicorn, фоновым relay и consumer хватает своего малого пула.
+    """
+    if AppRole(role) in (AppRole.RELAY, AppRole.CONSUMER):
+        return max(1, background_total)
+    return get_worker_pool_size(total, workers)
+
+
+def get_replica_urls(replica_dsns: str) -> list[str]:
+    return [dsn.strip() for dsn in (replica_dsns or "").split(",") if dsn.strip()]
+
+
 class InfrastructureContainer(containers.DeclarativeContainer):
 
     config = providers.Configuration()
@@ -35,27 +62,62 @@ class InfrastructureContainer(containers.DeclarativeContainer):
             pg_port=config.DB_PORT,
             pg_db=config.DB_NAME,
         ),
+        replica_urls=providers.Callable(
+            get_replica_urls,
+            replica_dsns=config.DB_REPLICA_DSNS,
+        ),
+        pool_size=providers.Callable(
+            get_role_pool_size,
+            role=config.APP_ROLE,
+            total=config.DB_POOL_SIZE,
+            workers=config.WEB_CONCURRENCY,
+            background_total=config.DB_BACKGROUND_POOL_SIZE,
+        ),
+        max_overflow=providers.Callable(
+            get_role_pool_size,
+            role=config.APP_ROLE,
+            total=config.DB_MAX_OVERFLOW,
+            workers=config.WEB_CONCURRENCY,
+            background_total=config.DB_BACKGROUND_MAX_OVERFLOW,
+        ),
+        echo=config.DB_ECHO,
     )
 
-    session_factory = providers.Factory(
-        lambda db: db.session_factory(),
-        db=db,
-    )
-
-    order_repository = providers.Factory(
-        OrderRepository,
-        session=session_factory,
+    load_monitor = providers.Singleton(
+        LoadMonitor,
     )
 
-
     uow = providers.Singleton(
         UnitOfWork,
         db=db,
+        load_monitor=load_monitor,
     )
     
     rabbitmq_client = providers.Singleton(
         RabbitMQClient,
     )
+
+    order_status_hub = providers.Singleton(
+        OrderStatusHub,
+    )
+
+    order_rate_limiter = providers.Singleton(
+        TokenBucketLimiter,
+        rate=config.ORDER_RATE_LIMIT_PER_SECOND,
+        burst=config.ORDER_RATE_LIMIT_BURST,
+    )
+
+    order_status_cache = providers.Singleton(
+        TTLLRUCache,
+        maxsize=config.ORDER_STATUS_CACHE_SIZE,
+        ttl=config.ORDER_STATUS_CACHE_TTL_SECONDS,
+    )
+
+    idempotency_cache = providers.Singleton(
+        TTLLRUCache,
+        maxsize=config.IDEMPOTENCY_CACHE_SIZE,
+        ttl=config.IDEMPOTENCY_CACHE_TTL_SECONDS,
+    )
     
     outbox_publisher = providers.Singleton(
         OutboxPublisher,
@@ -64,4 +126,20 @@ class InfrastructureContainer(containers.DeclarativeContainer):
         batch_size=100,
         poll_interval=5.0,
         max_retries=3,
-    )
\ No newline at end of file
+    )
+
+    order_archiver = providers.Singleton(
+        OrderArchiver,
+        db=db,
+        retention_days=config.ARCHIVE_RETENTION_DAYS,
+        batch_size=config.ARCHIVE_BATCH_SIZE,
+        interval=config.ARCHIVE_INTERVAL_SECONDS,
+    )
+
+    idempotency_key_sweeper = providers.Singleton(
+        IdempotencyKeySweeper,
+        db=db,
+        ttl_seconds=config.IDEMPOTENCY_KEY_TTL_SECONDS,
+        batch_size=config.IDEMPOTENCY_SWEEP_BATCH_SIZE,
+        interval=config.IDEMPOTENCY_SWEEP_INTERVAL_SECONDS,
+    )
@@ -1,6 +1,6 @@
 import json
 import asyncio
-from typing import Callable, Optional
+from typing import Awaitable, Callable, Optional
 import aio_pika
 from aio_pika import Exchange, Queue, IncomingMessage
 from aio_pika.abc import AbstractConnection, AbstractChannel
@@ -30,6 +30,7 @@ class RabbitMQClient:
         self._channel: Optional[AbstractChannel] = None
         self._order_created_exchange: Optional[Exchange] = None
         self._order_processed_exchange: Optional[Exchange] = None
+        self._order_status_exchange: Optional[Exchange] = None
         self._dlx: Optional[Exchange] = None
         self._dlq: Optional[Queue] = None
         
@@ -66,6 +67,13 @@ class RabbitMQClient:
                 aio_pika.ExchangeType.TOPIC,
                 durable=True
             )
+
+            # Fanout рассылка примененных статусов во все API процессы
+            self._order_status_exchange = await self._channel.declare_exchange(
+                settings.ORDER_STATUS_BROADCAST_EXCHANGE,
+                aio_pika.ExchangeType.FANOUT,
+                durable=True
+            )
             
             logger.info("Connected to RabbitMQ")
         except (aio_pika.exceptions.AMQPConnectionError, aio_pika.exceptions.AMQPChannelError, OSError) as e:
@@ -150,6 +158,38 @@ class RabbitMQClient:
             f"Reason: {error}"
         )
     
+    async def _retry_or_dead_letter(self, message: IncomingMessage, error: Exception) -> None:
+        """
+        Отправить сообщение в retry очередь или в DLQ, если попытки исчерпаны
+        """
+        retry_count = self._get_retry_count(message)
+        await message.ack()
+
+        if retry_count >= settings.MAX_RETRY_ATTEMPTS:
+            await self._publish_to_dlq(message, error)
+        else:
+            new_retry_count = self._increment_retry_count(
+                dict(message.headers) if message.headers else {}
+            )
+            await self._publish_to_retry_queue(message, new_retry_count)
+
+    async def _declare_order_processed_queue(self) -> Queue:
+        queue_name = f"orders_order_processed_queue"
+        queue = await self._channel.declare_queue(
+            queue_name,
+            durable=True,
+            arguments={
+                "x-dead-letter-exchange": settings.DLX_NAME,
+                "x-dead-letter-routing-key": settings.DLQ_NAME,
+            }
+        )
+
+        await queue.bind(
+            self._order_processed_exchange,
+            routing_key=settings.ORDER_PROCESSED_ROUTING_KEY
+        )
+        return queue
+
     async def publish_order_created(
         self,
         order_id: str,
@@ -187,6 +227,59 @@ class RabbitMQClient:
             logger.error("Failed to publish order.created: %s", e)
             raise MessagePublishError(order_id=order_id, message=str(e)) from e
     
+    async def publish_order_statuses(self, orders: list[dict]) -> None:
+        """
+        Разослать примененные статусы заказов ({"id", "status", "version"}) в API процессы.
+
+        Сообщения не персистентные: это live-уведомления, источник истины - БД.
+        """
+        if not self._order_status_exchange:
+            raise MessagingError("Not connected to RabbitMQ")
+
+        try:
+            await self._order_status_exchange.publish(
+                aio_pika.Message(
+                    json.dumps({"orders": orders}).encode(),
+                    delivery_mode=aio_pika.DeliveryMode.NOT_PERSISTENT
+                ),
+                routing_key=""
+            )
+        except (aio_pika.exceptions.AMQPError, OSError) as e:
+            logger.error("Failed to publish order statuses broadcast: %s", e)
+            raise MessagingError("Failed to publish order statuses broadcast: %s" % e) from e
+
+    async def subscribe_to_order_status_broadcast(
+        self,
+        callback: Callable[[dict], None]
+    ) -> None:
+        """
+        Подписка процесса на рассылку статусов через собственную exclusive очередь.
+        """
+        if not self._channel or not self._order_status_exchange:
+            raise MessagingError("Not connected to RabbitMQ")
+
+        try:
+            queue = await self._channel.declare_queue(exclusive=True, auto_delete=True)
+            await queue.bind(self._order_status_exchange)
+
+            async def message_handler(message: IncomingMessage):
+                try:
+                    callback(json.loads(message.body.decode()))
+                except (
+                    json.JSONDecodeError, UnicodeDecodeError, TypeError, ValueError, KeyError, AttributeError
+                ) as e:
+                    # Битая рассылка (нет поля, не тот тип) пропускается, подписка продолжает работать
+                    logger.error("Error handling order status broadcast: %s", e, exc_info=True)
+
+            await queue.consume(message_handler, no_ack=True)
+            await asyncio.Future()
+
+        except asyncio.CancelledError:
+            raise
+        except (aio_pika.exceptions.AMQPError, OSError) as e:
+            logger.error("Failed to subscribe to order status broadcast: %s", e)
+            raise SubscriptionError("Failed to subscribe to order status broadcast: %s" % e) from e
+
     async def subscribe_to_order_processed(
         self,
         callback: Callable[[dict], None]
@@ -199,20 +292,7 @@ class RabbitMQClient:
         
         try:
             # Создаем основную очередь с настройками DLQ
-            queue_name = f"orders_order_processed_queue"
-            queue = await self._channel.declare_queue(
-                queue_name,
-                durable=True,
-                arguments={
-                    "x-dead-letter-exchange": settings.DLX_NAME,
-                    "x-dead-letter-routing-key": settings.DLQ_NAME,
-                }
-            )
-
-            await queue.bind(
-                self._order_processed_exchange,
-                routing_key=settings.ORDER_PROCESSED_ROUTING_KEY
-            )
+            queue = await self._declare_order_processed_queue()
             
             async def message_handler(message: IncomingMessage):
                 retry_count = self._get_retry_count(message)
@@ -241,16 +321,7 @@ class RabbitMQClient:
                         retry_count, e,
                         exc_info=True
                     )
-
-                    if retry_count >= settings.MAX_RETRY_ATTEMPTS:
-                        await message.ack()
-                        await self._publish_to_dlq(message, e)
-                    else:
-                        await message.ack()
-                        new_retry_count = self._increment_retry_count(
-                            dict(message.headers) if message.headers else {}
-                        )
-                        await self._publish_to_retry_queue(message, new_retry_count)
+                    await self._retry_or_dead_letter(message, e)
                 except (TypeError, AttributeError, KeyError, ValueError) as e:
                     logger.error(
                         "Data validation error processing message (retry %s): %s",
@@ -266,3 +337,106 @@ class RabbitMQClient:
         except (aio_pika.exceptions.AMQPError, OSError) as e:
             logger.error("Failed to subscribe to order.processed: %s", e)
             raise SubscriptionError("Failed to subscribe to order.processed: %s" % e) from e
+
+    async def subscribe_to_order_processed_batch(
+        self,
+        callback: Callable[[list[dict]], Awaitable[dict[str, Exception]]],
+        batch_size: int,
+        flush_interval: float
+    ) -> None:
+        """
+        Подписка на события order.processed с обработкой пачками.
+
+        Сообщения копятся до batch_size штук или flush_interval секунд и
+        передаются в callback одним списком. Callback возвращает словарь
+        order_id -> ошибка для сообщений, которые не удалось применить: они
+        поштучно уходят в retry или DLQ, остальные подтверждаются.
+        """
+        if not self._channel or not self._order_processed_exchange:
+            raise MessagingError("Not connected to RabbitMQ")
+
+        try:
+            await self._channel.set_qos(prefetch_count=batch_size * 2)
+            queue = await self._declare_order_processed_queue()
+
+            pending: list[IncomingMessage] = []
+            flush_lock = asyncio.Lock()
+
+            async def flush() -> None:
+                async with flush_lock:
+                    if not pending:
+                        return
+                    batch = pending[:]
+                    pending.clear()
+                    # Ошибка одной пачки не должна останавливать периодический flush
+                    # и обработчик сообщений: неподтвержденные пачки упрутся в prefetch
+                    try:
+                        await self._handle_order_processed_batch(batch, callback)
+                    except Exception as e:
+                        logger.error("Failed to handle order.processed batch: %s", e, exc_info=True)
+
+            async def message_handler(message: IncomingMessage):
+                pending.append(message)
+                if len(pending) >= batch_size:
+                    await flush()
+
+            async def flush_periodically():
+                while True:
+                    await asyncio.sleep(flush_interval)
+                    await flush()
+
+            flush_task = asyncio.create_task(flush_periodically())
+            try:
+                await queue.consume(message_handler)
+                await asyncio.Future()
+            finally:
+                flush_task.cancel()
+
+        except asyncio.CancelledError:
+            raise
+        except (aio_pika.exceptions.AMQPError, OSError) as e:
+            logger.error("Failed to subscribe to order.processed: %s", e)
+            raise SubscriptionError("Failed to subscribe to order.processed: %s" % e) from e
+
+    async def _handle_order_processed_batch(
+        self,
+        batch: list[IncomingMessage],
+        callback: Callable[[list[dict]], Awaitable[dict[str, Exception]]]
+    ) -> None:
+        decoded: list[tuple[IncomingMessage, dict]] = []
+        for message in batch:
+            try:
+                body = json.loads(message.body.decode())
+                if not isinstance(body, dict):
+                    raise ValueError("Message body is not a JSON object")
+                decoded.append((message, body))
+            except (json.JSONDecodeError, UnicodeDecodeError, ValueError) as e:
+                logger.error("Error decoding message: %s", e, exc_info=True)
+                await message.ack()
+                await self._publish_to_dlq(message, e)
+
+        if not decoded:
+            return
+
+        try:
+            failures = await callback([body for _, body in decoded])
+        except Exception as e:
+            logger.error("Error processing order.processed batch: %s", e, exc_info=True)
+            for message, _ in decoded:
+                await self._retry_or_dead_letter(message, e)
+            return
+
+        for message, body in decoded:
+            error = failures.get(body.get("order_id"))
+            if error is None:
+                await message.ack()
+            elif isinstance(error, AppError):
+                await self._retry_or_dead_letter(message, error)
+            else:
+                await message.ack()
+                await self._publish_to_dlq(message, error)
+
+        logger.info(
+            f"Processed order.processed batch of {len(decoded)} messages "
+            f"({len(failures)} failed)"
+        )
@@ -0,0 +1,71 @@
+import asyncio
+from collections import defaultdict
+from typing import Optional
+from uuid import UUID
+
+from src.entity.orders import OrderStatus
+
+
+class StatusSubscription:
+    """
+    Подписка на изменения статуса одного заказа.
+    """
+
+    def __init__(self, hub: "OrderStatusHub", order_id: UUID) -> None:
+        self.order_id = order_id
+        self._hub = hub
+        self._queue: asyncio.Queue[OrderStatus] = asyncio.Queue()
+
+    def deliver(self, status: OrderStatus) -> None:
+        self._queue.put_nowait(status)
+
+    async def next_status(self, timeout: float) -> Optional[OrderStatus]:
+        """
+        Дождаться следующего статуса. None, если за timeout секунд обновлений не было.
+        """
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self) -> None:
+        self._hub.unsubscribe(self)
+
+    def __enter__(self) -> "StatusSubscription":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class OrderStatusHub:
+    """
+    In-process pub/sub статусов заказов.
+
+    Consumer order.processed публикует сюда примененные статусы, а SSE и
+    long-poll подписчики получают их сразу, без опроса БД.
+    """
+
+    def __init__(self) -> None:
+        self._subscriptions: defaultdict[UUID, set[StatusSubscription]] = defaultdict(set)
+
+    def subscribe(self, order_id: UUID) -> StatusSubscription:
+        subscription = StatusSubscription(self, order_id)
+        self._subscriptions[order_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: StatusSubscription) -> None:
+        subscriptions = self._subscriptions.get(subscription.order_id)
+        if subscriptions is None:
+            return
+        subscriptions.discard(subscription)
+        if not subscriptions:
+            del self._subscriptions[subscription.order_id]
+
+    def publish(self, order_id: UUID, status: OrderStatus) -> None:
+        for subscription in self._subscriptions.get(order_id, ()):
+            subscription.deliver(status)
+
+    @property
+    def subscribers_count(self) -> int:
+        return sum(len(subscriptions) for subscriptions in self._subscriptions.values())
@@ -0,0 +1,92 @@
+import asyncio
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy.exc import SQLAlchemyError
+
+from src.infrastructure.persistence.db import Database
+from src.infrastructure.persistence.repositories.archive import ArchiveRepository
+from src.logger import logger
+from src.exceptions import RepositoryError, AppError
+
+
+class OrderArchiver:
+    """
+    Фоновая архивация завершенных заказов старше retention окна.
+    """
+
+    def __init__(
+        self,
+        db: Database,
+        retention_days: int = 90,
+        batch_size: int = 500,
+        interval: float = 300.0
+    ) -> None:
+        self._db = db
+        self._retention = timedelta(days=retention_days)
+        self._batch_size = batch_size
+        self._interval = interval
+        self._running = False
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        if self._running:
+            logger.warning("OrderArchiver is already running")
+            return
+
+        self._running = True
+        self._task = asyncio.create_task(self._archive_loop())
+        logger.info("OrderArchiver started")
+
+    async def stop(self) -> None:
+        self._running = False
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        logger.info("OrderArchiver stopped")
+
+    async def _archive_loop(self) -> None:
+        while self._running:
+            try:
+                archived = await self.archive_expired()
+                if archived:
+                    logger.info("Archived %s orders", archived)
+            except (RepositoryError, AppError) as e:
+                logger.error("Error in order archive loop: %s", e, exc_info=True)
+            except SQLAlchemyError as e:
+                logger.error("Database error in order archive loop: %s", e, exc_info=True)
+            except Exception as e:
+                # Обрыв соединения и т.п. не должен молча останавливать архивацию
+                logger.error("Unexpected error in order archive loop: %s", e, exc_info=True)
+
+            try:
+                await asyncio.sleep(self._interval)
+            except asyncio.CancelledError:
+                break
+
+    async def archive_expired(self) -> int:
+        """
+        Переносить заказы пачками, пока есть кандидаты. Каждая пачка - отдельная транзакция.
+        """
+        cutoff = datetime.utcnow() - self._retention
+        total = 0
+
+        while self._running:
+            archived = await self._archive_batch(cutoff)
+            total += archived
+            if archived < self._batch_size:
+                break
+
+        return total
+
+    async def _archive_batch(self, cutoff: datetime) -> int:
+        async with self._db.connection() as conn:
+            async with conn.begin():
+                repository = ArchiveRepository(conn, auto_commit=False)
+                if not await repository.try_lock():
+                    logger.info("Order archivation is running in another process")
+                    return 0
+                return await repository.archive_batch(cutoff, self._batch_size)
@@ -1,4 +1,5 @@
 import contextlib
+import itertools
 import logging
 import typing
 
@@ -11,19 +12,65 @@ Base = declarative_base()
 
 
 class Database:
-    def __init__(self, db_url: str) -> None:
-        self.engine = create_async_engine(db_url, echo=True)
+    def __init__(
+        self,
+        db_url: str,
+        replica_urls: typing.Sequence[str] = (),
+        *,
+        pool_size: int = 5,
+        max_overflow: int = 10,
+        echo: bool = False,
+    ) -> None:
+        self.engine = create_async_engine(
+            db_url,
+            echo=echo,
+            pool_size=pool_size,
+            max_overflow=max_overflow,
+        )
         self.session_factory: async_sessionmaker[AsyncSession] = async_sessionmaker(
             bind=self.engine,
             autoflush=False,
             expire_on_commit=False,
         )
 
+        # Реплики открывают транзакции в режиме READ ONLY
+        self.replica_engines = [
+            create_async_engine(
+                url,
+                echo=echo,
+                pool_size=pool_size,
+                max_overflow=max_overflow,
+                execution_options={"postgresql_readonly": True},
+            )
+            for url in replica_urls
+        ]
+        self._replica_session_factories = itertools.cycle([
+            async_sessionmaker(
+                bind=engine,
+                autoflush=False,
+                expire_on_commit=False,
+            )
+            for engine in self.replica_engines
+        ])
+
+    @property
+    def has_replicas(self) -> bool:
+        return bool(self.replica_engines)
+
+    def read_session_factory(self) -> async_sessionmaker[AsyncSession]:
+        """
+        Фабрика сессий для чтения: реплики по кругу, либо primary, если реплик нет.
+        """
+        if not self.has_replicas:
+            return self.session_factory
+        return next(self._replica_session_factories)
+
     async def create_database(self) -> None:
         async with self.engine.begin() as conn:
             await conn.run_sync(Base.metadata.create_all)
 
     @contextlib.asynccontextmanager
-    async def connection(self) -> typing.AsyncGenerator[AsyncSession, None]:
-        async with self.session_factory() as session:
-            yield session
\ No newline at end of file
+    async def connection(self, read_only: bool = False) -> typing.AsyncGenerator[AsyncSession, None]:
+        session_factory = self.read_session_factory() if read_only else self.session_factory
+        async with session_factory() as session:
+            yield session
@@ -1,7 +1,7 @@
 from uuid import UUID as UUIDType
 import datetime
 
-from sqlalchemy import UUID, DateTime, Enum, Integer, String, ForeignKey, Numeric, Text, Boolean
+from sqlalchemy import UUID, DateTime, Enum, Integer, String, ForeignKey, Index, Numeric, Text, Boolean, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 import uuid
@@ -9,9 +9,26 @@ from src.entity.orders import OrderStatus
 from src.infrastructure.persistence.db import Base
 
 
-
 class Order(Base):
     __tablename__ = "orders"
+    __table_args__ = (
+        # Покрывающий индекс для истории заказов клиента с keyset пагинацией
+        Index(
+            "ix_orders_customer_id_created_at_id",
+            "customer_id",
+            "created_at",
+            "id",
+            postgresql_include=["status"],
+        ),
+        # Порядок keyset чанков потоковой выгрузки заказов
+        Index("ix_orders_created_at_id", "created_at", "id"),
+        # Частичный индекс для выборки кандидатов на архивацию
+        Index(
+            "ix_orders_terminal_created_at",
+            "created_at",
+            postgresql_where=text("status IN ('COMPLETED', 'FAILED', 'CANCELLED')"),
+        ),
+    )
 
     id: Mapped[UUIDType] = mapped_column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, unique=True
@@ -25,19 +42,80 @@ class Order(Base):
     created_at: Mapped[datetime.datetime] = mapped_column(
         DateTime, nullable=False, default=datetime.datetime.utcnow
     )
+    # Растет на каждом изменении статуса, входит в ETag
+    version: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=1, server_default=text("1")
+    )
 
 
 class OrderItem(Base):
     __tablename__ = "order_items"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    order_id: Mapped[UUIDType] = mapped_column(ForeignKey("orders.id"))
+    order_id: Mapped[UUIDType] = mapped_column(ForeignKey("orders.id"), index=True)
     product_id: Mapped[str] = mapped_column(String)
     quantity: Mapped[int] = mapped_column(Integer)
     price: Mapped[str] = mapped_column(String)
     order: Mapped["Order"] = relationship("Order", back_populates="products")
 
 
+class OrderArchive(Base):
+    """
+    Архив завершенных заказов, секционирован по created_at (RANGE, помесячно)
+    """
+    __tablename__ = "orders_archive"
+    __table_args__ = (
+        Index("ix_orders_archive_customer_id_created_at", "customer_id", "created_at"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+
+    id: Mapped[UUIDType] = mapped_column(UUID(as_uuid=True), primary_key=True)
+    created_at: Mapped[datetime.datetime] = mapped_column(DateTime, primary_key=True)
+    customer_id: Mapped[str] = mapped_column(String)
+    status: Mapped[OrderStatus] = mapped_column(Enum(OrderStatus), nullable=False)
+    order_amount: Mapped[str] = mapped_column(Numeric(10, 2))
+    archived_at: Mapped[datetime.datetime] = mapped_column(
+        DateTime, nullable=False, default=datetime.datetime.utcnow
+    )
+
+
+class OrderItemArchive(Base):
+    """
+    Архив позиций заказов. created_at берется из заказа и служит ключом секционирования
+    """
+    __tablename__ = "order_items_archive"
+    __table_args__ = (
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    created_at: Mapped[datetime.datetime] = mapped_column(DateTime, primary_key=True)
+    order_id: Mapped[UUIDType] = mapped_column(UUID(as_uuid=True), index=True)
+    product_id: Mapped[str] = mapped_column(String)
+    quantity: Mapped[int] = mapped_column(Integer)
+    price: Mapped[str] = mapped_column(String)
+
+
+class IdempotencyKey(Base):
+    """
+    Idempotency-Key запросов создания заказа и выданный по ним ответ.
+
+    Ответ хранится копией, без внешнего ключа на orders: заказ может быть
+    перенесен в архив, а повтор запроса должен вернуть тот же ответ.
+    """
+    __tablename__ = "idempotency_keys"
+
+    user_id: Mapped[str] = mapped_column(String(255), primary_key=True)
+    key: Mapped[str] = mapped_column(String(255), primary_key=True)
+    request_hash: Mapped[str] = mapped_column(String(64), nullable=False)
+    order_id: Mapped[UUIDType | None] = mapped_column(UUID(as_uuid=True), nullable=True)
+    order_status: Mapped[OrderStatus | None] = mapped_column(Enum(OrderStatus), nullable=True)
+    order_created_at: Mapped[datetime.datetime | None] = mapped_column(DateTime, nullable=True)
+    created_at: Mapped[datetime.datetime] = mapped_column(
+        DateTime, nullable=False, default=datetime.datetime.utcnow, index=True
+    )
+
+
 class OutboxMessage(Base):
     __tablename__ = "outbox_messages"
 
@@ -0,0 +1,81 @@
+import asyncio
+from datetime import datetime, timedelta
+from typing import Optional
+
+from src.infrastructure.persistence.db import Database
+from src.infrastructure.persistence.repositories.idempotency import IdempotencyRepository
+from src.logger import logger
+from src.exceptions import AppError
+
+
+class IdempotencyKeySweeper:
+    """
+    Фоновое удаление Idempotency-Key старше TTL: повтор запроса с таким
+    ключом после TTL создает новый заказ.
+    """
+
+    def __init__(
+        self,
+        db: Database,
+        ttl_seconds: float = 86400.0,
+        batch_size: int = 1000,
+        interval: float = 300.0
+    ) -> None:
+        self._db = db
+        self._ttl = timedelta(seconds=ttl_seconds)
+        self._batch_size = batch_size
+        self._interval = interval
+        self._running = False
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        if self._running:
+            logger.warning("IdempotencyKeySweeper is already running")
+            return
+
+        self._running = True
+        self._task = asyncio.create_task(self._sweep_loop())
+        logger.info("IdempotencyKeySweeper started")
+
+    async def stop(self) -> None:
+        self._running = False
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        logger.info("IdempotencyKeySweeper stopped")
+
+    async def _sweep_loop(self) -> None:
+        while self._running:
+            try:
+                deleted = await self.delete_expired()
+                if deleted:
+                    logger.info("Deleted %s expired idempotency keys", deleted)
+            except AppError as e:
+                logger.error("Error in idempotency key sweep loop: %s", e, exc_info=True)
+            except Exception as e:
+                logger.error("Unexpected error in idempotency key sweep loop: %s", e, exc_info=True)
+
+            try:
+                await asyncio.sleep(self._interval)
+            except asyncio.CancelledError:
+                break
+
+    async def delete_expired(self) -> int:
+        """
+        Удалять ключи пачками, пока есть просроченные. Каждая пачка - отдельная транзакция.
+        """
+        older_than = datetime.utcnow() - self._ttl
+        total = 0
+
+        while self._running:
+            async with self._db.connection() as conn:
+                repository = IdempotencyRepository(conn)
+                deleted = await repository.delete_expired(older_than, self._batch_size)
+            total += deleted
+            if deleted < self._batch_size:
+                break
+
+        return total
@@ -0,0 +1,160 @@
+from datetime import date, datetime
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import delete, func, insert, select, text, any_, bindparam, UUID as UUIDColumn
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.exc import SQLAlchemyError
+
+from src.entity.orders import TERMINAL_ORDER_STATUSES, Order, OrderId
+from src.infrastructure.persistence.db.schema import (
+    Order as OrderModel,
+    OrderArchive as OrderArchiveModel,
+    OrderItem as OrderItemModel,
+    OrderItemArchive as OrderItemArchiveModel,
+)
+from src.exceptions import RepositoryError
+
+# Произвольный ключ advisory lock, чтобы архивацию выполнял один процесс за раз
+ARCHIVE_LOCK_KEY = 4_210_730_001
+
+
+class ArchiveRepository:
+    """
+    Перенос завершенных заказов в секционированные архивные таблицы.
+    """
+
+    def __init__(self, session: AsyncSession, *, auto_commit: bool = True) -> None:
+        self._session: AsyncSession = session
+        self._auto_commit = auto_commit
+
+    async def try_lock(self) -> bool:
+        """
+        Захватить advisory lock архивации до конца транзакции.
+        """
+        try:
+            result = await self._session.execute(
+                select(func.pg_try_advisory_xact_lock(ARCHIVE_LOCK_KEY))
+            )
+            return bool(result.scalar_one())
+        except SQLAlchemyError as exc:
+            raise RepositoryError("Failed to acquire archive lock") from exc
+
+    async def get_orders_by_ids(self, order_ids: list[UUID]) -> list[Order]:
+        """
+        Найти заказы в архиве по ID. Секционирование по created_at, поэтому
+        поиск только по id проверяет индекс каждой секции - запрос для
+        промахов по горячей таблице, а не для основного пути чтения.
+
+        Версия в архиве не хранится: статус архивного заказа уже не меняется.
+        """
+        if not order_ids:
+            return []
+
+        try:
+            archive_table = OrderArchiveModel.__table__
+            stmt = select(
+                archive_table.c.id,
+                archive_table.c.status,
+                archive_table.c.created_at,
+            ).where(
+                archive_table.c.id == any_(
+                    bindparam("order_ids", order_ids, type_=ARRAY(UUIDColumn(as_uuid=True)))
+                )
+            )
+            result = await self._session.execute(stmt)
+            return [
+                Order(id=OrderId(row.id), status=row.status, created_at=row.created_at)
+                for row in result
+            ]
+        except SQLAlchemyError as exc:
+            raise RepositoryError("Failed to get archived orders") from exc
+
+    async def archive_batch(self, cutoff: datetime, batch_size: int) -> int:
+        """
+        Перенести в архив до batch_size завершенных заказов старше cutoff.
+
+        Возвращает количество перенесенных заказов.
+        """
+        try:
+            candidates = await self._session.execute(
+                select(OrderModel.id, OrderModel.created_at)
+                .where(
+                    OrderModel.status.in_(sorted(TERMINAL_ORDER_STATUSES)),
+                    OrderModel.created_at < cutoff,
+                )
+                .order_by(OrderModel.created_at)
+                .limit(batch_size)
+                .with_for_update(skip_locked=True)
+            )
+            rows = candidates.all()
+            if not rows:
+                return 0
+
+            order_ids: list[UUID] = [row.id for row in rows]
+            await self._ensure_partitions({row.created_at.date().replace(day=1) for row in rows})
+
+            await self._session.execute(
+                insert(OrderItemArchiveModel).from_select(
+                    ["id", "created_at", "order_id", "product_id", "quantity", "price"],
+                    select(
+                        OrderItemModel.id,
+                        OrderModel.created_at,
+                        OrderItemModel.order_id,
+                        OrderItemModel.product_id,
+                        OrderItemModel.quantity,
+                        OrderItemModel.price,
+                    )
+                    .join(OrderModel, OrderModel.id == OrderItemModel.order_id)
+                    .where(OrderItemModel.order_id.in_(order_ids)),
+                )
+            )
+            await self._session.execute(
+                delete(OrderItemModel)
+                .where(OrderItemModel.order_id.in_(order_ids))
+                .execution_options(synchronize_session=False)
+            )
+
+            await self._session.execute(
+                insert(OrderArchiveModel).from_select(
+                    ["id", "created_at", "customer_id", "status", "order_amount", "archived_at"],
+                    select(
+                        OrderModel.id,
+                        OrderModel.created_at,
+                        OrderModel.customer_id,
+                        OrderModel.status,
+                        OrderModel.order_amount,
+                        func.timezone("UTC", func.now()),
+                    ).where(OrderModel.id.in_(order_ids)),
+                )
+            )
+            await self._session.execute(
+                delete(OrderModel)
+                .where(OrderModel.id.in_(order_ids))
+                .execution_options(synchronize_session=False)
+            )
+
+            await self._commit()
+            return len(order_ids)
+        except SQLAlchemyError as exc:
+            await self._session.rollback()
+            raise RepositoryError("Failed to archive orders batch") from exc
+
+    async def _ensure_partitions(self, months: set[date]) -> None:
+        """
+        Создать помесячные секции архивных таблиц, если их еще нет.
+        """
+        for month in sorted(months):
+            next_month = date(month.year + month.month // 12, month.month % 12 + 1, 1)
+            suffix = month.strftime("%Y_%m")
+            for table in (OrderArchiveModel.__tablename__, OrderItemArchiveModel.__tablename__):
+                await self._session.execute(text(
+                    f"CREATE TABLE IF NOT EXISTS {table}_{suffix} PARTITION OF {table} "
+                    f"FOR VALUES FROM ('{month.isoformat()}') TO ('{next_month.isoformat()}')"
+                ))
+
+    async def _commit(self) -> None:
+        if self._auto_commit:
+            await self._session.commit()
+        else:
+            await self._session.flush()
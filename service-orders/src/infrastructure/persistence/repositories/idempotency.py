@@ -0,0 +1,126 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import delete, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.entity.orders import IdempotencyRecord, Order, OrderId
+from src.infrastructure.persistence.db.schema import IdempotencyKey as IdempotencyKeyModel
+from src.exceptions import RepositoryError
+
+idempotency_keys_table = IdempotencyKeyModel.__table__
+
+
+class IdempotencyRepository:
+    """
+    Хранилище Idempotency-Key создания заказов.
+    """
+
+    def __init__(self, session: AsyncSession, *, auto_commit: bool = True) -> None:
+        self._session: AsyncSession = session
+        self._auto_commit = auto_commit
+
+    async def reserve(self, user_id: str, key: str, request_hash: str) -> bool:
+        """
+        Занять ключ. False, если ключ уже занят.
+
+        При конкурентной вставке того же ключа PostgreSQL дожидается завершения
+        чужой транзакции, поэтому заказ создает ровно один из запросов.
+        """
+        try:
+            stmt = (
+                insert(idempotency_keys_table)
+                .values(user_id=user_id, key=key, request_hash=request_hash)
+                .on_conflict_do_nothing(index_elements=["user_id", "key"])
+                .returning(idempotency_keys_table.c.key)
+            )
+            result = await self._session.execute(stmt)
+            reserved = result.first() is not None
+            await self._commit()
+            return reserved
+        except SQLAlchemyError as exc:
+            await self._session.rollback()
+            raise RepositoryError("Failed to reserve idempotency key") from exc
+
+    async def complete(self, user_id: str, key: str, order: Order) -> None:
+        """
+        Сохранить ответ, выданный по ключу.
+        """
+        try:
+            stmt = (
+                update(idempotency_keys_table)
+                .where(
+                    idempotency_keys_table.c.user_id == user_id,
+                    idempotency_keys_table.c.key == key,
+                )
+                .values(
+                    order_id=order.id,
+                    order_status=order.status,
+                    order_created_at=order.created_at,
+                )
+            )
+            await self._session.execute(stmt)
+            await self._commit()
+        except SQLAlchemyError as exc:
+            await self._session.rollback()
+            raise RepositoryError("Failed to store idempotency key response") from exc
+
+    async def get(self, user_id: str, key: str) -> Optional[IdempotencyRecord]:
+        try:
+            stmt = select(
+                idempotency_keys_table.c.request_hash,
+                idempotency_keys_table.c.order_id,
+                idempotency_keys_table.c.order_status,
+                idempotency_keys_table.c.order_created_at,
+            ).where(
+                idempotency_keys_table.c.user_id == user_id,
+                idempotency_keys_table.c.key == key,
+            )
+            row = (await self._session.execute(stmt)).first()
+        except SQLAlchemyError as exc:
+            raise RepositoryError("Failed to get idempotency key") from exc
+
+        if row is None or row.order_id is None:
+            return None
+
+        return IdempotencyRecord(
+            request_hash=row.request_hash,
+            order=Order(
+                id=OrderId(row.order_id),
+                status=row.order_status,
+                created_at=row.order_created_at,
+            ),
+        )
+
+    async def delete_expired(self, older_than: datetime, limit: int) -> int:
+        """
+        Удалить до limit ключей, созданных раньше older_than. Возвращает число удаленных.
+
+        Кандидаты выбираются по индексу ix_idempotency_keys_created_at с
+        SKIP LOCKED, чтобы не ждать ключи, занятые запросами в работе.
+        """
+        try:
+            expired = (
+                select(idempotency_keys_table.c.user_id, idempotency_keys_table.c.key)
+                .where(idempotency_keys_table.c.created_at < older_than)
+                .order_by(idempotency_keys_table.c.created_at)
+                .limit(limit)
+                .with_for_update(skip_locked=True)
+            )
+            stmt = delete(idempotency_keys_table).where(
+                tuple_(idempotency_keys_table.c.user_id, idempotency_keys_table.c.key).in_(expired)
+            )
+            result = await self._session.execute(stmt)
+            await self._commit()
+            return result.rowcount
+        except SQLAlchemyError as exc:
+            await self._session.rollback()
+            raise RepositoryError("Failed to delete expired idempotency keys") from exc
+
+    async def _commit(self) -> None:
+        if self._auto_commit:
+            await self._session.commit()
+        else:
+            await self._session.flush()
@@ -1,11 +1,16 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import String, UUID as UUIDColumn, any_, bindparam, cast, column, select, tuple_, update, values
+from sqlalchemy.dialects.postgresql import ARRAY
+from collections.abc import AsyncIterator
+from datetime import datetime
 from uuid import UUID
-from src.entity.orders import CreateOrder, Order, OrderId, OrderStatus
+from src.entity.orders import CreateOrder, Order, OrderExport, OrderExportItem, OrderId, OrderStatus
 from sqlalchemy.exc import SQLAlchemyError
 from src.infrastructure.persistence.db.schema import Order as OrderModel, OrderItem as OrderItemModel
 from src.exceptions import RepositoryError, OrderNotFoundError
 
+orders_table = OrderModel.__table__
+
 
 class OrderRepository:
     """
@@ -63,22 +68,181 @@ class OrderRepository:
             order_id: UUID
     ) -> Order:
         """
-        Получить заказ по ID
+        Получить заказ по ID.
+
+        Core-запрос только нужных колонок: строка сразу маппится в entity,
+        минуя гидратацию ORM модели и identity map.
         """
         try:
-            stmt = select(OrderModel).where(OrderModel.id == order_id)
+            stmt = select(
+                orders_table.c.id,
+                orders_table.c.status,
+                orders_table.c.created_at,
+                orders_table.c.version,
+            ).where(orders_table.c.id == order_id)
             result = await self._session.execute(stmt)
-            db_order = result.scalar_one_or_none()
+            row = result.one_or_none()
             
-            if db_order is None:
+            if row is None:
                 raise OrderNotFoundError(order_id=order_id)
             
-            return self._to_entity(db_order)
+            return self._row_to_entity(row)
         except OrderNotFoundError:
             raise
         except SQLAlchemyError as exc:
             raise RepositoryError("Failed to get order by id") from exc
 
+    async def get_orders_by_ids(
+            self,
+            order_ids: list[UUID]
+    ) -> list[Order]:
+        """
+        Получить заказы по списку ID одним запросом WHERE id = ANY(:order_ids).
+
+        Массив передается одним параметром, поэтому план запроса не зависит
+        от количества ID. Ненайденные ID просто отсутствуют в результате.
+        """
+        if not order_ids:
+            return []
+
+        try:
+            stmt = select(
+                orders_table.c.id,
+                orders_table.c.status,
+                orders_table.c.created_at,
+                orders_table.c.version,
+            ).where(
+                orders_table.c.id == any_(
+                    bindparam("order_ids", order_ids, type_=ARRAY(UUIDColumn(as_uuid=True)))
+                )
+            )
+            result = await self._session.execute(stmt)
+            return [self._row_to_entity(row) for row in result]
+        except SQLAlchemyError as exc:
+            raise RepositoryError("Failed to get orders by ids") from exc
+
+    async def list_customer_orders(
+            self,
+            customer_id: str,
+            limit: int,
+            *,
+            after: tuple[datetime, UUID] | None = None,
+            status: OrderStatus | None = None
+    ) -> list[Order]:
+        """
+        Получить заказы клиента от новых к старым.
+
+        Keyset пагинация по (created_at, id): after - ключ последнего заказа
+        предыдущей страницы. Запрос обслуживается индексом
+        ix_orders_customer_id_created_at_id, поэтому стоимость страницы не
+        зависит от глубины пагинации.
+        """
+        try:
+            stmt = (
+                select(OrderModel.id, OrderModel.status, OrderModel.created_at)
+                .where(OrderModel.customer_id == customer_id)
+                .order_by(OrderModel.created_at.desc(), OrderModel.id.desc())
+                .limit(limit)
+            )
+            if status is not None:
+                stmt = stmt.where(OrderModel.status == status)
+            if after is not None:
+                stmt = stmt.where(
+                    tuple_(OrderModel.created_at, OrderModel.id) < tuple_(*after)
+                )
+
+            result = await self._session.execute(stmt)
+            # version не выбирается: его нет в покрывающем индексе, а ETag истории не нужен
+            return [
+                Order(id=OrderId(row.id), status=row.status, created_at=row.created_at)
+                for row in result
+            ]
+        except SQLAlchemyError as exc:
+            raise RepositoryError("Failed to list customer orders") from exc
+
+    async def stream_orders_with_items(
+            self,
+            *,
+            chunk_size: int,
+            created_from: datetime | None = None,
+            created_to: datetime | None = None,
+            status: OrderStatus | None = None
+    ) -> AsyncIterator[OrderExport]:
+        """
+        Потоково выгрузить заказы вместе с позициями.
+
+        Заказы читаются keyset чанками по (created_at, id) через индекс
+        ix_orders_created_at_id, позиции чанка - одним запросом по
+        order_id = ANY(:order_ids). Память и стоимость запроса ограничены
+        chunk_size и не зависят от объема выгрузки.
+        """
+        orders_stmt = (
+            select(
+                OrderModel.id,
+                OrderModel.customer_id,
+                OrderModel.status,
+                OrderModel.order_amount,
+                OrderModel.created_at,
+            )
+            .order_by(OrderModel.created_at, OrderModel.id)
+            .limit(chunk_size)
+        )
+        if created_from is not None:
+            orders_stmt = orders_stmt.where(OrderModel.created_at >= created_from)
+        if created_to is not None:
+            orders_stmt = orders_stmt.where(OrderModel.created_at < created_to)
+        if status is not None:
+            orders_stmt = orders_stmt.where(OrderModel.status == status)
+
+        after: tuple[datetime, UUID] | None = None
+        try:
+            while True:
+                stmt = orders_stmt
+                if after is not None:
+                    stmt = stmt.where(tuple_(OrderModel.created_at, OrderModel.id) > tuple_(*after))
+                rows = (await self._session.execute(stmt)).all()
+                if not rows:
+                    return
+
+                items = await self._get_export_items([row.id for row in rows])
+                for row in rows:
+                    yield OrderExport(
+                        id=OrderId(row.id),
+                        customer_id=row.customer_id,
+                        status=row.status,
+                        amount=row.order_amount,
+                        created_at=row.created_at,
+                        items=items.get(row.id, []),
+                    )
+
+                if len(rows) < chunk_size:
+                    return
+                after = (rows[-1].created_at, rows[-1].id)
+        except SQLAlchemyError as exc:
+            raise RepositoryError("Failed to stream orders for export") from exc
+
+    async def _get_export_items(self, order_ids: list[UUID]) -> dict[UUID, list[OrderExportItem]]:
+        stmt = (
+            select(
+                OrderItemModel.order_id,
+                OrderItemModel.product_id,
+                OrderItemModel.quantity,
+                OrderItemModel.price,
+            )
+            .where(
+                OrderItemModel.order_id == any_(
+                    bindparam("order_ids", order_ids, type_=ARRAY(UUIDColumn(as_uuid=True)))
+                )
+            )
+            .order_by(OrderItemModel.order_id, OrderItemModel.id)
+        )
+        items: dict[UUID, list[OrderExportItem]] = {}
+        for row in await self._session.execute(stmt):
+            items.setdefault(row.order_id, []).append(
+                OrderExportItem(product_id=row.product_id, quantity=row.quantity, price=row.price)
+            )
+        return items
+
     async def update_order_status(
         self,
         order_id: UUID,
@@ -96,6 +260,7 @@ class OrderRepository:
                 raise OrderNotFoundError(order_id=order_id)
             
             db_order.status = status
+            db_order.version = OrderModel.version + 1
             await self._commit()
             await self._session.refresh(db_order)
             return self._to_entity(db_order)
@@ -105,6 +270,43 @@ class OrderRepository:
             await self._session.rollback()
             raise RepositoryError("Failed to update order status") from exc
 
+    async def bulk_update_status(
+        self,
+        updates: dict[UUID, OrderStatus]
+    ) -> dict[UUID, int]:
+        """
+        Обновить статусы нескольких заказов одним UPDATE ... FROM (VALUES ...).
+
+        Возвращает новые версии заказов, которые были найдены и обновлены.
+        """
+        if not updates:
+            return {}
+
+        try:
+            new_statuses = values(
+                column("id", UUIDColumn(as_uuid=True)),
+                column("status", String),
+                name="new_statuses",
+            ).data([(order_id, status.value) for order_id, status in updates.items()])
+
+            stmt = (
+                update(OrderModel)
+                .where(OrderModel.id == new_statuses.c.id)
+                .values(
+                    status=cast(new_statuses.c.status, OrderModel.status.type),
+                    version=OrderModel.version + 1,
+                )
+                .returning(OrderModel.id, OrderModel.version)
+                .execution_options(synchronize_session=False)
+            )
+            result = await self._session.execute(stmt)
+            updated_versions = {row.id: row.version for row in result}
+            await self._commit()
+            return updated_versions
+        except SQLAlchemyError as exc:
+            await self._session.rollback()
+            raise RepositoryError("Failed to bulk update order statuses") from exc
+
     @staticmethod
     def _to_entity(order: OrderModel) -> Order:
         """
@@ -114,9 +316,22 @@ class OrderRepository:
             id=OrderId(order.id),
             status=order.status,
             created_at=order.created_at,
+            version=order.version,
         )
 
 
+    @staticmethod
+    def _row_to_entity(row) -> Order:
+        """
+        Преобразование строки (id, status, created_at, version) в объект entity.
+        """
+        return Order(
+            id=OrderId(row.id),
+            status=row.status,
+            created_at=row.created_at,
+            version=row.version,
+        )
+
     async def _commit(self) -> None:
         if self._auto_commit:
             await self._session.commit()
@@ -1,11 +1,16 @@
 import contextlib
 import dataclasses
+import time
 from collections.abc import AsyncGenerator
+from typing import Optional
 
 from src.exceptions import UnitOfWorkError, RepositoryError, DatabaseConnectionError
 from src.infrastructure.persistence.db import Database
+from src.infrastructure.admission.load_monitor import LoadMonitor
 from src.infrastructure.persistence.repositories.orders import OrderRepository
 from src.infrastructure.persistence.repositories.outbox import OutboxRepository
+from src.infrastructure.persistence.repositories.idempotency import IdempotencyRepository
+from src.infrastructure.persistence.repositories.archive import ArchiveRepository
 from sqlalchemy.exc import SQLAlchemyError
 
 
@@ -18,6 +23,8 @@ class Repository:
 
     orders: OrderRepository
     outbox: OutboxRepository
+    idempotency: IdempotencyRepository
+    archive: ArchiveRepository
 
 
 class UnitOfWork:
@@ -25,17 +32,33 @@ class UnitOfWork:
     Обработка жизненного цикла для commit/rollback логики.
     """
 
-    def __init__(self, db: Database) -> None:
+    def __init__(self, db: Database, load_monitor: Optional[LoadMonitor] = None) -> None:
         self.db: Database = db
+        self._load_monitor = load_monitor
+
+    @property
+    def has_replicas(self) -> bool:
+        return self.db.has_replicas
 
     @contextlib.asynccontextmanager
-    async def init(self) -> AsyncGenerator[Repository, None]:
-        async with self.db.connection() as conn:
+    async def init(self, read_only: bool = False) -> AsyncGenerator[Repository, None]:
+        """
+        Открыть транзакцию. В режиме read_only чтение идет с реплики, если она настроена.
+        """
+        async with self.db.connection(read_only=read_only) as conn:
             async with conn.begin():
                 try:
+                    if self._load_monitor is not None:
+                        # Соединение берется из пула сразу, чтобы замерить ожидание пула
+                        started = time.perf_counter()
+                        await conn.connection()
+                        self._load_monitor.observe_pool_wait(time.perf_counter() - started)
+
                     yield Repository(
                         orders=OrderRepository(conn, auto_commit=False),
                         outbox=OutboxRepository(conn, auto_commit=False),
+                        idempotency=IdempotencyRepository(conn, auto_commit=False),
+                        archive=ArchiveRepository(conn, auto_commit=False),
                     )
                 except (SQLAlchemyError, DatabaseConnectionError) as exc:
                     await conn.rollback()
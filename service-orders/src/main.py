@@ -1,16 +1,24 @@
 import asyncio
+import signal
 
-from contextlib import asynccontextmanager
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import AsyncIterator
+from uuid import UUID
 
 import fastapi
 
+from src.api.admission import AdmissionControlMiddleware
 from src.api.handlers.orders.orders_handler import router
 from src.container import Container
-from src.settings import settings
+from src.entity.orders import OrderStatus
+from src.settings import AppRole, settings
 from src.logger import logger
 from src.usecase.orders.orders_usecase import OrderUseCase
 from src.infrastructure.messaging.outbox_publisher import OutboxPublisher
-from src.exceptions import AppError, MessagingError, SubscriptionError
+from src.infrastructure.persistence.archiver import OrderArchiver
+from src.infrastructure.persistence.idempotency_sweeper import IdempotencyKeySweeper
+from src.infrastructure.admission.load_monitor import LoadMonitor
+from src.exceptions import AppError, MessagingError, OrderNotFoundError, SubscriptionError
 
 
 def create_container() -> Container:
@@ -26,12 +34,37 @@ def create_container() -> Container:
     return container
 
 
+def reset_worker_resources(container: Container) -> None:
+    """
+    Сбросить singleton-ы с сокетами (пулы БД, соединение с брокером) после fork.
+
+    Они создаются лениво при первом обращении, поэтому каждый воркер откроет
+    собственные соединения, даже если мастер успел их создать до fork.
+    """
+    container.infrastructure.db.reset()
+    container.infrastructure.uow.reset()
+    container.infrastructure.rabbitmq_client.reset()
+    container.infrastructure.outbox_publisher.reset()
+    container.infrastructure.order_archiver.reset()
+    container.infrastructure.idempotency_key_sweeper.reset()
+    container.usecase.order_usecase.reset()
+
+
 async def start_event_consumer(container: Container):
     try:
         rabbitmq_client = container.infrastructure.rabbitmq_client()
 
         order_usecase: OrderUseCase = container.usecase.order_usecase()
 
+        async def broadcast_statuses(orders: list[dict]) -> None:
+            """
+            Статусы уже сохранены в БД, поэтому сбой рассылки не повод для retry события.
+            """
+            try:
+                await rabbitmq_client.publish_order_statuses(orders)
+            except MessagingError as e:
+                logger.warning("Failed to broadcast order statuses: %s", e)
+
         async def handle_order_processed(message: dict) -> None:
             """
             Обработчик событий order.processed.
@@ -40,17 +73,54 @@ async def start_event_consumer(container: Container):
             order_id = message.get("order_id")
             status = message.get("status")
 
-            await order_usecase.update_order_status_from_event(
+            order = await order_usecase.update_order_status_from_event(
                 order_id=order_id,
                 status=status
             )
+            await broadcast_statuses([
+                {"id": str(order.id), "status": order.status.value, "version": order.version}
+            ])
+
+        async def handle_order_processed_batch(messages: list[dict]) -> dict[str, Exception]:
+            """
+            Пакетный обработчик событий order.processed.
+            Возвращает ошибки по отдельным заказам для поштучного retry/DLQ.
+            """
+            result = await order_usecase.update_order_statuses_from_events(
+                [(message.get("order_id"), message.get("status")) for message in messages]
+            )
+            if result.updated:
+                await broadcast_statuses([
+                    {
+                        "id": str(updated_id),
+                        "status": updated_status.value,
+                        "version": result.versions[updated_id],
+                    }
+                    for updated_id, updated_status in result.updated.items()
+                ])
+
+            failures: dict[str, Exception] = {
+                order_id: OrderNotFoundError(order_id=order_id) for order_id in result.missing
+            }
+            failures.update({
+                order_id: ValueError("Invalid order_id format: %s" % order_id)
+                for order_id in result.invalid
+            })
+            return failures
+
+        if settings.ORDER_PROCESSED_BATCH_SIZE > 1:
+            subscription = rabbitmq_client.subscribe_to_order_processed_batch(
+                handle_order_processed_batch,
+                batch_size=settings.ORDER_PROCESSED_BATCH_SIZE,
+                flush_interval=settings.ORDER_PROCESSED_BATCH_INTERVAL,
+            )
+        else:
+            subscription = rabbitmq_client.subscribe_to_order_processed(handle_order_processed)
+
+        subscribe_task = asyncio.create_task(subscription)
 
-        subscribe_task = asyncio.create_task(
-            rabbitmq_client.subscribe_to_order_processed(handle_order_processed)
-        )
-        
         return subscribe_task
-        
+
     except (MessagingError, SubscriptionError) as e:
         logger.error("Failed to start event consumer: %s", e, exc_info=True)
         raise
@@ -59,33 +129,106 @@ async def start_event_consumer(container: Container):
         raise
 
 
-@asynccontextmanager
-async def lifespan(app: fastapi.FastAPI):
+async def start_status_listener(container: Container) -> asyncio.Task:
     """
-    Управление жизненным циклом приложения
+    Подписка API процесса на рассылку статусов: обновляет кэш статусов и OrderStatusHub.
     """
-    container = app.container
-
     rabbitmq_client = container.infrastructure.rabbitmq_client()
-    await rabbitmq_client.connect()
-    outbox_publisher: OutboxPublisher = container.infrastructure.outbox_publisher()
-    await outbox_publisher.start()
+    order_usecase: OrderUseCase = container.usecase.order_usecase()
+
+    def handle_status_broadcast(message: dict) -> None:
+        for order in message.get("orders", []):
+            order_usecase.notify_status_changed(
+                UUID(order["id"]),
+                OrderStatus(order["status"]),
+                int(order["version"]),
+            )
 
-    subscribe_task = None
+    return asyncio.create_task(
+        rabbitmq_client.subscribe_to_order_status_broadcast(handle_status_broadcast)
+    )
+
+
+async def _cancel_task(task: asyncio.Task) -> None:
+    if not task.done():
+        task.cancel()
     try:
-        subscribe_task = await start_event_consumer(container)
+        await task
+    except asyncio.CancelledError:
+        pass
+
+
+@asynccontextmanager
+async def run_role(container: Container, role: AppRole) -> AsyncIterator[None]:
+    """
+    Запустить фоновые компоненты роли процесса и остановить их в обратном порядке.
+
+    api - обработка HTTP и доставка статусов подписчикам SSE/long-poll,
+    relay - публикация outbox, очистка Idempotency-Key и архивация,
+    consumer - события order.processed, all - все вместе в одном процессе.
+    """
+    async with AsyncExitStack() as stack:
+        rabbitmq_client = container.infrastructure.rabbitmq_client()
+        await rabbitmq_client.connect()
+        stack.push_async_callback(rabbitmq_client.disconnect)
+
+        if role in (AppRole.API, AppRole.ALL):
+            load_monitor: LoadMonitor = container.infrastructure.load_monitor()
+            await load_monitor.start()
+            stack.push_async_callback(load_monitor.stop)
+
+            listener_task = await start_status_listener(container)
+            stack.push_async_callback(_cancel_task, listener_task)
+
+        if role in (AppRole.RELAY, AppRole.ALL):
+            outbox_publisher: OutboxPublisher = container.infrastructure.outbox_publisher()
+            await outbox_publisher.start()
+            stack.push_async_callback(outbox_publisher.stop)
+
+            idempotency_key_sweeper: IdempotencyKeySweeper = container.infrastructure.idempotency_key_sweeper()
+            await idempotency_key_sweeper.start()
+            stack.push_async_callback(idempotency_key_sweeper.stop)
+
+            if settings.ARCHIVE_ENABLED:
+                order_archiver: OrderArchiver = container.infrastructure.order_archiver()
+                await order_archiver.start()
+                stack.push_async_callback(order_archiver.stop)
+
+        if role in (AppRole.CONSUMER, AppRole.ALL):
+            subscribe_task = await start_event_consumer(container)
+            stack.push_async_callback(_cancel_task, subscribe_task)
+
+        logger.info("Order service started in role %s", role.value)
         yield
+
+
+@asynccontextmanager
+async def lifespan(app: fastapi.FastAPI):
+    """
+    Управление жизненным циклом приложения
+    """
+    try:
+        async with run_role(app.container, settings.APP_ROLE):
+            yield
     finally:
-        await outbox_publisher.stop()
+        logger.info("Order service stopped")
 
-        if subscribe_task and not subscribe_task.done():
-            subscribe_task.cancel()
-            try:
-                await subscribe_task
-            except asyncio.CancelledError:
-                pass
 
-        await rabbitmq_client.disconnect()
+async def run_worker(role: AppRole) -> None:
+    """
+    Запуск фоновой роли (relay или consumer) без HTTP сервера до SIGINT/SIGTERM.
+    """
+    container = create_container()
+    stop_event = asyncio.Event()
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop_event.set)
+
+    try:
+        async with run_role(container, role):
+            await stop_event.wait()
+    finally:
         logger.info("Order service stopped")
 
 
@@ -93,7 +236,19 @@ def create_app() -> fastapi.FastAPI:
     app = fastapi.FastAPI(lifespan=lifespan)
     app.container = create_container()
     app.include_router(router)
-    return app
 
+    if settings.ADMISSION_ENABLED:
+        app.add_middleware(
+            AdmissionControlMiddleware,
+            routes=router.routes,
+            load_monitor=app.container.infrastructure.load_monitor(),
+            initial_limit=settings.ADMISSION_INITIAL_LIMIT,
+            min_limit=settings.ADMISSION_MIN_LIMIT,
+            max_limit=settings.ADMISSION_MAX_LIMIT,
+            pool_wait_target=settings.ADMISSION_POOL_WAIT_TARGET_SECONDS,
+            loop_lag_target=settings.ADMISSION_LOOP_LAG_TARGET_SECONDS,
+            retry_after=settings.ADMISSION_RETRY_AFTER_SECONDS,
+            exempt_routes={"order_events", "wait_order_status"},
+        )
 
-app = create_app()
\ No newline at end of file
+    return app
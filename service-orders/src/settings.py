@@ -1,16 +1,38 @@
 import os
+from enum import Enum
 from pathlib import Path
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
+class AppRole(str, Enum):
+    API = "api"
+    RELAY = "relay"
+    CONSUMER = "consumer"
+    ALL = "all"
+
+
 class Settings(BaseSettings):
+    APP_ROLE: AppRole = AppRole.ALL
+    API_HOST: str = "0.0.0.0"
+    API_PORT: int = 8000
+
     DB_HOST: str
     DB_PORT: str
     DB_NAME: str
     DB_USER: str
     DB_PASS: str
 
+    DB_POOL_SIZE: int = 20
+    DB_MAX_OVERFLOW: int = 10
+    DB_BACKGROUND_POOL_SIZE: int = 5
+    DB_BACKGROUND_MAX_OVERFLOW: int = 2
+    DB_ECHO: bool = False
+    WEB_CONCURRENCY: int = 1
+
+    DB_REPLICA_DSNS: str = ""
+    DB_REPLICA_STALENESS_SECONDS: float = 5.0
+
     RABBIT_HOST: str
     RABBIT_PORT: int
     RABBIT_USER: str
@@ -26,10 +48,45 @@ class Settings(BaseSettings):
     ORDER_PROCESSED_EXCHANGE: str
     ORDER_PROCESSED_ROUTING_KEY: str
 
+    ORDER_STATUS_BROADCAST_EXCHANGE: str = "orders.status.broadcast"
+
     OUTBOX_BATCH_SIZE: int
     OUTBOX_POLL_INTERVAL: float
     OUTBOX_MAX_RETRIES: int
 
+    ORDER_PROCESSED_BATCH_SIZE: int = 1
+    ORDER_PROCESSED_BATCH_INTERVAL: float = 0.05
+
+    EXPORT_CHUNK_SIZE: int = 1000
+    ORDER_STATUS_BATCH_MAX_IDS: int = 100
+
+    ORDER_EVENTS_KEEPALIVE_SECONDS: float = 15.0
+    ORDER_STATUS_WAIT_MAX_SECONDS: float = 30.0
+
+    ORDER_STATUS_CACHE_SIZE: int = 100000
+    ORDER_STATUS_CACHE_TTL_SECONDS: float = 5.0
+
+    IDEMPOTENCY_CACHE_SIZE: int = 10000
+    IDEMPOTENCY_CACHE_TTL_SECONDS: float = 3600.0
+    IDEMPOTENCY_KEY_TTL_SECONDS: float = 86400.0
+    IDEMPOTENCY_SWEEP_BATCH_SIZE: int = 1000
+    IDEMPOTENCY_SWEEP_INTERVAL_SECONDS: float = 300.0
+
+    ADMISSION_ENABLED: bool = True
+    ADMISSION_INITIAL_LIMIT: int = 64
+    ADMISSION_MIN_LIMIT: int = 4
+    ADMISSION_MAX_LIMIT: int = 512
+    ADMISSION_POOL_WAIT_TARGET_SECONDS: float = 0.05
+    ADMISSION_LOOP_LAG_TARGET_SECONDS: float = 0.1
+    ADMISSION_RETRY_AFTER_SECONDS: int = 1
+    ORDER_RATE_LIMIT_PER_SECOND: float = 5.0
+    ORDER_RATE_LIMIT_BURST: int = 20
+
+    ARCHIVE_ENABLED: bool = False
+    ARCHIVE_RETENTION_DAYS: int = 90
+    ARCHIVE_BATCH_SIZE: int = 500
+    ARCHIVE_INTERVAL_SECONDS: float = 300.0
+
     MAX_RETRY_ATTEMPTS: int
     RETRY_DELAY_BASE_SECONDS: int
     DLX_NAME: str
@@ -4,21 +4,32 @@
 
 from dependency_injector import containers, providers
 
-from src.infrastructure.persistence.repositories.orders import OrderRepository
 from src.infrastructure.persistence.uow import UnitOfWork
 from src.usecase.orders.orders_usecase import OrderUseCase
 from src.infrastructure.messaging.rabbitmq_client import RabbitMQClient
+from src.infrastructure.messaging.status_hub import OrderStatusHub
+from src.infrastructure.cache.ttl_lru import TTLLRUCache
+from src.infrastructure.admission.limits import TokenBucketLimiter
 
 
 class UseCaseContainer(containers.DeclarativeContainer):
 
-    order_repository: providers.Dependency[OrderRepository] = providers.Dependency()
     uow: providers.Dependency[UnitOfWork] = providers.Dependency()
     rabbitmq_client: providers.Dependency[RabbitMQClient] = providers.Dependency()
+    status_hub: providers.Dependency[OrderStatusHub] = providers.Dependency()
+    idempotency_cache: providers.Dependency[TTLLRUCache] = providers.Dependency()
+    rate_limiter: providers.Dependency[TokenBucketLimiter] = providers.Dependency()
+    status_cache: providers.Dependency[TTLLRUCache] = providers.Dependency()
+    replica_staleness_seconds: providers.Dependency[float] = providers.Dependency(default=0.0)
 
-    order_usecase = providers.Factory(
+    # Usecase не хранит состояние запроса: один экземпляр на процесс
+    order_usecase = providers.Singleton(
         OrderUseCase,
-        repository=order_repository,
         uow=uow,
         rabbitmq_client=rabbitmq_client,
+        status_hub=status_hub,
+        idempotency_cache=idempotency_cache,
+        rate_limiter=rate_limiter,
+        status_cache=status_cache,
+        replica_staleness_seconds=replica_staleness_seconds,
     )
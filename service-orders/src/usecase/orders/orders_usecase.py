@@ -1,11 +1,40 @@
+import base64
+import binascii
+import hashlib
 import json
+from collections.abc import AsyncIterator
+from datetime import datetime, timedelta
 from uuid import UUID
 
-from src.entity.orders import CreateOrder, Order, OrderId, OrderStatus
-from src.infrastructure.persistence.repositories.orders import OrderRepository
+from src.entity.orders import (
+    CreateOrder,
+    IdempotencyRecord,
+    Order,
+    OrderExport,
+    OrderId,
+    OrderStatus,
+    OrdersPage,
+    StatusBatchResult,
+)
+from src.exceptions import (
+    IdempotencyKeyConflictError,
+    InvalidCursorError,
+    OrderNotFoundError,
+    RateLimitExceededError,
+)
+from src.infrastructure.admission.limits import TokenBucketLimiter
+from src.infrastructure.cache.ttl_lru import TTLLRUCache
 from src.infrastructure.persistence.uow import UnitOfWork
+from src.infrastructure.messaging.status_hub import OrderStatusHub, StatusSubscription
 from src.settings import settings
 
+PROCESSOR_STATUS_MAPPING = {
+    "SUCCESS": OrderStatus.COMPLETED,
+    "FAILED": OrderStatus.FAILED,
+    "PROCESSING": OrderStatus.IN_PROGRESS,
+}
+
+
 class OrderUseCase:
     """
     Координирует операции заказов между репозиториями и уровнем обмена сообщениями.
@@ -13,28 +42,104 @@ class OrderUseCase:
 
     def __init__(
             self,
-            repository: OrderRepository,
             uow: UnitOfWork,
-            rabbitmq_client=None
+            rabbitmq_client=None,
+            status_hub: OrderStatusHub | None = None,
+            idempotency_cache: TTLLRUCache[IdempotencyRecord] | None = None,
+            rate_limiter: TokenBucketLimiter | None = None,
+            status_cache: TTLLRUCache[Order] | None = None,
+            replica_staleness_seconds: float = 0.0
     ) -> None:
-        self._repository = repository
         self._uow = uow
         self._rabbitmq_client = rabbitmq_client
+        self._status_hub = status_hub or OrderStatusHub()
+        self._idempotency_cache = idempotency_cache if idempotency_cache is not None else TTLLRUCache()
+        self._rate_limiter = rate_limiter
+        self._status_cache = status_cache
+        self._replica_staleness = timedelta(seconds=replica_staleness_seconds)
 
     async def create_order(
             self,
-            payload: CreateOrder
+            payload: CreateOrder,
+            idempotency_key: str | None = None
     ) -> Order:
+        """
+        Создать заказ. С idempotency_key повторный запрос возвращает ранее созданный заказ.
+        """
+        if idempotency_key is None:
+            self._check_rate_limit(payload.user_id)
+            async with self._uow.init() as repositories:
+                return await self._create_order(repositories, payload)
+
+        cache_key = (payload.user_id, idempotency_key)
+        request_hash = self._request_hash(payload)
+
+        record = self._idempotency_cache.get(cache_key)
+        if record is not None:
+            return self._replay(record, request_hash, idempotency_key)
+
+        # Повторы из кэша бесплатны и в лимит не засчитываются
+        self._check_rate_limit(payload.user_id)
         async with self._uow.init() as repositories:
-            order = await repositories.orders.create_order(payload)
-            
-            if payload.products:
-                products_list = self._normalize_products(payload.products)
-                await self._create_order_created_event(
-                    repositories, order, payload, products_list
-                )
+            reserved = await repositories.idempotency.reserve(
+                payload.user_id, idempotency_key, request_hash
+            )
+            if reserved:
+                order = await self._create_order(repositories, payload)
+                await repositories.idempotency.complete(payload.user_id, idempotency_key, order)
+                record = IdempotencyRecord(request_hash=request_hash, order=order)
+            else:
+                record = await repositories.idempotency.get(payload.user_id, idempotency_key)
 
-            return order
+        if record is None:
+            raise IdempotencyKeyConflictError(
+                "Idempotency key is in use by another request",
+                context={"idempotency_key": idempotency_key},
+            )
+
+        self._idempotency_cache.set(cache_key, record)
+        return self._replay(record, request_hash, idempotency_key)
+
+    def _check_rate_limit(self, user_id: str) -> None:
+        if self._rate_limiter is None:
+            return
+
+        retry_after = self._rate_limiter.acquire(user_id)
+        if retry_after > 0:
+            raise RateLimitExceededError(user_id=user_id, retry_after=retry_after)
+
+    async def _create_order(self, repositories, payload: CreateOrder) -> Order:
+        order = await repositories.orders.create_order(payload)
+
+        if payload.products:
+            products_list = self._normalize_products(payload.products)
+            await self._create_order_created_event(
+                repositories, order, payload, products_list
+            )
+
+        return order
+
+    def _replay(self, record: IdempotencyRecord, request_hash: str, idempotency_key: str) -> Order:
+        if record.request_hash != request_hash:
+            raise IdempotencyKeyConflictError(
+                "Idempotency key was already used with a different request",
+                context={"idempotency_key": idempotency_key},
+            )
+        return record.order
+
+    def _request_hash(self, payload: CreateOrder) -> str:
+        """
+        Отпечаток тела запроса: один ключ нельзя переиспользовать для другого заказа.
+        """
+        fingerprint = json.dumps(
+            {
+                "user_id": payload.user_id,
+                "products": self._normalize_products(payload.products),
+                "amount": str(payload.amount),
+            },
+            sort_keys=True,
+        )
+        return hashlib.sha256(fingerprint.encode()).hexdigest()
 
     def _normalize_products(self, products) -> list[dict]:
         """
@@ -90,10 +195,191 @@ class OrderUseCase:
         )
 
     async def get_order_status(self, order_id: OrderId) -> Order:
-        async with self._uow.init() as repositories:
-            order_uuid = UUID(str(order_id))
-            order = await repositories.orders.get_order_by_id(order_uuid)
-            return order
+        order_uuid = UUID(str(order_id))
+        try:
+            order = await self._get_live_order(order_uuid)
+        except OrderNotFoundError:
+            # Завершенный заказ мог быть перенесен архиватором
+            order = await self._get_archived_order(order_uuid)
+
+        self._remember_status(order)
+        return order
+
+    async def _get_live_order(self, order_uuid: UUID) -> Order:
+        guard_enabled = self._staleness_guard_enabled()
+
+        try:
+            async with self._uow.init(read_only=True) as repositories:
+                order = await repositories.orders.get_order_by_id(order_uuid)
+        except OrderNotFoundError:
+            # Свежесозданный заказ мог еще не доехать до реплики
+            if not guard_enabled:
+                raise
+            order = None
+
+        if guard_enabled and (order is None or self._is_recent(order)):
+            async with self._uow.init() as repositories:
+                order = await repositories.orders.get_order_by_id(order_uuid)
+
+        return order
+
+    async def _get_archived_order(self, order_uuid: UUID) -> Order:
+        async with self._uow.init(read_only=True) as repositories:
+            archived = await repositories.archive.get_orders_by_ids([order_uuid])
+        if not archived:
+            raise OrderNotFoundError(order_id=order_uuid)
+        return archived[0]
+
+    def get_cached_order_status(self, order_id: OrderId) -> Order | None:
+        """
+        Последнее известное процессу состояние заказа без обращения к БД.
+        """
+        if self._status_cache is None:
+            return None
+        return self._status_cache.get(UUID(str(order_id)))
+
+    def notify_status_changed(self, order_id: UUID, status: OrderStatus, version: int) -> None:
+        """
+        Применить разосланное consumer-ом изменение статуса: кэш и подписчики hub.
+        """
+        if self._status_cache is not None:
+            cached = self._status_cache.get(order_id)
+            if cached is not None and cached.version < version:
+                self._status_cache.set(
+                    order_id,
+                    Order(id=cached.id, status=status, created_at=cached.created_at, version=version)
+                )
+        self._status_hub.publish(order_id, status)
+
+    def _remember_status(self, order: Order) -> None:
+        if self._status_cache is None:
+            return
+        # Реплика может отставать от уже полученной рассылки: версия не откатывается
+        cached = self._status_cache.get(order.id)
+        if cached is None or cached.version <= order.version:
+            self._status_cache.set(order.id, order)
+
+    async def list_customer_orders(
+        self,
+        customer_id: str,
+        limit: int,
+        cursor: str | None = None,
+        status: OrderStatus | None = None,
+    ) -> OrdersPage:
+        """
+        Страница истории заказов клиента.
+
+        История покрывает только горячую таблицу: заказы, перенесенные
+        архиватором (старше ARCHIVE_RETENTION_DAYS), в нее не попадают.
+        """
+        after = self._decode_cursor(cursor) if cursor else None
+
+        async with self._uow.init(read_only=True) as repositories:
+            # Берем на один заказ больше, чтобы понять, есть ли следующая страница
+            orders = await repositories.orders.list_customer_orders(
+                customer_id,
+                limit + 1,
+                after=after,
+                status=status,
+            )
+
+        if len(orders) <= limit:
+            return OrdersPage(items=orders)
+
+        items = orders[:limit]
+        return OrdersPage(items=items, next_cursor=self._encode_cursor(items[-1]))
+
+    async def export_orders(
+        self,
+        *,
+        created_from: datetime | None = None,
+        created_to: datetime | None = None,
+        status: OrderStatus | None = None,
+    ) -> AsyncIterator[OrderExport]:
+        """
+        Потоковая выгрузка заказов с позициями для аналитики.
+        Архивные заказы не выгружаются, как и в истории клиента.
+        """
+        async with self._uow.init(read_only=True) as repositories:
+            async for order in repositories.orders.stream_orders_with_items(
+                chunk_size=settings.EXPORT_CHUNK_SIZE,
+                created_from=created_from,
+                created_to=created_to,
+                status=status,
+            ):
+                yield order
+
+    @staticmethod
+    def _encode_cursor(order: Order) -> str:
+        raw = f"{order.created_at.isoformat()}|{order.id}".encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    @staticmethod
+    def _decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            created_at, order_id = base64.urlsafe_b64decode(padded).decode().split("|")
+            return datetime.fromisoformat(created_at), UUID(order_id)
+        except (binascii.Error, UnicodeDecodeError, ValueError) as exc:
+            raise InvalidCursorError("Invalid pagination cursor") from exc
+
+    async def subscribe_order_status(
+        self,
+        order_id: OrderId
+    ) -> tuple[Order, StatusSubscription]:
+        """
+        Подписаться на изменения статуса заказа и получить текущее состояние.
+
+        Подписка регистрируется до чтения из БД, чтобы обновление, пришедшее
+        между чтением и подпиской, не потерялось. Подписку нужно закрыть.
+        """
+        subscription = self._status_hub.subscribe(UUID(str(order_id)))
+        try:
+            order = await self.get_order_status(order_id)
+        except BaseException:
+            subscription.close()
+            raise
+        return order, subscription
+
+    async def get_order_statuses(self, order_ids: list[OrderId]) -> dict[OrderId, Order]:
+        """
+        Статусы нескольких заказов одним запросом. Ненайденные заказы в результат не попадают.
+        """
+        order_uuids = list(dict.fromkeys(UUID(str(order_id)) for order_id in order_ids))
+
+        async with self._uow.init(read_only=True) as repositories:
+            orders = {
+                order.id: order
+                for order in await repositories.orders.get_orders_by_ids(order_uuids)
+            }
+
+        if self._staleness_guard_enabled():
+            stale_ids = [
+                order_uuid for order_uuid in order_uuids
+                if order_uuid not in orders or self._is_recent(orders[order_uuid])
+            ]
+            if stale_ids:
+                async with self._uow.init() as repositories:
+                    for order in await repositories.orders.get_orders_by_ids(stale_ids):
+                        orders[order.id] = order
+
+        # Ненайденные в горячей таблице ищем в архиве завершенных заказов
+        missing_ids = [order_uuid for order_uuid in order_uuids if order_uuid not in orders]
+        if missing_ids:
+            async with self._uow.init(read_only=True) as repositories:
+                for order in await repositories.archive.get_orders_by_ids(missing_ids):
+                    orders[order.id] = order
+
+        return orders
+
+    def _staleness_guard_enabled(self) -> bool:
+        return bool(self._replica_staleness) and self._uow.has_replicas
+
+    def _is_recent(self, order: Order) -> bool:
+        """
+        Заказ создан недавно и его статус на реплике может отставать от primary.
+        """
+        return datetime.utcnow() - order.created_at < self._replica_staleness
 
     async def update_order_status_from_event(
         self,
@@ -108,13 +394,7 @@ class OrderUseCase:
             logger.error("Invalid order_id format: %s", order_id)
             raise ValueError("Invalid order_id format: %s" % order_id)
 
-        status_mapping = {
-            "SUCCESS": OrderStatus.COMPLETED,
-            "FAILED": OrderStatus.FAILED,
-            "PROCESSING": OrderStatus.IN_PROGRESS,
-        }
-        
-        order_status = status_mapping.get(status, OrderStatus.IN_PROGRESS)
+        order_status = PROCESSOR_STATUS_MAPPING.get(status, OrderStatus.IN_PROGRESS)
         
         async with self._uow.init() as repositories:
             order = await repositories.orders.update_order_status(
@@ -129,3 +409,56 @@ class OrderUseCase:
             )
             
             return order
+
+    async def update_order_statuses_from_events(
+        self,
+        events: list[tuple[str, str]],
+    ) -> StatusBatchResult:
+        """
+        Пакетное обновление статусов заказов из событий order.processed.
+
+        Для каждого заказа применяется последний статус из пачки. Невалидные
+        и ненайденные ID возвращаются отдельно, чтобы их можно было отправить
+        в retry/DLQ поштучно.
+        """
+        from src.logger import logger
+
+        updates: dict[UUID, OrderStatus] = {}
+        raw_ids: dict[UUID, str] = {}
+        invalid: list[str] = []
+
+        for order_id, status in events:
+            try:
+                order_uuid = UUID(str(order_id))
+            except ValueError:
+                logger.error("Invalid order_id format: %s", order_id)
+                invalid.append(order_id)
+                continue
+
+            # Повторные события по одному заказу перезаписывают предыдущие
+            updates[order_uuid] = PROCESSOR_STATUS_MAPPING.get(status, OrderStatus.IN_PROGRESS)
+            raw_ids[order_uuid] = order_id
+
+        if not updates:
+            return StatusBatchResult(updated={}, missing=[], invalid=invalid)
+
+        async with self._uow.init() as repositories:
+            updated_versions = await repositories.orders.bulk_update_status(updates)
+
+        missing = [raw_ids[order_uuid] for order_uuid in updates if order_uuid not in updated_versions]
+
+        logger.info(
+            f"Bulk updated {len(updated_versions)} order statuses "
+            f"(missing: {len(missing)}, invalid: {len(invalid)})"
+        )
+
+        return StatusBatchResult(
+            updated={
+                OrderId(order_uuid): updates[order_uuid] for order_uuid in updated_versions
+            },
+            versions={
+                OrderId(order_uuid): version for order_uuid, version in updated_versions.items()
+            },
+            missing=missing,
+            invalid=invalid,
+        )
@@ -0,0 +1,161 @@
+"""
+Тесты для архивации завершенных заказов.
+"""
+import asyncio
+import contextlib
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import uuid4
+from datetime import datetime
+from sqlalchemy.dialects import postgresql
+
+from src.infrastructure.persistence.archiver import OrderArchiver
+from src.infrastructure.persistence.repositories.archive import ArchiveRepository, ARCHIVE_LOCK_KEY
+
+
+def compiled(statement) -> str:
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+@pytest.fixture
+def mock_session():
+    session = AsyncMock()
+    session.execute = AsyncMock(return_value=MagicMock())
+    return session
+
+
+@pytest.mark.asyncio
+async def test_archive_batch_moves_items_before_orders(mock_session):
+    """
+    Тест переноса пачки: выбор кандидатов с блокировкой, секции, позиции, затем заказы.
+    """
+
+    rows = [
+        MagicMock(id=uuid4(), created_at=datetime(2025, 12, 30)),
+        MagicMock(id=uuid4(), created_at=datetime(2026, 1, 2)),
+    ]
+    candidates = MagicMock()
+    candidates.all = MagicMock(return_value=rows)
+    mock_session.execute = AsyncMock(side_effect=[candidates] + [MagicMock()] * 8)
+    repository = ArchiveRepository(mock_session, auto_commit=False)
+
+    archived = await repository.archive_batch(datetime(2026, 2, 1), batch_size=100)
+
+    statements = [compiled(call.args[0]) for call in mock_session.execute.await_args_list]
+    assert archived == 2
+    assert "FOR UPDATE SKIP LOCKED" in statements[0]
+    assert statements[1:5] == [
+        "CREATE TABLE IF NOT EXISTS orders_archive_2025_12 PARTITION OF orders_archive "
+        "FOR VALUES FROM ('2025-12-01') TO ('2026-01-01')",
+        "CREATE TABLE IF NOT EXISTS order_items_archive_2025_12 PARTITION OF order_items_archive "
+        "FOR VALUES FROM ('2025-12-01') TO ('2026-01-01')",
+        "CREATE TABLE IF NOT EXISTS orders_archive_2026_01 PARTITION OF orders_archive "
+        "FOR VALUES FROM ('2026-01-01') TO ('2026-02-01')",
+        "CREATE TABLE IF NOT EXISTS order_items_archive_2026_01 PARTITION OF order_items_archive "
+        "FOR VALUES FROM ('2026-01-01') TO ('2026-02-01')",
+    ]
+    assert statements[5].startswith("INSERT INTO order_items_archive")
+    assert statements[6].startswith("DELETE FROM order_items")
+    assert statements[7].startswith("INSERT INTO orders_archive")
+    assert statements[8].startswith("DELETE FROM orders")
+    mock_session.commit.assert_not_awaited()
+    mock_session.flush.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_archive_batch_without_candidates(mock_session):
+    """
+    Тест пустой пачки: никаких DDL и переносов.
+    """
+
+    candidates = MagicMock()
+    candidates.all = MagicMock(return_value=[])
+    mock_session.execute = AsyncMock(return_value=candidates)
+    repository = ArchiveRepository(mock_session, auto_commit=False)
+
+    assert await repository.archive_batch(datetime(2026, 2, 1), batch_size=100) == 0
+    mock_session.execute.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_try_lock_uses_transaction_advisory_lock(mock_session):
+    """
+    Тест advisory lock архивации.
+    """
+
+    result = MagicMock()
+    result.scalar_one = MagicMock(return_value=False)
+    mock_session.execute = AsyncMock(return_value=result)
+    repository = ArchiveRepository(mock_session, auto_commit=False)
+
+    assert await repository.try_lock() is False
+    statement = mock_session.execute.await_args.args[0].compile(dialect=postgresql.dialect())
+    assert "pg_try_advisory_xact_lock" in str(statement)
+    assert ARCHIVE_LOCK_KEY in statement.params.values()
+
+
+@pytest.mark.asyncio
+async def test_archive_expired_repeats_full_batches():
+    """
+    Тест архиватора: полные пачки забираются подряд, без lock пачка пропускается.
+    """
+
+    archiver = OrderArchiver(MagicMock(), retention_days=30, batch_size=2)
+    archiver._running = True
+    archiver._archive_batch = AsyncMock(side_effect=[2, 2, 1])
+
+    assert await archiver.archive_expired() == 5
+    assert archiver._archive_batch.await_count == 3
+
+
+@pytest.mark.asyncio
+async def test_archive_batch_skipped_when_locked_elsewhere():
+    """
+    Тест архиватора: пачка не переносится, если архивацию выполняет другой процесс.
+    """
+
+    conn = MagicMock()
+
+    @contextlib.asynccontextmanager
+    async def begin():
+        yield
+
+    @contextlib.asynccontextmanager
+    async def connection():
+        yield conn
+
+    conn.begin = begin
+    db = MagicMock()
+    db.connection = connection
+    repository = AsyncMock()
+    repository.try_lock = AsyncMock(return_value=False)
+    archiver = OrderArchiver(db, batch_size=10)
+
+    with patch("src.infrastructure.persistence.archiver.ArchiveRepository", return_value=repository):
+        assert await archiver._archive_batch(datetime(2026, 1, 1)) == 0
+    repository.archive_batch.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_archive_loop_survives_unexpected_errors():
+    """
+    Тест фонового цикла: обрыв соединения не останавливает архивацию.
+    """
+
+    archiver = OrderArchiver(MagicMock(), interval=0)
+    archiver._running = True
+    calls = 0
+
+    async def archive_expired():
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            raise OSError("connection reset by peer")
+        archiver._running = False
+        return 0
+
+    archiver.archive_expired = archive_expired
+
+    await asyncio.wait_for(archiver._archive_loop(), timeout=1)
+    assert calls == 2
@@ -0,0 +1,77 @@
+"""
+Тесты сборки DI контейнера: пулы соединений БД по ролям и сброс после fork.
+"""
+import os
+import runpy
+import sys
+from pathlib import Path
+from types import ModuleType
+
+import pytest
+from unittest.mock import MagicMock, patch
+
+from src.container import Container
+from src.infrastructure.container import get_role_pool_size, get_worker_pool_size
+from src.settings import settings
+
+GUNICORN_CONF = Path(__file__).resolve().parent.parent / "gunicorn.conf.py"
+
+
+def make_container(role: str, workers: int) -> Container:
+    container = Container()
+    container.config.from_pydantic(settings)
+    container.config.APP_ROLE.from_value(role)
+    container.config.WEB_CONCURRENCY.from_value(workers)
+    container.config.DB_POOL_SIZE.from_value(20)
+    container.config.DB_MAX_OVERFLOW.from_value(10)
+    container.config.DB_BACKGROUND_POOL_SIZE.from_value(3)
+    container.config.DB_BACKGROUND_MAX_OVERFLOW.from_value(1)
+    return container
+
+
+def test_worker_pool_size_splits_budget():
+    """Тест деления бюджета соединений между воркерами gunicorn."""
+    assert get_worker_pool_size(20, 4) == 5
+    assert get_worker_pool_size(10, 3) == 3
+    assert get_worker_pool_size(2, 8) == 1
+    assert get_worker_pool_size(20, 0) == 20
+
+
+@pytest.mark.parametrize(
+    ("role", "workers", "pool_size", "max_overflow"),
+    [
+        ("api", 4, 5, 2),
+        ("all", 1, 20, 10),
+        ("relay", 4, 3, 1),
+        ("consumer", 4, 3, 1),
+    ],
+)
+def test_database_pool_size_by_role(role, workers, pool_size, max_overflow):
+    """Тест пула процесса: API делит общий бюджет, relay и consumer берут свой малый пул."""
+    assert get_role_pool_size(role, 20, workers, 3) == pool_size
+
+    db = make_container(role, workers).infrastructure.db()
+
+    assert db.engine.pool.size() == pool_size
+    assert db.engine.pool._max_overflow == max_overflow
+
+
+def test_post_fork_resets_worker_resources():
+    """Тест post_fork gunicorn: воркер получает собственные пулы и клиент брокера."""
+    container = make_container("api", 4)
+    master_db = container.infrastructure.db()
+    master_uow = container.infrastructure.uow()
+    master_rabbitmq_client = container.infrastructure.rabbitmq_client()
+
+    asgi = ModuleType("src.asgi")
+    asgi.app = MagicMock(container=container)
+    with patch.dict(os.environ), patch.dict(sys.modules, {"src.asgi": asgi}):
+        config = runpy.run_path(str(GUNICORN_CONF))
+        config["post_fork"](MagicMock(), MagicMock())
+
+    worker_db = container.infrastructure.db()
+    assert worker_db is not master_db
+    assert container.infrastructure.uow() is not master_uow
+    assert container.infrastructure.uow().db is worker_db
+    assert container.infrastructure.rabbitmq_client() is not master_rabbitmq_client
+    assert worker_db.engine.pool.size() == 5
@@ -0,0 +1,68 @@
+"""
+Тесты для очистки Idempotency-Key.
+"""
+import contextlib
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from datetime import datetime, timedelta
+from sqlalchemy.dialects import postgresql
+
+from src.infrastructure.persistence.idempotency_sweeper import IdempotencyKeySweeper
+from src.infrastructure.persistence.repositories.idempotency import IdempotencyRepository
+
+
+@pytest.mark.asyncio
+async def test_delete_expired_uses_created_at_index():
+    """
+    Тест удаления просроченных ключей: ограниченная пачка по created_at с SKIP LOCKED.
+    """
+
+    result = MagicMock(rowcount=2)
+    session = AsyncMock()
+    session.execute = AsyncMock(return_value=result)
+    repository = IdempotencyRepository(session)
+    older_than = datetime(2026, 1, 1)
+
+    deleted = await repository.delete_expired(older_than, limit=100)
+
+    compiled = session.execute.await_args.args[0].compile(dialect=postgresql.dialect())
+    sql = str(compiled)
+    assert deleted == 2
+    assert sql.startswith("DELETE FROM idempotency_keys WHERE (idempotency_keys.user_id, idempotency_keys.key) IN")
+    assert "idempotency_keys.created_at < %(created_at_1)s" in sql
+    assert "ORDER BY idempotency_keys.created_at" in sql
+    assert "FOR UPDATE SKIP LOCKED" in sql
+    assert compiled.params["created_at_1"] == older_than
+    assert 100 in compiled.params.values()
+    session.commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_sweeper_deletes_batches_until_partial():
+    """
+    Тест очистки: полные пачки удаляются подряд, отсечка - now минус TTL.
+    """
+
+    @contextlib.asynccontextmanager
+    async def connection():
+        yield AsyncMock()
+
+    db = MagicMock()
+    db.connection = connection
+    repository = AsyncMock()
+    repository.delete_expired = AsyncMock(side_effect=[10, 10, 3])
+    sweeper = IdempotencyKeySweeper(db, ttl_seconds=3600, batch_size=10)
+    sweeper._running = True
+
+    with patch(
+        "src.infrastructure.persistence.idempotency_sweeper.IdempotencyRepository",
+        return_value=repository
+    ):
+        deleted = await sweeper.delete_expired()
+
+    assert deleted == 23
+    assert repository.delete_expired.await_count == 3
+    older_than, limit = repository.delete_expired.await_args.args
+    assert limit == 10
+    assert abs(datetime.utcnow() - timedelta(hours=1) - older_than) < timedelta(minutes=1)
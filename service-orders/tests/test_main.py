@@ -0,0 +1,71 @@
+"""
+Тесты запуска ролей service-orders.
+"""
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from src.main import run_role
+from src.settings import AppRole, settings
+
+
+@pytest.fixture
+def mock_container():
+    """Мок DI контейнера с фоновыми компонентами всех ролей."""
+    container = MagicMock()
+    components = {
+        "rabbitmq_client": AsyncMock(),
+        "load_monitor": AsyncMock(),
+        "outbox_publisher": AsyncMock(),
+        "order_archiver": AsyncMock(),
+        "idempotency_key_sweeper": AsyncMock(),
+    }
+    for name, component in components.items():
+        getattr(container.infrastructure, name).return_value = component
+    container.usecase.order_usecase.return_value = AsyncMock()
+    return container
+
+
+def started(container) -> set[str]:
+    names = {"load_monitor", "outbox_publisher", "order_archiver", "idempotency_key_sweeper"}
+    return {name for name in names if getattr(container.infrastructure, name)().start.await_count}
+
+
+@pytest.mark.parametrize(
+    ("role", "components", "status_listener", "event_consumer"),
+    [
+        (AppRole.API, {"load_monitor"}, True, False),
+        (AppRole.RELAY, {"outbox_publisher", "order_archiver", "idempotency_key_sweeper"}, False, False),
+        (AppRole.CONSUMER, set(), False, True),
+        (
+            AppRole.ALL,
+            {"load_monitor", "outbox_publisher", "order_archiver", "idempotency_key_sweeper"},
+            True,
+            True,
+        ),
+    ],
+)
+@pytest.mark.asyncio
+async def test_run_role_starts_only_role_components(
+    mock_container, role, components, status_listener, event_consumer
+):
+    """Тест выбора компонентов по роли и их остановки при выходе."""
+    rabbitmq_client = mock_container.infrastructure.rabbitmq_client()
+
+    with patch.object(settings, "ARCHIVE_ENABLED", True), \
+            patch.object(settings, "ORDER_PROCESSED_BATCH_SIZE", 1):
+        async with run_role(mock_container, role):
+            assert started(mock_container) == components
+
+    rabbitmq_client.connect.assert_awaited_once()
+    rabbitmq_client.disconnect.assert_awaited_once()
+    assert rabbitmq_client.subscribe_to_order_status_broadcast.called is status_listener
+    assert rabbitmq_client.subscribe_to_order_processed.called is event_consumer
+    for name in components:
+        getattr(mock_container.infrastructure, name)().stop.assert_awaited_once()
+
+
+def test_worker_roles_do_not_build_api_app():
+    """Тест импорта src.main: приложение собирается только в src.asgi."""
+    import src.main
+
+    assert not hasattr(src.main, "app")
@@ -1,16 +1,28 @@
 """
 Тесты для API handlers сервиса заказов.
 """
+import json
 import pytest
+from decimal import Decimal
 from unittest.mock import AsyncMock, MagicMock
 from uuid import UUID, uuid4
 from datetime import datetime
 from fastapi import HTTPException
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
 
-from src.api.handlers.orders.orders_handler import new_order, get_order_status
-from src.api.schemas.request_schemas.schemas import CreateNewOrder
-from src.entity.orders import Order, OrderId, OrderStatus
-from src.exceptions import OrderNotFoundError, OrderCreationError, RepositoryError
+from src.api.handlers.orders.orders_handler import new_order, get_order_status, get_order_statuses_batch
+from src.api.handlers.orders.orders_handler import export_orders as export_orders_handler
+from src.api.admission import AdmissionControlMiddleware
+from src.api.handlers.orders.export import ExportFormat
+from src.api.handlers.orders.responses import order_etag
+from src.infrastructure.admission.load_monitor import LoadMonitor
+from src.api.schemas.request_schemas.schemas import CreateNewOrder, OrderStatusBatchRequest
+from src.api.schemas.response_schemas.schemas import OrderResponse
+from src.entity.orders import Order, OrderExport, OrderExportItem, OrderId, OrderStatus
+from src.exceptions import IdempotencyKeyConflictError, RateLimitExceededError, OrderNotFoundError, OrderCreationError, RepositoryError
 
 
 @pytest.fixture
@@ -40,8 +52,10 @@ async def test_create_order_success(mock_order_usecase, sample_order):
         amount="100.50"
     )
 
-    result = await new_order(request_body, uc=mock_order_usecase)
+    response = await new_order(request_body, uc=mock_order_usecase)
+    result = OrderResponse.model_validate_json(response.body)
 
+    assert response.status_code == 201
     assert result.id == sample_order.id
     assert result.status == OrderStatus.CREATED
     assert result.created_at == sample_order.created_at
@@ -68,6 +82,82 @@ async def test_create_order_creation_error(mock_order_usecase):
     assert "Invalid order data" in str(exc_info.value.detail)
 
 
+@pytest.mark.asyncio
+async def test_create_order_idempotency_key_conflict(mock_order_usecase):
+    """
+    Тест повторного использования Idempotency-Key с другим телом запроса.
+    """
+    mock_order_usecase.create_order.side_effect = IdempotencyKeyConflictError(
+        "Idempotency key was already used with a different request"
+    )
+    request_body = CreateNewOrder(
+        user_id="user_123",
+        products=[{"product_id": "prod_001", "quantity": 2}],
+        amount="100.50"
+    )
+
+    with pytest.raises(HTTPException) as exc_info:
+        await new_order(request_body, idempotency_key="key-1", uc=mock_order_usecase)
+
+    assert exc_info.value.status_code == 409
+    mock_order_usecase.create_order.assert_called_once()
+    assert mock_order_usecase.create_order.call_args.kwargs["idempotency_key"] == "key-1"
+
+
+@pytest.mark.asyncio
+async def test_create_order_rate_limited(mock_order_usecase):
+    """
+    Тест превышения лимита создания заказов: 429 с Retry-After.
+    """
+    mock_order_usecase.create_order.side_effect = RateLimitExceededError(user_id="user_123", retry_after=1.2)
+    request_body = CreateNewOrder(
+        user_id="user_123",
+        products=[{"product_id": "prod_001", "quantity": 2}],
+        amount="100.50"
+    )
+
+    with pytest.raises(HTTPException) as exc_info:
+        await new_order(request_body, idempotency_key=None, uc=mock_order_usecase)
+
+    assert exc_info.value.status_code == 429
+    assert exc_info.value.headers == {"Retry-After": "2"}
+
+
+def test_admission_control_sheds_excess_requests():
+    """
+    Тест admission control: запросы сверх лимита маршрута получают 503 с Retry-After.
+    """
+    async def endpoint(request):
+        return PlainTextResponse("ok")
+
+    routes = [Route("/limited", endpoint, name="limited"), Route("/exempt", endpoint, name="exempt")]
+    app = Starlette(routes=routes)
+    app.add_middleware(
+        AdmissionControlMiddleware,
+        routes=routes,
+        load_monitor=LoadMonitor(),
+        initial_limit=1,
+        min_limit=1,
+        max_limit=1,
+        retry_after=3,
+        exempt_routes={"exempt"},
+    )
+    client = TestClient(app)
+
+    assert client.get("/limited").status_code == 200
+
+    # Занимаем единственный слот, как это делал бы выполняющийся запрос
+    middleware = client.app.middleware_stack
+    while not isinstance(middleware, AdmissionControlMiddleware):
+        middleware = middleware.app
+    assert middleware.limits["limited"].try_acquire()
+
+    response = client.get("/limited")
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "3"
+    assert client.get("/exempt").status_code == 200
+
+
 @pytest.mark.asyncio
 async def test_get_order_status_success(mock_order_usecase, sample_order):
     """
@@ -76,13 +166,53 @@ async def test_get_order_status_success(mock_order_usecase, sample_order):
     order_id = sample_order.id
     mock_order_usecase.get_order_status.return_value = sample_order
 
-    result = await get_order_status(order_id, uc=mock_order_usecase)
+    response = await get_order_status(order_id, if_none_match=None, uc=mock_order_usecase)
+    result = OrderResponse.model_validate_json(response.body)
 
+    assert response.status_code == 200
+    assert response.media_type == "application/json"
     assert result.id == sample_order.id
     assert result.status == OrderStatus.CREATED
     mock_order_usecase.get_order_status.assert_called_once_with(OrderId(order_id))
 
 
+@pytest.mark.asyncio
+async def test_get_order_status_not_modified_from_cache(mock_order_usecase, sample_order):
+    """
+    Тест условного GET: совпавший ETag отдает 304 из кэша без запроса в БД.
+    """
+    mock_order_usecase.get_cached_order_status = MagicMock(return_value=sample_order)
+    etag = order_etag(sample_order)
+
+    response = await get_order_status(sample_order.id, if_none_match=etag, uc=mock_order_usecase)
+
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+    mock_order_usecase.get_order_status.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_get_order_status_etag_changed(mock_order_usecase, sample_order):
+    """
+    Тест условного GET: статус изменился, отдается новое тело с новым ETag.
+    """
+    stale_etag = order_etag(sample_order)
+    updated_order = Order(
+        id=sample_order.id,
+        status=OrderStatus.COMPLETED,
+        created_at=sample_order.created_at,
+        version=2
+    )
+    mock_order_usecase.get_cached_order_status = MagicMock(return_value=None)
+    mock_order_usecase.get_order_status.return_value = updated_order
+
+    response = await get_order_status(sample_order.id, if_none_match=stale_etag, uc=mock_order_usecase)
+
+    assert response.status_code == 200
+    assert response.headers["ETag"] == order_etag(updated_order) != stale_etag
+    assert OrderResponse.model_validate_json(response.body).status == OrderStatus.COMPLETED
+
+
 @pytest.mark.asyncio
 async def test_get_order_status_not_found(mock_order_usecase):
     """
@@ -93,7 +223,141 @@ async def test_get_order_status_not_found(mock_order_usecase):
     mock_order_usecase.get_order_status.side_effect = OrderNotFoundError(order_id=order_id)
 
     with pytest.raises(HTTPException) as exc_info:
-        await get_order_status(order_id, uc=mock_order_usecase)
+        await get_order_status(order_id, if_none_match=None, uc=mock_order_usecase)
     
     assert exc_info.value.status_code == 404
     assert "Order not found" in str(exc_info.value.detail)
+
+
+@pytest.mark.asyncio
+async def test_export_orders_streams_ndjson(mock_order_usecase):
+    """
+    Тест потоковой выгрузки заказов в NDJSON.
+    """
+    exported = [
+        OrderExport(
+            id=OrderId(uuid4()),
+            customer_id="user_123",
+            status=OrderStatus.COMPLETED,
+            amount=Decimal("100.50"),
+            created_at=datetime(2026, 1, 1),
+            items=[OrderExportItem(product_id="prod_001", quantity=2, price="0.00")]
+        )
+        for _ in range(3)
+    ]
+
+    async def export_orders(**kwargs):
+        for order in exported:
+            yield order
+
+    mock_order_usecase.export_orders = MagicMock(side_effect=export_orders)
+
+    response = await export_orders_handler(
+        export_format=ExportFormat.NDJSON,
+        created_from=datetime(2026, 1, 1),
+        created_to=None,
+        order_status=None,
+        uc=mock_order_usecase
+    )
+    body = b"".join([chunk async for chunk in response.body_iterator])
+    lines = [json.loads(line) for line in body.decode().splitlines()]
+
+    assert response.media_type == "application/x-ndjson"
+    assert [line["id"] for line in lines] == [str(order.id) for order in exported]
+    assert lines[0]["items"] == [{"product_id": "prod_001", "quantity": 2, "price": "0.00"}]
+    mock_order_usecase.export_orders.assert_called_once_with(
+        created_from=datetime(2026, 1, 1),
+        created_to=None,
+        status=None
+    )
+
+
+@pytest.mark.asyncio
+async def test_export_orders_converts_aware_timestamps_to_utc(mock_order_usecase):
+    """
+    Тест выгрузки: время с часовым поясом ("Z", "+03:00") сравнивается с naive UTC created_at.
+    """
+    async def export_orders(**kwargs):
+        return
+        yield
+
+    mock_order_usecase.export_orders = MagicMock(side_effect=export_orders)
+
+    await export_orders_handler(
+        export_format=ExportFormat.NDJSON,
+        created_from=datetime.fromisoformat("2024-01-01T00:00:00Z"),
+        created_to=datetime.fromisoformat("2024-02-01T03:00:00+03:00"),
+        order_status=None,
+        uc=mock_order_usecase
+    )
+
+    mock_order_usecase.export_orders.assert_called_once_with(
+        created_from=datetime(2024, 1, 1),
+        created_to=datetime(2024, 2, 1),
+        status=None
+    )
+
+
+@pytest.mark.asyncio
+async def test_export_orders_marks_interrupted_stream(mock_order_usecase):
+    """
+    Тест выгрузки: ошибка БД посреди потока отмечается последней строкой.
+    """
+    exported = OrderExport(
+        id=OrderId(uuid4()),
+        customer_id="user_123",
+        status=OrderStatus.COMPLETED,
+        amount=Decimal("100.50"),
+        created_at=datetime(2026, 1, 1),
+        items=[]
+    )
+
+    async def export_orders(**kwargs):
+        yield exported
+        raise RepositoryError("Failed to stream orders for export")
+
+    mock_order_usecase.export_orders = MagicMock(side_effect=export_orders)
+
+    ndjson = await export_orders_handler(
+        export_format=ExportFormat.NDJSON,
+        created_from=None,
+        created_to=None,
+        order_status=None,
+        uc=mock_order_usecase
+    )
+    lines = b"".join([chunk async for chunk in ndjson.body_iterator]).decode().splitlines()
+
+    csv_response = await export_orders_handler(
+        export_format=ExportFormat.CSV,
+        created_from=None,
+        created_to=None,
+        order_status=None,
+        uc=mock_order_usecase
+    )
+    rows = b"".join([chunk async for chunk in csv_response.body_iterator]).decode().splitlines()
+
+    assert json.loads(lines[0])["id"] == str(exported.id)
+    assert json.loads(lines[-1]) == {
+        "error": "export_interrupted",
+        "message": "Failed to stream orders for export",
+    }
+    assert len(rows) == 3
+    assert rows[-1] == "#export_interrupted,Failed to stream orders for export"
+
+
+@pytest.mark.asyncio
+async def test_get_order_statuses_batch(mock_order_usecase, sample_order):
+    """
+    Тест пакетного получения статусов: найденные заказы и неизвестные ID.
+    """
+    unknown_id = uuid4()
+    mock_order_usecase.get_order_statuses.return_value = {sample_order.id: sample_order}
+    request_body = OrderStatusBatchRequest(ids=[sample_order.id, unknown_id, sample_order.id])
+
+    result = await get_order_statuses_batch(request_body, uc=mock_order_usecase)
+
+    assert result.statuses == {sample_order.id: OrderStatus.CREATED}
+    assert result.unknown_ids == [unknown_id]
+    mock_order_usecase.get_order_statuses.assert_called_once_with(
+        [sample_order.id, unknown_id, sample_order.id]
+    )
@@ -0,0 +1,85 @@
+"""
+Тесты для репозитория заказов.
+"""
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+from datetime import datetime
+from decimal import Decimal
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.exc import OperationalError
+
+from src.entity.orders import OrderExportItem, OrderStatus
+from src.infrastructure.persistence.repositories.orders import OrderRepository
+from src.exceptions import RepositoryError
+
+
+def order_row(created_at: datetime):
+    return MagicMock(
+        id=uuid4(),
+        customer_id="user_123",
+        status=OrderStatus.COMPLETED,
+        order_amount=Decimal("10.00"),
+        created_at=created_at,
+    )
+
+
+def result(rows: list) -> MagicMock:
+    result = MagicMock()
+    result.all = MagicMock(return_value=rows)
+    result.__iter__ = MagicMock(return_value=iter(rows))
+    return result
+
+
+@pytest.mark.asyncio
+async def test_stream_orders_with_items_reads_keyset_chunks():
+    """Тест выгрузки: заказы keyset чанками по (created_at, id), позиции - одним запросом на чанк."""
+    # Arrange
+    first, second, third = (order_row(datetime(2026, 1, day)) for day in (1, 2, 3))
+    item = MagicMock(order_id=first.id, product_id="prod_001", quantity=2, price="5.00")
+    session = AsyncMock()
+    session.execute = AsyncMock(side_effect=[
+        result([first, second]), result([item]),
+        result([third]), result([]),
+    ])
+    repository = OrderRepository(session, auto_commit=False)
+
+    # Act
+    exported = [
+        order async for order in repository.stream_orders_with_items(
+            chunk_size=2, status=OrderStatus.COMPLETED
+        )
+    ]
+
+    # Assert
+    assert [order.id for order in exported] == [first.id, second.id, third.id]
+    assert exported[0].items == [OrderExportItem(product_id="prod_001", quantity=2, price="5.00")]
+    assert exported[1].items == []
+
+    statements = [call.args[0].compile(dialect=postgresql.dialect()) for call in session.execute.await_args_list]
+    assert len(statements) == 4
+    assert "ORDER BY orders.created_at, orders.id" in str(statements[0])
+    assert "LIMIT" in str(statements[0])
+    assert "(orders.created_at, orders.id) >" not in str(statements[0])
+    assert "order_items.order_id = ANY" in str(statements[1])
+    assert statements[1].params["order_ids"] == [first.id, second.id]
+    assert "(orders.created_at, orders.id) > (" in str(statements[2])
+    assert second.created_at in statements[2].params.values()
+    assert second.id in statements[2].params.values()
+
+
+@pytest.mark.asyncio
+async def test_stream_orders_with_items_wraps_db_errors():
+    """Тест выгрузки: ошибка БД посреди потока - RepositoryError."""
+    # Arrange
+    session = AsyncMock()
+    session.execute = AsyncMock(side_effect=[
+        result([order_row(datetime(2026, 1, 1))]),
+        OperationalError("SELECT", {}, Exception("connection reset")),
+    ])
+    repository = OrderRepository(session, auto_commit=False)
+
+    # Act & Assert
+    with pytest.raises(RepositoryError):
+        async for _ in repository.stream_orders_with_items(chunk_size=1):
+            pass
@@ -2,13 +2,23 @@
 Тесты для usecase сервиса заказов.
 """
 import pytest
-from unittest.mock import AsyncMock, MagicMock
+from unittest.mock import AsyncMock, MagicMock, patch
 from uuid import UUID, uuid4
 from datetime import datetime
 
 from src.usecase.orders.orders_usecase import OrderUseCase
-from src.entity.orders import CreateOrder, Order, OrderId, OrderStatus
-from src.exceptions import OrderNotFoundError, RepositoryError
+from src.settings import settings
+from src.entity.orders import CreateOrder, IdempotencyRecord, Order, OrderId, OrderStatus
+from src.infrastructure.messaging.status_hub import OrderStatusHub
+from src.infrastructure.admission.limits import TokenBucketLimiter
+from src.infrastructure.cache.ttl_lru import TTLLRUCache
+from src.exceptions import (
+    IdempotencyKeyConflictError,
+    InvalidCursorError,
+    OrderNotFoundError,
+    RateLimitExceededError,
+    RepositoryError,
+)
 
 
 @pytest.fixture
@@ -28,6 +38,8 @@ def mock_repositories(mock_repository):
     repos = MagicMock()
     repos.orders = mock_repository
     repos.outbox = AsyncMock()
+    repos.archive = AsyncMock()
+    repos.archive.get_orders_by_ids = AsyncMock(return_value=[])
     return repos
 
 
@@ -56,7 +68,6 @@ async def test_create_order_success(mock_repository, mock_uow, mock_repositories
     mock_uow.init = MagicMock(return_value=context_manager)
     
     usecase = OrderUseCase(
-        repository=mock_repository,
         uow=mock_uow,
         rabbitmq_client=None
     )
@@ -90,7 +101,6 @@ async def test_get_order_status_success(mock_repository, mock_uow, mock_reposito
     mock_uow.init = MagicMock(return_value=context_manager)
     
     usecase = OrderUseCase(
-        repository=mock_repository,
         uow=mock_uow,
         rabbitmq_client=None
     )
@@ -118,7 +128,6 @@ async def test_get_order_status_not_found(mock_repository, mock_uow, mock_reposi
     mock_uow.init = MagicMock(return_value=context_manager)
     
     usecase = OrderUseCase(
-        repository=mock_repository,
         uow=mock_uow,
         rabbitmq_client=None
     )
@@ -149,7 +158,6 @@ async def test_update_order_status_from_event(mock_repository, mock_uow, mock_re
     mock_uow.init = MagicMock(return_value=context_manager)
     
     usecase = OrderUseCase(
-        repository=mock_repository,
         uow=mock_uow,
         rabbitmq_client=None
     )
@@ -161,3 +169,428 @@ async def test_update_order_status_from_event(mock_repository, mock_uow, mock_re
         UUID(order_id),
         OrderStatus.COMPLETED
     )
+
+
+@pytest.mark.asyncio
+async def test_update_order_statuses_from_events_batch(mock_repository, mock_uow, mock_repositories):
+    """
+    Тест пакетного обновления статусов: последний статус побеждает,
+    ненайденные и невалидные ID возвращаются отдельно.
+    """
+
+    found_id = uuid4()
+    missing_id = uuid4()
+
+    mock_repository.bulk_update_status = AsyncMock(return_value={found_id: 3})
+    mock_repositories.orders = mock_repository
+
+    context_manager = AsyncMock()
+    context_manager.__aenter__ = AsyncMock(return_value=mock_repositories)
+    context_manager.__aexit__ = AsyncMock(return_value=None)
+    mock_uow.init = MagicMock(return_value=context_manager)
+
+    usecase = OrderUseCase(
+        uow=mock_uow,
+        rabbitmq_client=None
+    )
+
+    result = await usecase.update_order_statuses_from_events([
+        (str(found_id), "PROCESSING"),
+        (str(missing_id), "FAILED"),
+        ("not-a-uuid", "SUCCESS"),
+        (str(found_id), "SUCCESS"),
+    ])
+
+    mock_repository.bulk_update_status.assert_called_once_with({
+        found_id: OrderStatus.COMPLETED,
+        missing_id: OrderStatus.FAILED,
+    })
+    assert mock_uow.init.call_count == 1
+    assert result.updated == {OrderId(found_id): OrderStatus.COMPLETED}
+    assert result.versions == {OrderId(found_id): 3}
+    assert result.missing == [str(missing_id)]
+    assert result.invalid == ["not-a-uuid"]
+
+
+@pytest.mark.asyncio
+async def test_get_order_status_recent_order_falls_back_to_primary(
+    mock_repository, mock_uow, mock_repositories, sample_order
+):
+    """
+    Тест staleness guard: недавно созданный заказ перечитывается с primary.
+    """
+
+    mock_repository.get_order_by_id = AsyncMock(return_value=sample_order)
+    mock_repositories.orders = mock_repository
+
+    context_manager = AsyncMock()
+    context_manager.__aenter__ = AsyncMock(return_value=mock_repositories)
+    context_manager.__aexit__ = AsyncMock(return_value=None)
+    mock_uow.init = MagicMock(return_value=context_manager)
+    mock_uow.has_replicas = True
+
+    usecase = OrderUseCase(
+        uow=mock_uow,
+        rabbitmq_client=None,
+        replica_staleness_seconds=5.0
+    )
+
+    result = await usecase.get_order_status(sample_order.id)
+
+    assert result.id == sample_order.id
+    assert mock_uow.init.call_args_list[0].kwargs == {"read_only": True}
+    assert mock_uow.init.call_args_list[1].kwargs == {}
+    assert mock_repository.get_order_by_id.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_list_customer_orders_keyset_pagination(mock_repository, mock_uow, mock_repositories):
+    """
+    Тест keyset пагинации истории заказов: курсор следующей страницы
+    указывает на последний заказ текущей.
+    """
+
+    orders = [
+        Order(id=OrderId(uuid4()), status=OrderStatus.CREATED, created_at=datetime(2026, 1, 3))
+        for _ in range(3)
+    ]
+    mock_repository.list_customer_orders = AsyncMock(return_value=orders)
+    mock_repositories.orders = mock_repository
+
+    context_manager = AsyncMock()
+    context_manager.__aenter__ = AsyncMock(return_value=mock_repositories)
+    context_manager.__aexit__ = AsyncMock(return_value=None)
+    mock_uow.init = MagicMock(return_value=context_manager)
+
+    usecase = OrderUseCase(
+        uow=mock_uow,
+        rabbitmq_client=None
+    )
+
+    page = await usecase.list_customer_orders("user_123", limit=2)
+
+    assert page.items == orders[:2]
+    assert page.next_cursor is not None
+    mock_repository.list_customer_orders.assert_called_once_with(
+        "user_123", 3, after=None, status=None
+    )
+
+    mock_repository.list_customer_orders = AsyncMock(return_value=orders[2:])
+    page = await usecase.list_customer_orders(
+        "user_123", limit=2, cursor=page.next_cursor, status=OrderStatus.CREATED
+    )
+
+    assert page.items == orders[2:]
+    assert page.next_cursor is None
+    mock_repository.list_customer_orders.assert_called_once_with(
+        "user_123", 3, after=(orders[1].created_at, UUID(str(orders[1].id))), status=OrderStatus.CREATED
+    )
+
+
+@pytest.mark.asyncio
+async def test_list_customer_orders_invalid_cursor(mock_repository, mock_uow):
+    """
+    Тест обработки некорректного курсора пагинации.
+    """
+
+    usecase = OrderUseCase(
+        uow=mock_uow,
+        rabbitmq_client=None
+    )
+
+    with pytest.raises(InvalidCursorError):
+        await usecase.list_customer_orders("user_123", limit=2, cursor="not-a-cursor")
+
+
+@pytest.mark.asyncio
+async def test_subscribe_order_status_receives_published_updates(
+        mock_repository, mock_uow, mock_repositories, sample_order
+):
+    """
+    Тест подписки на статус заказа: текущий статус из БД и обновления из hub.
+    """
+
+    mock_repository.get_order_by_id = AsyncMock(return_value=sample_order)
+    mock_repositories.orders = mock_repository
+
+    context_manager = AsyncMock()
+    context_manager.__aenter__ = AsyncMock(return_value=mock_repositories)
+    context_manager.__aexit__ = AsyncMock(return_value=None)
+    mock_uow.init = MagicMock(return_value=context_manager)
+
+    hub = OrderStatusHub()
+    usecase = OrderUseCase(
+        uow=mock_uow,
+        rabbitmq_client=None,
+        status_hub=hub
+    )
+
+    order, subscription = await usecase.subscribe_order_status(sample_order.id)
+
+    assert order.status == OrderStatus.CREATED
+    assert hub.subscribers_count == 1
+
+    with subscription:
+        hub.publish(UUID(str(sample_order.id)), OrderStatus.IN_PROGRESS)
+        assert await subscription.next_status(timeout=0.1) == OrderStatus.IN_PROGRESS
+        assert await subscription.next_status(timeout=0.01) is None
+
+    assert hub.subscribers_count == 0
+
+
+@pytest.mark.asyncio
+async def test_subscribe_order_status_not_found_releases_subscription(mock_repository, mock_uow, mock_repositories):
+    """
+    Тест: при ненайденном заказе подписка не остается в hub.
+    """
+
+    order_id = uuid4()
+    mock_repository.get_order_by_id = AsyncMock(side_effect=OrderNotFoundError(order_id=order_id))
+    mock_repositories.orders = mock_repository
+
+    context_manager = AsyncMock()
+    context_manager.__aenter__ = AsyncMock(return_value=mock_repositories)
+    context_manager.__aexit__ = AsyncMock(return_value=None)
+    mock_uow.init = MagicMock(return_value=context_manager)
+
+    hub = OrderStatusHub()
+    usecase = OrderUseCase(
+        uow=mock_uow,
+        rabbitmq_client=None,
+        status_hub=hub
+    )
+
+    with pytest.raises(OrderNotFoundError):
+        await usecase.subscribe_order_status(OrderId(order_id))
+
+    assert hub.subscribers_count == 0
+
+
+@pytest.mark.asyncio
+async def test_create_order_with_idempotency_key_replays_response(
+        mock_repository, mock_uow, mock_repositories, sample_order
+):
+    """
+    Тест Idempotency-Key: заказ создается один раз, повторы отдаются из кэша без обращения к БД.
+    """
+
+    mock_repository.create_order = AsyncMock(return_value=sample_order)
+    mock_repositories.orders = mock_repository
+    mock_repositories.idempotency = AsyncMock()
+    mock_repositories.idempotency.reserve = AsyncMock(return_value=True)
+
+    context_manager = AsyncMock()
+    context_manager.__aenter__ = AsyncMock(return_value=mock_repositories)
+    context_manager.__aexit__ = AsyncMock(return_value=None)
+    mock_uow.init = MagicMock(return_value=context_manager)
+
+    usecase = OrderUseCase(
+        uow=mock_uow,
+        rabbitmq_client=None
+    )
+    payload = CreateOrder(
+        user_id="user_123",
+        products=[{"product_id": "prod_001", "quantity": 2}],
+        amount="100.50"
+    )
+
+    first = await usecase.create_order(payload, idempotency_key="key-1")
+    second = await usecase.create_order(payload, idempotency_key="key-1")
+
+    assert first.id == sample_order.id
+    assert second.id == sample_order.id
+    mock_repository.create_order.assert_called_once_with(payload)
+    mock_repositories.idempotency.complete.assert_called_once_with("user_123", "key-1", sample_order)
+    mock_uow.init.assert_called_once()
+
+    other_payload = CreateOrder(
+        user_id="user_123",
+        products=[{"product_id": "prod_002", "quantity": 1}],
+        amount="10.00"
+    )
+    with pytest.raises(IdempotencyKeyConflictError):
+        await usecase.create_order(other_payload, idempotency_key="key-1")
+
+
+@pytest.mark.asyncio
+async def test_create_order_with_taken_idempotency_key_returns_stored_order(
+        mock_repository, mock_uow, mock_repositories, sample_order
+):
+    """
+    Тест Idempotency-Key: ключ уже занят другим процессом, заказ берется из таблицы ключей.
+    """
+
+    usecase = OrderUseCase(
+        uow=mock_uow,
+        rabbitmq_client=None
+    )
+    payload = CreateOrder(
+        user_id="user_123",
+        products=[{"product_id": "prod_001", "quantity": 2}],
+        amount="100.50"
+    )
+
+    mock_repository.create_order = AsyncMock()
+    mock_repositories.orders = mock_repository
+    mock_repositories.idempotency = AsyncMock()
+    mock_repositories.idempotency.reserve = AsyncMock(return_value=False)
+    mock_repositories.idempotency.get = AsyncMock(
+        return_value=IdempotencyRecord(
+            request_hash=usecase._request_hash(payload),
+            order=sample_order
+        )
+    )
+
+    context_manager = AsyncMock()
+    context_manager.__aenter__ = AsyncMock(return_value=mock_repositories)
+    context_manager.__aexit__ = AsyncMock(return_value=None)
+    mock_uow.init = MagicMock(return_value=context_manager)
+
+    result = await usecase.create_order(payload, idempotency_key="key-1")
+
+    assert result.id == sample_order.id
+    mock_repository.create_order.assert_not_called()
+    mock_repositories.outbox.create_message.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_create_order_rate_limited_per_user(mock_repository, mock_uow, mock_repositories, sample_order):
+    """
+    Тест token bucket на создание заказов: лимит считается отдельно для каждого клиента.
+    """
+
+    mock_repository.create_order = AsyncMock(return_value=sample_order)
+    mock_repositories.orders = mock_repository
+
+    context_manager = AsyncMock()
+    context_manager.__aenter__ = AsyncMock(return_value=mock_repositories)
+    context_manager.__aexit__ = AsyncMock(return_value=None)
+    mock_uow.init = MagicMock(return_value=context_manager)
+
+    usecase = OrderUseCase(
+        uow=mock_uow,
+        rabbitmq_client=None,
+        rate_limiter=TokenBucketLimiter(rate=0.5, burst=1)
+    )
+
+    def payload(user_id: str) -> CreateOrder:
+        return CreateOrder(
+            user_id=user_id,
+            products=[{"product_id": "prod_001", "quantity": 1}],
+            amount="10.00"
+        )
+
+    await usecase.create_order(payload("user_1"))
+
+    with pytest.raises(RateLimitExceededError) as exc_info:
+        await usecase.create_order(payload("user_1"))
+
+    assert 0 < exc_info.value.retry_after <= 2
+    await usecase.create_order(payload("user_2"))
+    assert mock_repository.create_order.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_order_status_cache_follows_versions(mock_repository, mock_uow, mock_repositories, sample_order):
+    """
+    Тест кэша статусов: чтение из БД и рассылка обновляют кэш, старая версия не перетирает новую.
+    """
+
+    mock_repository.get_order_by_id = AsyncMock(return_value=sample_order)
+    mock_repositories.orders = mock_repository
+
+    context_manager = AsyncMock()
+    context_manager.__aenter__ = AsyncMock(return_value=mock_repositories)
+    context_manager.__aexit__ = AsyncMock(return_value=None)
+    mock_uow.init = MagicMock(return_value=context_manager)
+
+    usecase = OrderUseCase(
+        uow=mock_uow,
+        rabbitmq_client=None,
+        status_cache=TTLLRUCache()
+    )
+
+    assert usecase.get_cached_order_status(sample_order.id) is None
+
+    await usecase.get_order_status(sample_order.id)
+    assert usecase.get_cached_order_status(sample_order.id).version == 1
+
+    usecase.notify_status_changed(UUID(str(sample_order.id)), OrderStatus.COMPLETED, 2)
+    cached = usecase.get_cached_order_status(sample_order.id)
+    assert (cached.status, cached.version) == (OrderStatus.COMPLETED, 2)
+
+    # Отстающая реплика вернула старую версию
+    await usecase.get_order_status(sample_order.id)
+    cached = usecase.get_cached_order_status(sample_order.id)
+    assert (cached.status, cached.version) == (OrderStatus.COMPLETED, 2)
+
+
+@pytest.mark.asyncio
+async def test_get_order_status_falls_back_to_archive(mock_repository, mock_uow, mock_repositories):
+    """
+    Тест чтения статуса заказа, перенесенного архиватором.
+    """
+
+    order_id = uuid4()
+    archived = Order(id=OrderId(order_id), status=OrderStatus.COMPLETED, created_at=datetime(2025, 1, 5))
+    mock_repository.get_order_by_id = AsyncMock(side_effect=OrderNotFoundError(order_id=order_id))
+    mock_repository.get_orders_by_ids = AsyncMock(return_value=[])
+    mock_repositories.archive.get_orders_by_ids = AsyncMock(return_value=[archived])
+
+    context_manager = AsyncMock()
+    context_manager.__aenter__ = AsyncMock(return_value=mock_repositories)
+    context_manager.__aexit__ = AsyncMock(return_value=None)
+    mock_uow.init = MagicMock(return_value=context_manager)
+
+    usecase = OrderUseCase(
+        uow=mock_uow,
+        rabbitmq_client=None
+    )
+
+    result = await usecase.get_order_status(OrderId(order_id))
+    statuses = await usecase.get_order_statuses([OrderId(order_id)])
+
+    assert result == archived
+    assert statuses == {order_id: archived}
+    mock_repositories.archive.get_orders_by_ids.assert_awaited_with([order_id])
+
+
+@pytest.mark.asyncio
+async def test_export_orders_streams_from_read_replica(mock_repository, mock_uow, mock_repositories):
+    """
+    Тест выгрузки: чтение через read-only транзакцию чанками EXPORT_CHUNK_SIZE.
+    """
+
+    exported = [MagicMock(), MagicMock()]
+
+    async def stream_orders_with_items(**kwargs):
+        for order in exported:
+            yield order
+
+    mock_repository.stream_orders_with_items = MagicMock(side_effect=stream_orders_with_items)
+
+    context_manager = AsyncMock()
+    context_manager.__aenter__ = AsyncMock(return_value=mock_repositories)
+    context_manager.__aexit__ = AsyncMock(return_value=None)
+    mock_uow.init = MagicMock(return_value=context_manager)
+
+    usecase = OrderUseCase(
+        uow=mock_uow,
+        rabbitmq_client=None
+    )
+
+    with patch.object(settings, "EXPORT_CHUNK_SIZE", 500):
+        result = [
+            order async for order in usecase.export_orders(
+                created_from=datetime(2026, 1, 1), status=OrderStatus.COMPLETED
+            )
+        ]
+
+    assert result == exported
+    mock_uow.init.assert_called_once_with(read_only=True)
+    mock_repository.stream_orders_with_items.assert_called_once_with(
+        chunk_size=500,
+        created_from=datetime(2026, 1, 1),
+        created_to=None,
+        status=OrderStatus.COMPLETED,
+    )
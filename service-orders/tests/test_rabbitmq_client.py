@@ -0,0 +1,77 @@
+"""
+Тесты для RabbitMQ клиента сервиса заказов.
+"""
+import asyncio
+import json
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from src.infrastructure.messaging.rabbitmq_client import RabbitMQClient
+
+
+def make_message(body: bytes):
+    message = MagicMock()
+    message.body = body
+    message.headers = {}
+    message.ack = AsyncMock()
+    return message
+
+
+@pytest.mark.asyncio
+async def test_order_processed_batch_unexpected_error_retries_messages():
+    """Тест пачки order.processed: не-объект уходит в DLQ, неожиданная ошибка - в retry, ничего не зависает."""
+    # Arrange
+    client = RabbitMQClient()
+    client._publish_to_dlq = AsyncMock()
+    client._retry_or_dead_letter = AsyncMock()
+
+    not_an_object = make_message(json.dumps(["order_id"]).encode())
+    first = make_message(json.dumps({"order_id": "1", "status": "SUCCESS"}).encode())
+    second = make_message(json.dumps({"order_id": "2", "status": "FAILED"}).encode())
+    callback = AsyncMock(side_effect=OSError("connection reset"))
+
+    # Act
+    await client._handle_order_processed_batch([not_an_object, first, second], callback)
+
+    # Assert
+    not_an_object.ack.assert_awaited_once()
+    client._publish_to_dlq.assert_awaited_once()
+    callback.assert_awaited_once_with([
+        {"order_id": "1", "status": "SUCCESS"},
+        {"order_id": "2", "status": "FAILED"},
+    ])
+    retried = [call.args[0] for call in client._retry_or_dead_letter.await_args_list]
+    assert retried == [first, second]
+
+
+@pytest.mark.asyncio
+async def test_status_broadcast_skips_malformed_payloads():
+    """Тест рассылки статусов: сообщение без нужных полей не роняет обработчик."""
+    # Arrange
+    client = RabbitMQClient()
+    client._order_status_exchange = MagicMock()
+    queue = AsyncMock()
+    client._channel = AsyncMock()
+    client._channel.declare_queue = AsyncMock(return_value=queue)
+    received = []
+
+    def callback(message: dict) -> None:
+        for order in message.get("orders", []):
+            received.append((order["id"], order["status"]))
+
+    subscription = asyncio.create_task(client.subscribe_to_order_status_broadcast(callback))
+    while not queue.consume.await_count:
+        await asyncio.sleep(0)
+    handler = queue.consume.await_args.args[0]
+
+    # Act
+    await handler(make_message(json.dumps({"orders": [{"status": "COMPLETED"}]}).encode()))
+    await handler(make_message(json.dumps(["not", "an", "object"]).encode()))
+    await handler(make_message(json.dumps({"orders": [{"id": "1", "status": "COMPLETED"}]}).encode()))
+    subscription.cancel()
+
+    # Assert
+    with pytest.raises(asyncio.CancelledError):
+        await subscription
+    assert received == [("1", "COMPLETED")]
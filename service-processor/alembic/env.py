@@ -15,7 +15,10 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
 from src.infrastructure.persistence.db import Base
-from src.infrastructure.persistence.db.schema import OrderProcessing  # noqa: F401
+from src.infrastructure.persistence.db.schema import (  # noqa: F401
+    OrderProcessing,
+    OutboxMessage,
+)
 import os
 
 # this is the Alembic Config object, which provides
@@ -0,0 +1,46 @@
+"""add processor outbox
+
+Revision ID: d83e5a1c7f42
+Revises: b4bd934051a0
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd83e5a1c7f42'
+down_revision: Union[str, Sequence[str], None] = 'b4bd934051a0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('outbox_messages',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('event_type', sa.String(length=100), nullable=False),
+    sa.Column('exchange', sa.String(length=100), nullable=False),
+    sa.Column('routing_key', sa.String(length=100), nullable=False),
+    sa.Column('payload', sa.Text(), nullable=False),
+    sa.Column('published', sa.Boolean(), nullable=False),
+    sa.Column('published_at', sa.DateTime(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('retry_count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('id')
+    )
+    op.create_index(op.f('ix_outbox_messages_created_at'), 'outbox_messages', ['created_at'], unique=False)
+    op.create_index(op.f('ix_outbox_messages_event_type'), 'outbox_messages', ['event_type'], unique=False)
+    op.create_index(op.f('ix_outbox_messages_published'), 'outbox_messages', ['published'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_outbox_messages_published'), table_name='outbox_messages')
+    op.drop_index(op.f('ix_outbox_messages_event_type'), table_name='outbox_messages')
+    op.drop_index(op.f('ix_outbox_messages_created_at'), table_name='outbox_messages')
+    op.drop_table('outbox_messages')
@@ -0,0 +1,34 @@
+"""add processing leases
+
+Revision ID: f1c6b8d2e9a7
+Revises: d83e5a1c7f42
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1c6b8d2e9a7'
+down_revision: Union[str, Sequence[str], None] = 'd83e5a1c7f42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('order_processing', sa.Column('lease_owner', sa.String(length=255), nullable=True))
+    op.add_column('order_processing', sa.Column('lease_expires_at', sa.DateTime(), nullable=True))
+    op.add_column('order_processing', sa.Column('payload', sa.Text(), nullable=True))
+    op.create_index(op.f('ix_order_processing_lease_expires_at'), 'order_processing', ['lease_expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_order_processing_lease_expires_at'), table_name='order_processing')
+    op.drop_column('order_processing', 'payload')
+    op.drop_column('order_processing', 'lease_expires_at')
+    op.drop_column('order_processing', 'lease_owner')
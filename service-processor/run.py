@@ -3,6 +3,12 @@
 """
 import asyncio
 from src.main import main
+from src.settings import settings
+from src.supervisor import supervise
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    # Несколько процессов-воркеров под супервизором, чтобы под занимал все ядра
+    if settings.PROCESSING_WORKERS > 1:
+        supervise()
+    else:
+        asyncio.run(main())
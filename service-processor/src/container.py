@@ -22,4 +22,14 @@ class Container(containers.DeclarativeContainer):
         processing_repository=infrastructure.processing_repository,
         uow=infrastructure.uow,
         rabbitmq_client=infrastructure.rabbitmq_client,
+        finished_orders_filter=infrastructure.finished_orders_filter,
+        lease_keeper=infrastructure.lease_keeper,
+        pipeline_stages=config.PROCESSING_STAGES,
+        pipeline_cpu_workers=config.PROCESSING_CPU_WORKERS,
+        pipeline_stage_concurrency=config.PROCESSING_STAGE_CONCURRENCY,
+        simulation_latency=config.PROCESSING_SIMULATION_LATENCY,
+        simulation_failures=config.PROCESSING_SIMULATION_FAILURES,
+        simulation_seed=config.PROCESSING_SIMULATION_SEED,
+        simulation_cpu_burn_ms=config.PROCESSING_SIMULATION_CPU_BURN_MS,
+        success_rate=config.PROCESSING_SUCCESS_RATE,
     )
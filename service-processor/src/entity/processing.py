@@ -35,6 +35,15 @@ class OrderProcessing:
             self.created_at = datetime.utcnow()
 
 
+@dataclass(slots=True)
+class ProcessingClaim:
+    """
+    Результат попытки захватить заказ в обработку
+    """
+    claimed: bool
+    status: ProcessingStatus
+
+
 @dataclass(slots=True)
 class OrderCreatedEvent:
     """
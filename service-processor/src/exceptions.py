@@ -47,6 +47,12 @@ class ProcessingError(AppError):
         self.context = {"order_id": str(self.order_id)}
 
 
+class ProcessingInterruptedError(AppError):
+    """
+    Обработка прервана остановкой процесса: сообщение возвращается в очередь.
+    """
+
+
 @dataclass
 class MessageConsumeError(MessagingError):
     """
@@ -72,6 +78,12 @@ class MessagePublishError(MessagingError):
         self.context = {"order_id": str(self.order_id)}
 
 
+class OutboxPublishError(MessagingError):
+    """
+    Ошибка при публикации сообщения из outbox.
+    """
+
+
 class ConnectionError(MessagingError):
     """
     Ошибка подключения к RabbitMQ.
@@ -88,3 +100,15 @@ class DatabaseConnectionError(RepositoryError):
     """
     Ошибка подключения к базе данных.
     """
+
+
+@dataclass
+class PipelineStageError(AppError):
+    """
+    Стадия пайплайна обработки завершилась ошибкой.
+    """
+    stage: str
+    message: str = "Processing stage failed"
+
+    def __post_init__(self) -> None:
+        self.context = {"stage": self.stage}
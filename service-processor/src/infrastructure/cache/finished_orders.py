@@ -0,0 +1,75 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+from uuid import UUID
+
+# Примерный расход памяти на запись: int ключ + узел OrderedDict (замер tracemalloc)
+ENTRY_SIZE_BYTES = 150
+
+
+@dataclass(slots=True)
+class FilterStats:
+    """
+    Метрики фильтра завершенных заказов
+    """
+    size: int
+    maxsize: int
+    hits: int
+    misses: int
+    evictions: int
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    @property
+    def approx_bytes(self) -> int:
+        return self.size * ENTRY_SIZE_BYTES
+
+
+class FinishedOrdersFilter:
+    """
+    LRU множество недавно завершенных (SUCCESS/FAILED) заказов.
+
+    Попадание означает, что заказ точно завершен, и повторное сообщение можно
+    подтвердить без обращения к БД. Промах ничего не значит - источник истины
+    остается в БД. Размер ограничен maxsize записями (~150 байт на запись).
+    """
+
+    def __init__(self, maxsize: int = 100000) -> None:
+        self._maxsize = maxsize
+        self._items: OrderedDict[int, None] = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def __contains__(self, order_id: UUID) -> bool:
+        key = order_id.int
+        if key in self._items:
+            self._items.move_to_end(key)
+            self._hits += 1
+            return True
+        self._misses += 1
+        return False
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def add(self, order_id: UUID) -> None:
+        if self._maxsize <= 0:
+            return
+        key = order_id.int
+        self._items[key] = None
+        self._items.move_to_end(key)
+        while len(self._items) > self._maxsize:
+            self._items.popitem(last=False)
+            self._evictions += 1
+
+    def stats(self) -> FilterStats:
+        return FilterStats(
+            size=len(self._items),
+            maxsize=self._maxsize,
+            hits=self._hits,
+            misses=self._misses,
+            evictions=self._evictions,
+        )
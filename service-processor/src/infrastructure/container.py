@@ -7,7 +7,10 @@ from dependency_injector import containers, providers
 from src.infrastructure.persistence.db import Database
 from src.infrastructure.persistence.repositories.processing import ProcessingRepository
 from src.infrastructure.persistence.uow import UnitOfWork
+from src.infrastructure.persistence.lease_keeper import LeaseKeeper
 from src.infrastructure.messaging.rabbitmq_client import RabbitMQClient
+from src.infrastructure.messaging.outbox_publisher import OutboxPublisher
+from src.infrastructure.cache.finished_orders import FinishedOrdersFilter
 
 
 def get_db_url(
@@ -54,3 +57,25 @@ class InfrastructureContainer(containers.DeclarativeContainer):
     rabbitmq_client = providers.Singleton(
         RabbitMQClient,
     )
+
+    outbox_publisher = providers.Singleton(
+        OutboxPublisher,
+        db=db,
+        rabbitmq_client=rabbitmq_client,
+        batch_size=config.OUTBOX_BATCH_SIZE,
+        poll_interval=config.OUTBOX_POLL_INTERVAL,
+        max_retries=config.OUTBOX_MAX_RETRIES,
+        max_backoff=config.OUTBOX_MAX_BACKOFF,
+    )
+
+    finished_orders_filter = providers.Singleton(
+        FinishedOrdersFilter,
+        maxsize=config.PROCESSING_FINISHED_CACHE_SIZE,
+    )
+
+    lease_keeper = providers.Singleton(
+        LeaseKeeper,
+        db=db,
+        lease_seconds=config.PROCESSING_LEASE_SECONDS,
+        heartbeat_interval=config.PROCESSING_HEARTBEAT_INTERVAL_SECONDS,
+    )
@@ -0,0 +1,189 @@
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Optional
+
+from src.logger import logger
+from src.exceptions import ProcessingInterruptedError
+
+
+@dataclass(slots=True)
+class SlotStats:
+    """
+    Статистика одного слота обработки
+    """
+    slot: int
+    processed: int = 0
+    failed: int = 0
+    busy_seconds: float = 0.0
+    queue_wait_seconds: float = 0.0
+    last_duration: float = 0.0
+    max_duration: float = 0.0
+
+
+class ProcessingEngine:
+    """
+    Пул из concurrency слотов, разбирающих ограниченную очередь сообщений.
+
+    Потребитель кладет сообщение через submit и ждет результат обработки, поэтому
+    ack/retry остаются за RabbitMQ клиентом, а одновременно обрабатывается не
+    больше concurrency заказов. Заполненная очередь блокирует submit.
+
+    Сообщения, которые не успели обработаться до остановки, завершаются
+    ProcessingInterruptedError - клиент возвращает их в очередь брокера.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[dict], Awaitable[None]],
+        concurrency: int = 8,
+        queue_size: int = 16,
+        stats_interval: float = 60.0
+    ) -> None:
+        self._handler = handler
+        self._concurrency = concurrency
+        self._stats_interval = stats_interval
+        self._queue: asyncio.Queue[tuple[dict, asyncio.Future, float]] = asyncio.Queue(maxsize=queue_size)
+        self._slots: list[SlotStats] = [SlotStats(slot=i) for i in range(concurrency)]
+        self._tasks: list[asyncio.Task] = []
+        self._stats_task: Optional[asyncio.Task] = None
+        self._started_at = 0.0
+        self._draining = False
+
+    @property
+    def concurrency(self) -> int:
+        return self._concurrency
+
+    @property
+    def queue_size(self) -> int:
+        return self._queue.maxsize
+
+    async def start(self) -> None:
+        if self._tasks:
+            return
+        self._started_at = time.monotonic()
+        self._tasks = [
+            asyncio.create_task(self._run_slot(slot)) for slot in self._slots
+        ]
+        if self._stats_interval > 0:
+            self._stats_task = asyncio.create_task(self._log_stats_loop())
+        logger.info(
+            "Processing engine started: %s slots, queue size %s",
+            self._concurrency, self._queue.maxsize
+        )
+
+    async def stop(self) -> None:
+        tasks = self._tasks + ([self._stats_task] if self._stats_task else [])
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks = []
+        self._stats_task = None
+
+        self._hand_back_queued()
+        self.log_stats()
+
+    async def drain(self, timeout: float) -> bool:
+        """
+        Перестать брать новую работу: вернуть ожидающие в очереди сообщения и
+        дать начатым заказам timeout секунд на завершение. Незавершенные к
+        дедлайну прерываются. Возвращает True, если все успели завершиться.
+        """
+        self._draining = True
+        self._hand_back_queued()
+
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+            drained = True
+        except asyncio.TimeoutError:
+            logger.warning("Processing engine drain timed out, interrupting in-flight orders")
+            drained = False
+
+        await self.stop()
+        return drained
+
+    async def submit(self, message: dict) -> Any:
+        """
+        Поставить сообщение в очередь и дождаться окончания его обработки.
+        Исключение обработчика пробрасывается вызывающему.
+        """
+        if self._draining:
+            raise ProcessingInterruptedError("Processing engine is draining")
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((message, future, time.monotonic()))
+        return await future
+
+    def stats(self) -> list[SlotStats]:
+        return [
+            SlotStats(
+                slot=s.slot,
+                processed=s.processed,
+                failed=s.failed,
+                busy_seconds=s.busy_seconds,
+                queue_wait_seconds=s.queue_wait_seconds,
+                last_duration=s.last_duration,
+                max_duration=s.max_duration,
+            )
+            for s in self._slots
+        ]
+
+    def log_stats(self) -> None:
+        elapsed = max(time.monotonic() - self._started_at, 1e-9)
+        for s in self._slots:
+            done = s.processed + s.failed
+            logger.info(
+                "Slot %s: processed=%s failed=%s utilization=%.0f%% "
+                "avg=%.3fs max=%.3fs avg_queue_wait=%.3fs",
+                s.slot, s.processed, s.failed,
+                100 * s.busy_seconds / elapsed,
+                s.busy_seconds / done if done else 0.0,
+                s.max_duration,
+                s.queue_wait_seconds / done if done else 0.0,
+            )
+        logger.info("Processing engine queue depth: %s/%s", self._queue.qsize(), self._queue.maxsize)
+
+    async def _run_slot(self, stats: SlotStats) -> None:
+        while True:
+            message, future, enqueued_at = await self._queue.get()
+            try:
+                # Потребитель мог отменить ожидание (остановка подписки) - не обрабатываем
+                if future.cancelled():
+                    continue
+
+                started_at = time.monotonic()
+                stats.queue_wait_seconds += started_at - enqueued_at
+                try:
+                    result = await self._handler(message)
+                except asyncio.CancelledError:
+                    if not future.done():
+                        future.set_exception(
+                            ProcessingInterruptedError("Processing interrupted by shutdown")
+                        )
+                    raise
+                except Exception as e:
+                    stats.failed += 1
+                    if not future.done():
+                        future.set_exception(e)
+                else:
+                    stats.processed += 1
+                    if not future.done():
+                        future.set_result(result)
+                finally:
+                    duration = time.monotonic() - started_at
+                    stats.busy_seconds += duration
+                    stats.last_duration = duration
+                    stats.max_duration = max(stats.max_duration, duration)
+            finally:
+                self._queue.task_done()
+
+    def _hand_back_queued(self) -> None:
+        while not self._queue.empty():
+            _, future, _ = self._queue.get_nowait()
+            self._queue.task_done()
+            if not future.done():
+                future.set_exception(ProcessingInterruptedError("Processing engine is draining"))
+
+    async def _log_stats_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self._stats_interval)
+            self.log_stats()
@@ -0,0 +1,186 @@
+import asyncio
+import json
+from typing import Optional
+
+from src.infrastructure.persistence.db import Database
+from src.infrastructure.persistence.repositories.outbox import OutboxRepository
+from src.infrastructure.messaging.rabbitmq_client import RabbitMQClient
+from src.logger import logger
+from src.exceptions import (
+    MessagingError,
+    OutboxPublishError,
+    RepositoryError,
+    AppError
+)
+from sqlalchemy.exc import SQLAlchemyError
+
+
+class OutboxPublisher:
+    """
+    Публикатор событий из outbox.
+
+    Пачка сообщений публикуется конкурентно, а результат фиксируется двумя
+    UPDATE на всю пачку в одной транзакции.
+
+    В счетчик попыток идут только ошибки самого сообщения (OutboxPublishError).
+    Недоступность брокера попытки не тратит: сообщение остается в outbox, а
+    опрос замедляется с экспоненциальной задержкой до max_backoff.
+    """
+
+    def __init__(
+        self,
+        db: Database,
+        rabbitmq_client: RabbitMQClient,
+        batch_size: int = 100,
+        poll_interval: float = 0.5,
+        max_retries: int = 3,
+        max_backoff: float = 30.0
+    ) -> None:
+        self._db = db
+        self._rabbitmq_client = rabbitmq_client
+        self._batch_size = batch_size
+        self._poll_interval = poll_interval
+        self._max_retries = max_retries
+        self._max_backoff = max_backoff
+        self._broker_failures = 0
+        self._running = False
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        if self._running:
+            logger.warning("OutboxPublisher is already running")
+            return
+
+        self._running = True
+        self._task = asyncio.create_task(self._publish_loop())
+        logger.info("OutboxPublisher started")
+
+    async def stop(self) -> None:
+        self._running = False
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        logger.info("OutboxPublisher stopped")
+
+    async def flush(self, timeout: float) -> int:
+        """
+        Опубликовать накопленные сообщения перед остановкой процесса, не
+        дольше timeout секунд. Возвращает число выбранных сообщений.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        total = 0
+        while (remaining := deadline - loop.time()) > 0:
+            try:
+                fetched = await asyncio.wait_for(self._publish_batch(), remaining)
+            except asyncio.TimeoutError:
+                logger.warning("Outbox flush timed out, remaining messages will be published after restart")
+                break
+            total += fetched
+            if fetched < self._batch_size or self._broker_failures:
+                break
+        logger.info("Outbox flushed: %s messages", total)
+        return total
+
+    async def _publish_loop(self) -> None:
+        while self._running:
+            fetched = 0
+            try:
+                fetched = await self._publish_batch()
+            except (MessagingError, RepositoryError, AppError) as e:
+                logger.error("Error in outbox publish loop: %s", e, exc_info=True)
+            except SQLAlchemyError as e:
+                logger.error("Database error in outbox publish loop: %s", e, exc_info=True)
+
+            # Полная пачка - скорее всего есть еще, забираем без паузы
+            if self._broker_failures or fetched < self._batch_size:
+                try:
+                    await asyncio.sleep(self._next_delay())
+                except asyncio.CancelledError:
+                    break
+
+    def _next_delay(self) -> float:
+        if not self._broker_failures:
+            return self._poll_interval
+        return min(self._poll_interval * 2 ** self._broker_failures, self._max_backoff)
+
+    async def _publish_batch(self) -> int:
+        """
+        Опубликовать одну пачку. Возвращает число выбранных сообщений.
+        """
+        async with self._db.connection() as conn:
+            repository = OutboxRepository(conn, auto_commit=False)
+
+            try:
+                messages = await repository.get_unpublished_messages(
+                    limit=self._batch_size,
+                    max_retries=self._max_retries
+                )
+
+                if not messages:
+                    await conn.rollback()
+                    return 0
+
+                results = await asyncio.gather(
+                    *(self._publish_message(message) for message in messages),
+                    return_exceptions=True
+                )
+
+                published_ids = []
+                failed_ids = []
+                deferred = 0
+                for message, result in zip(messages, results):
+                    if isinstance(result, OutboxPublishError):
+                        failed_ids.append(message.id)
+                        logger.warning(
+                            "Failed to publish outbox message %s: %s. Retry count: %s",
+                            message.id, result, message.retry_count + 1
+                        )
+                    elif isinstance(result, BaseException):
+                        # Брокер недоступен - сообщение не виновато, попытку не тратим
+                        deferred += 1
+                        logger.warning("Outbox message %s deferred: %s", message.id, result)
+                    else:
+                        published_ids.append(message.id)
+
+                await repository.mark_as_published(published_ids)
+                await repository.increment_retry_count(failed_ids)
+                await conn.commit()
+
+                self._broker_failures = self._broker_failures + 1 if deferred else 0
+                logger.info(
+                    "Outbox batch: %s published, %s failed, %s deferred",
+                    len(published_ids), len(failed_ids), deferred
+                )
+                return len(messages)
+
+            except (RepositoryError, SQLAlchemyError) as e:
+                await conn.rollback()
+                logger.error("Error processing outbox batch: %s", e, exc_info=True)
+            except AppError as e:
+                await conn.rollback()
+                logger.error("Application error processing outbox batch: %s", e, exc_info=True)
+            return 0
+
+    async def _publish_message(self, message) -> None:
+        try:
+            payload = json.loads(message.payload)
+
+            if message.event_type == "order.processed":
+                await self._rabbitmq_client.publish_order_processed(
+                    order_id=payload["order_id"],
+                    status=payload["status"],
+                    error_message=payload.get("error_message"),
+                    processed_at=payload.get("processed_at")
+                )
+            else:
+                logger.warning(f"Unknown event type: {message.event_type}")
+                raise ValueError(f"Unknown event type: {message.event_type}")
+
+        except (json.JSONDecodeError, ValueError, KeyError) as e:
+            logger.error("Error parsing or validating message %s: %s", message.id, e, exc_info=True)
+            raise OutboxPublishError("Failed to parse or validate message: %s" % e) from e
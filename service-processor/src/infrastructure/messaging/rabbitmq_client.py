@@ -1,6 +1,6 @@
 import json
 import asyncio
-from typing import Callable, Optional
+from typing import Awaitable, Callable, Optional
 from aio_pika import Exchange, Queue, IncomingMessage
 from aio_pika.abc import AbstractConnection, AbstractChannel
 
@@ -11,7 +11,9 @@ from src.exceptions import (
     ConnectionError, 
     SubscriptionError,
     MessageConsumeError,
-    ProcessingError
+    ProcessingError,
+    ProcessingInterruptedError,
+    AppError
 )
 from src.logger import logger
 import aio_pika
@@ -29,6 +31,10 @@ class RabbitMQClient:
         self._order_processed_exchange: Optional[Exchange] = None
         self._dlx: Optional[Exchange] = None
         self._dlq: Optional[Queue] = None
+        self._consume_queue: Optional[Queue] = None
+        self._consumer_tag: Optional[str] = None
+        self._batch_pending: list[IncomingMessage] = []
+        self._batch_tasks: set[asyncio.Task] = set()
         
     async def connect(self) -> None:
         """
@@ -76,6 +82,40 @@ class RabbitMQClient:
         if self._connection:
             await self._connection.close()
         logger.info("Disconnected from RabbitMQ")
+
+    async def stop_consuming(self) -> None:
+        """
+        Отменить подписку: брокер перестает доставлять новые сообщения.
+        Сообщения, накопленные для пачки, но еще не переданные в обработку,
+        возвращаются в очередь.
+        """
+        if self._consume_queue is not None and self._consumer_tag is not None:
+            try:
+                await self._consume_queue.cancel(self._consumer_tag)
+            except (aio_pika.exceptions.AMQPError, OSError) as e:
+                logger.warning("Failed to cancel order.created consumer: %s", e)
+            self._consumer_tag = None
+
+        pending = self._batch_pending[:]
+        self._batch_pending.clear()
+        for message in pending:
+            await message.nack(requeue=True)
+        logger.info("Stopped consuming order.created (%s pending messages requeued)", len(pending))
+
+    async def wait_batches(self, timeout: float) -> bool:
+        """
+        Дождаться обработки начатых пачек не дольше timeout секунд.
+        Незавершенные к дедлайну прерываются, их сообщения возвращаются в
+        очередь. Возвращает True, если все пачки успели завершиться.
+        """
+        if not self._batch_tasks:
+            return True
+
+        _, unfinished = await asyncio.wait(self._batch_tasks, timeout=timeout)
+        for task in unfinished:
+            task.cancel()
+        await asyncio.gather(*unfinished, return_exceptions=True)
+        return not unfinished
     
     def _get_retry_count(self, message: IncomingMessage) -> int:
         if message.headers:
@@ -145,31 +185,55 @@ class RabbitMQClient:
             f"Reason: {error}"
         )
     
+    async def _retry_or_dead_letter(self, message: IncomingMessage, error: Exception) -> None:
+        """
+        Отправить сообщение в retry очередь или в DLQ, если попытки исчерпаны
+        """
+        retry_count = self._get_retry_count(message)
+        await message.ack()
+
+        if retry_count >= settings.MAX_RETRY_ATTEMPTS:
+            await self._publish_to_dlq(message, error)
+        else:
+            new_retry_count = self._increment_retry_count(
+                dict(message.headers) if message.headers else {}
+            )
+            await self._publish_to_retry_queue(message, new_retry_count)
+
+    async def _declare_order_created_queue(self) -> Queue:
+        queue_name = f"processor_order_created_queue"
+        queue = await self._channel.declare_queue(
+            queue_name,
+            durable=True,
+            arguments={
+                "x-dead-letter-exchange": settings.DLX_NAME,
+                "x-dead-letter-routing-key": settings.DLQ_NAME,
+            }
+        )
+
+        await queue.bind(
+            self._order_created_exchange,
+            routing_key=settings.ORDER_CREATED_ROUTING_KEY
+        )
+        return queue
+
     async def subscribe_to_order_created(
         self,
-        callback: Callable[[dict], None]
+        callback: Callable[[dict], None],
+        prefetch_count: Optional[int] = None
     ) -> None:
         """
-        Подписка на события order.created с поддержкой retry и DLQ
+        Подписка на события order.created с поддержкой retry и DLQ.
+        prefetch_count ограничивает число неподтвержденных сообщений у процесса.
         """
         if not self._channel or not self._order_created_exchange:
             raise MessagingError("Not connected to RabbitMQ")
         
         try:
-            queue_name = f"processor_order_created_queue"
-            queue = await self._channel.declare_queue(
-                queue_name,
-                durable=True,
-                arguments={
-                    "x-dead-letter-exchange": settings.DLX_NAME,
-                    "x-dead-letter-routing-key": settings.DLQ_NAME,
-                }
-            )
+            if prefetch_count:
+                await self._channel.set_qos(prefetch_count=prefetch_count)
 
-            await queue.bind(
-                self._order_created_exchange,
-                routing_key=settings.ORDER_CREATED_ROUTING_KEY
-            )
+            queue = await self._declare_order_created_queue()
             
             async def message_handler(message: IncomingMessage):
                 retry_count = self._get_retry_count(message)
@@ -183,7 +247,10 @@ class RabbitMQClient:
                         callback(body)
 
                     await message.ack()
-                    
+
+                except ProcessingInterruptedError:
+                    # Процесс останавливается - сообщение заберет другой потребитель
+                    await message.nack(requeue=True)
                 except (json.JSONDecodeError, UnicodeDecodeError) as e:
                     logger.error("Error decoding message (retry %s): %s", retry_count, e, exc_info=True)
                     await message.ack()
@@ -195,15 +262,7 @@ class RabbitMQClient:
                         exc_info=True
                     )
                     
-                    if retry_count >= settings.MAX_RETRY_ATTEMPTS:
-                        await message.ack()
-                        await self._publish_to_dlq(message, e)
-                    else:
-                        await message.ack()
-                        new_retry_count = self._increment_retry_count(
-                            dict(message.headers) if message.headers else {}
-                        )
-                        await self._publish_to_retry_queue(message, new_retry_count)
+                    await self._retry_or_dead_letter(message, e)
                 except (TypeError, AttributeError, KeyError, ValueError) as e:
                     logger.error(
                         "Error processing message (retry %s): %s",
@@ -211,7 +270,8 @@ class RabbitMQClient:
                         exc_info=True
                     )
 
-            await queue.consume(message_handler)
+            self._consume_queue = queue
+            self._consumer_tag = await queue.consume(message_handler)
 
             await asyncio.Future()
             
@@ -221,11 +281,132 @@ class RabbitMQClient:
             logger.error("Failed to subscribe to order.created: %s", e)
             raise SubscriptionError("Failed to subscribe to order.created: %s" % e) from e
     
+    async def subscribe_to_order_created_batch(
+        self,
+        callback: Callable[[list[dict]], Awaitable[dict[str, Exception]]],
+        batch_size: int,
+        flush_interval: float
+    ) -> None:
+        """
+        Подписка на события order.created с обработкой пачками.
+
+        Сообщения копятся до batch_size штук или flush_interval секунд и
+        передаются в callback одним списком. Callback возвращает словарь
+        order_id -> ошибка для сообщений, которые не удалось обработать: они
+        поштучно уходят в retry или DLQ, остальные подтверждаются.
+        """
+        if not self._channel or not self._order_created_exchange:
+            raise MessagingError("Not connected to RabbitMQ")
+
+        try:
+            await self._channel.set_qos(prefetch_count=batch_size * 2)
+            queue = await self._declare_order_created_queue()
+
+            pending = self._batch_pending
+            flush_lock = asyncio.Lock()
+
+            async def flush() -> None:
+                async with flush_lock:
+                    if not pending:
+                        return
+                    batch = pending[:]
+                    pending.clear()
+                    # Отдельная задача: отмена подписки не обрывает начатую пачку,
+                    # ее дожидается (или прерывает по дедлайну) wait_batches
+                    task = asyncio.create_task(self._handle_order_created_batch(batch, callback))
+                    self._batch_tasks.add(task)
+                    task.add_done_callback(self._batch_tasks.discard)
+                    # Ошибка одной пачки не должна останавливать периодический flush
+                    # и обработчик сообщений: неподтвержденные пачки упрутся в prefetch
+                    try:
+                        await asyncio.shield(task)
+                    except Exception as e:
+                        logger.error("Failed to handle order.created batch: %s", e, exc_info=True)
+
+            async def message_handler(message: IncomingMessage):
+                pending.append(message)
+                if len(pending) >= batch_size:
+                    await flush()
+
+            async def flush_periodically():
+                while True:
+                    await asyncio.sleep(flush_interval)
+                    await flush()
+
+            flush_task = asyncio.create_task(flush_periodically())
+            try:
+                self._consume_queue = queue
+                self._consumer_tag = await queue.consume(message_handler)
+                await asyncio.Future()
+            finally:
+                flush_task.cancel()
+
+        except asyncio.CancelledError:
+            raise
+        except (aio_pika.exceptions.AMQPError, OSError) as e:
+            logger.error("Failed to subscribe to order.created: %s", e)
+            raise SubscriptionError("Failed to subscribe to order.created: %s" % e) from e
+
+    async def _handle_order_created_batch(
+        self,
+        batch: list[IncomingMessage],
+        callback: Callable[[list[dict]], Awaitable[dict[str, Exception]]]
+    ) -> None:
+        decoded: list[tuple[IncomingMessage, dict]] = []
+        for message in batch:
+            try:
+                body = json.loads(message.body.decode())
+                if not isinstance(body, dict):
+                    raise ValueError("Message body is not a JSON object")
+                decoded.append((message, body))
+            except (json.JSONDecodeError, UnicodeDecodeError, ValueError) as e:
+                logger.error("Error decoding message: %s", e, exc_info=True)
+                await message.ack()
+                await self._publish_to_dlq(message, e)
+
+        if not decoded:
+            return
+
+        try:
+            failures = await callback([body for _, body in decoded])
+        except asyncio.CancelledError:
+            for message, _ in decoded:
+                await message.nack(requeue=True)
+            raise
+        except ProcessingInterruptedError:
+            for message, _ in decoded:
+                await message.nack(requeue=True)
+            return
+        except Exception as e:
+            logger.error("Error processing order.created batch: %s", e, exc_info=True)
+            for message, _ in decoded:
+                await self._retry_or_dead_letter(message, e)
+            return
+
+        for message, body in decoded:
+            error = failures.get(body.get("order_id"))
+            if error is None:
+                await message.ack()
+            elif isinstance(error, ProcessingInterruptedError):
+                # Прерванный заказ возвращается в очередь, не тратя попытку
+                await message.nack(requeue=True)
+            elif isinstance(error, AppError):
+                await self._retry_or_dead_letter(message, error)
+            else:
+                await message.ack()
+                await self._publish_to_dlq(message, error)
+
+        logger.info(
+            f"Processed order.created batch of {len(decoded)} messages "
+            f"({len(failures)} failed)"
+        )
+
     async def publish_order_processed(
         self,
         order_id: str,
         status: str,
-        error_message: Optional[str] = None
+        error_message: Optional[str] = None,
+        processed_at: Optional[str] = None
     ) -> None:
         """
         Публикация события order.processed
@@ -240,7 +421,7 @@ class RabbitMQClient:
                 "order_id": order_id,
                 "status": status,
                 "error_message": error_message,
-                "processed_at": datetime.utcnow().isoformat()
+                "processed_at": processed_at or datetime.utcnow().isoformat()
             }
             
             message_body = json.dumps(message_data).encode()
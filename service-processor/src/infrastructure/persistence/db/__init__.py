@@ -23,6 +23,9 @@ class Database:
         async with self.engine.begin() as conn:
             await conn.run_sync(Base.metadata.create_all)
 
+    async def close(self) -> None:
+        await self.engine.dispose()
+
     @contextlib.asynccontextmanager
     async def connection(self) -> typing.AsyncGenerator[AsyncSession, None]:
         async with self.session_factory() as session:
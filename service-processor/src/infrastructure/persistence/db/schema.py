@@ -1,6 +1,6 @@
 from uuid import UUID as UUIDType
 import datetime
-from sqlalchemy import UUID, DateTime, Enum, Text
+from sqlalchemy import UUID, Boolean, DateTime, Enum, Integer, String, Text
 from sqlalchemy.orm import Mapped, mapped_column
 import uuid
 
@@ -25,6 +25,13 @@ class OrderProcessing(Base):
     processed_at: Mapped[datetime.datetime | None] = mapped_column(
         DateTime, nullable=True
     )
+    # Аренда заказа процессом: продлевается heartbeat-ом, истекшую забирает sweeper
+    lease_owner: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    lease_expires_at: Mapped[datetime.datetime | None] = mapped_column(
+        DateTime, nullable=True, index=True
+    )
+    # Событие order.created, чтобы довести заказ без повторной доставки сообщения
+    payload: Mapped[str | None] = mapped_column(Text, nullable=True)
     created_at: Mapped[datetime.datetime] = mapped_column(
         DateTime,
         nullable=False,
@@ -36,3 +43,25 @@ class OrderProcessing(Base):
         default=datetime.datetime.utcnow,
         onupdate=datetime.datetime.utcnow,
     )
+
+
+class OutboxMessage(Base):
+    """Событие, ожидающее публикации в RabbitMQ"""
+    __tablename__ = "outbox_messages"
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, unique=True
+    )
+    event_type: Mapped[str] = mapped_column(String(100), nullable=False, index=True)
+    exchange: Mapped[str] = mapped_column(String(100), nullable=False)
+    routing_key: Mapped[str] = mapped_column(String(100), nullable=False)
+    payload: Mapped[str] = mapped_column(Text, nullable=False)  # JSON строка
+    published: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False, index=True)
+    published_at: Mapped[datetime.datetime | None] = mapped_column(DateTime, nullable=True)
+    created_at: Mapped[datetime.datetime] = mapped_column(
+        DateTime,
+        nullable=False,
+        default=datetime.datetime.utcnow,
+        index=True
+    )
+    retry_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
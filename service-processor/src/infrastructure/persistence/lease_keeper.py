@@ -0,0 +1,93 @@
+import asyncio
+import os
+import socket
+from typing import Optional
+from uuid import UUID
+
+from src.infrastructure.persistence.db import Database
+from src.infrastructure.persistence.repositories.processing import ProcessingRepository
+from src.logger import logger
+from src.exceptions import RepositoryError
+from sqlalchemy.exc import SQLAlchemyError
+
+
+def get_lease_owner() -> str:
+    """
+    Идентификатор владельца аренды: хост и pid процесса.
+    """
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class LeaseKeeper:
+    """
+    Продление аренды заказов, которые обрабатывает этот процесс.
+
+    Раз в heartbeat_interval одним UPDATE продлевает аренду всех заказов в
+    работе. Если процесс упадет, аренда истечет через lease_seconds и заказы
+    заберет sweeper любого живого процесса.
+    """
+
+    def __init__(
+        self,
+        db: Database,
+        lease_seconds: float = 30.0,
+        heartbeat_interval: float = 10.0,
+        owner: Optional[str] = None
+    ) -> None:
+        self._db = db
+        self.lease_seconds = lease_seconds
+        self._heartbeat_interval = heartbeat_interval
+        self.owner = owner or get_lease_owner()
+        self._in_flight: set[UUID] = set()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._in_flight)
+
+    def track(self, order_id: UUID) -> None:
+        self._in_flight.add(order_id)
+
+    def release(self, order_id: UUID) -> None:
+        self._in_flight.discard(order_id)
+
+    async def start(self) -> None:
+        if self._task is not None:
+            return
+        self._task = asyncio.create_task(self._heartbeat_loop())
+        logger.info("LeaseKeeper started (owner %s, lease %ss)", self.owner, self.lease_seconds)
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        logger.info("LeaseKeeper stopped")
+
+    async def _heartbeat_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self._heartbeat_interval)
+            try:
+                await self.heartbeat()
+            except (RepositoryError, SQLAlchemyError) as e:
+                logger.error("Failed to extend processing leases: %s", e, exc_info=True)
+            except Exception as e:
+                # Ошибки подключения asyncpg (OSError) не оборачиваются SQLAlchemy:
+                # без heartbeat истекут аренды всех заказов в работе
+                logger.error("Unexpected error extending processing leases: %s", e, exc_info=True)
+
+    async def heartbeat(self) -> None:
+        order_ids = list(self._in_flight)
+        if not order_ids:
+            return
+
+        async with self._db.connection() as conn:
+            repository = ProcessingRepository(conn)
+            extended = await repository.extend_leases(order_ids, self.owner, self.lease_seconds)
+
+        lost = [order_id for order_id in order_ids if order_id not in extended and order_id in self._in_flight]
+        if lost:
+            logger.warning("Lost processing lease for %s orders: %s", len(lost), lost[:10])
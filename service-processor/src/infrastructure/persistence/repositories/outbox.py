@@ -0,0 +1,138 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update
+from sqlalchemy.exc import SQLAlchemyError
+from uuid import UUID
+from typing import List
+from datetime import datetime
+
+from src.infrastructure.persistence.db.schema import OutboxMessage as OutboxMessageModel
+from src.exceptions import RepositoryError
+
+
+class OutboxRepository:
+    """
+    Репозиторий для работы с outbox таблицей.
+    """
+
+    def __init__(self, session: AsyncSession, *, auto_commit: bool = True) -> None:
+        self._session: AsyncSession = session
+        self._auto_commit = auto_commit
+
+    async def create_message(
+        self,
+        event_type: str,
+        exchange: str,
+        routing_key: str,
+        payload: str
+    ) -> OutboxMessageModel:
+        """
+        Создать новое сообщение в outbox
+        """
+        try:
+            db_message = OutboxMessageModel(
+                event_type=event_type,
+                exchange=exchange,
+                routing_key=routing_key,
+                payload=payload,
+                published=False,
+                retry_count=0
+            )
+            self._session.add(db_message)
+            await self._commit()
+            return db_message
+        except SQLAlchemyError as exc:
+            await self._session.rollback()
+            raise RepositoryError("Failed to create outbox message") from exc
+
+    async def create_messages(
+        self,
+        messages: List[tuple[str, str, str, str]]
+    ) -> None:
+        """
+        Создать несколько сообщений (event_type, exchange, routing_key, payload) одной вставкой
+        """
+        if not messages:
+            return
+        try:
+            self._session.add_all([
+                OutboxMessageModel(
+                    event_type=event_type,
+                    exchange=exchange,
+                    routing_key=routing_key,
+                    payload=payload,
+                    published=False,
+                    retry_count=0
+                )
+                for event_type, exchange, routing_key, payload in messages
+            ])
+            await self._commit()
+        except SQLAlchemyError as exc:
+            await self._session.rollback()
+            raise RepositoryError("Failed to create outbox messages") from exc
+
+    async def get_unpublished_messages(
+        self,
+        limit: int = 100,
+        max_retries: int = 3
+    ) -> List[OutboxMessageModel]:
+        """
+        Получить и заблокировать до конца транзакции пачку неопубликованных сообщений.
+        Строки, заблокированные другим relay, пропускаются.
+        """
+        try:
+            stmt = (
+                select(OutboxMessageModel)
+                .where(
+                    OutboxMessageModel.published == False,
+                    OutboxMessageModel.retry_count < max_retries
+                )
+                .order_by(OutboxMessageModel.created_at.asc())
+                .limit(limit)
+                .with_for_update(skip_locked=True)
+            )
+            result = await self._session.execute(stmt)
+            return list(result.scalars().all())
+        except SQLAlchemyError as exc:
+            raise RepositoryError("Failed to get unpublished messages") from exc
+
+    async def mark_as_published(self, message_ids: List[UUID]) -> None:
+        """
+        Пометить сообщения как опубликованные
+        """
+        if not message_ids:
+            return
+        try:
+            stmt = (
+                update(OutboxMessageModel)
+                .where(OutboxMessageModel.id.in_(message_ids))
+                .values(published=True, published_at=datetime.utcnow())
+            )
+            await self._session.execute(stmt)
+            await self._commit()
+        except SQLAlchemyError as exc:
+            await self._session.rollback()
+            raise RepositoryError("Failed to mark messages as published") from exc
+
+    async def increment_retry_count(self, message_ids: List[UUID]) -> None:
+        """
+        Увеличить счетчик попыток
+        """
+        if not message_ids:
+            return
+        try:
+            stmt = (
+                update(OutboxMessageModel)
+                .where(OutboxMessageModel.id.in_(message_ids))
+                .values(retry_count=OutboxMessageModel.retry_count + 1)
+            )
+            await self._session.execute(stmt)
+            await self._commit()
+        except SQLAlchemyError as exc:
+            await self._session.rollback()
+            raise RepositoryError("Failed to increment retry count") from exc
+
+    async def _commit(self) -> None:
+        if self._auto_commit:
+            await self._session.commit()
+        else:
+            await self._session.flush()
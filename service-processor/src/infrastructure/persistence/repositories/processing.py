@@ -1,9 +1,12 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy import select
+from sqlalchemy import String, Text, UUID as UUIDColumn, and_, cast, column, func, or_, select, update, values
+from sqlalchemy.dialects.postgresql import insert
+import uuid
 from uuid import UUID
+from datetime import datetime, timedelta
 
-from src.entity.processing import OrderProcessing, ProcessingStatus
+from src.entity.processing import OrderProcessing, ProcessingClaim, ProcessingStatus
 from src.infrastructure.persistence.db.schema import OrderProcessing as OrderProcessingModel
 from src.exceptions import RepositoryError
 
@@ -46,27 +49,328 @@ class ProcessingRepository:
             await self._session.rollback()
             raise RepositoryError("Failed to create processing") from exc
 
+    async def claim(
+        self,
+        order_id: UUID,
+        owner: str | None = None,
+        lease_seconds: float | None = None,
+        payload: str | None = None
+    ) -> ProcessingClaim:
+        """
+        Атомарно захватить заказ: вставить строку в статусе PROCESSING или
+        перевести в него PENDING (а с арендой - и PROCESSING с истекшей арендой).
+        Если заказ уже в работе или завершен, возвращает его текущий статус без изменений.
+        """
+        try:
+            now = datetime.utcnow()
+            stmt = insert(OrderProcessingModel).values(
+                order_id=order_id,
+                status=ProcessingStatus.PROCESSING,
+                **self._lease_values(now, owner, lease_seconds, payload),
+            )
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[OrderProcessingModel.order_id],
+                set_=self._claim_set(stmt, now),
+                where=self._claimable(now, lease_seconds),
+            ).returning(OrderProcessingModel.status)
+
+            result = await self._session.execute(stmt)
+            if result.scalar_one_or_none() is not None:
+                await self._commit()
+                return ProcessingClaim(claimed=True, status=ProcessingStatus.PROCESSING)
+
+            # Конфликт без обновления: дубликат сообщения, строка уже существует
+            status = await self._session.scalar(
+                select(OrderProcessingModel.status).where(
+                    OrderProcessingModel.order_id == order_id
+                )
+            )
+            return ProcessingClaim(claimed=False, status=status)
+        except SQLAlchemyError as exc:
+            await self._session.rollback()
+            raise RepositoryError("Failed to claim processing") from exc
+
+    async def claim_many(
+        self,
+        order_ids: list[UUID],
+        owner: str | None = None,
+        lease_seconds: float | None = None,
+        payloads: dict[UUID, str] | None = None
+    ) -> set[UUID]:
+        """
+        Атомарно захватить пачку заказов одним INSERT ... ON CONFLICT.
+        Возвращает order_id, которые захвачены этим вызовом.
+        """
+        if not order_ids:
+            return set()
+
+        try:
+            now = datetime.utcnow()
+            payloads = payloads or {}
+            stmt = insert(OrderProcessingModel).values([
+                {
+                    "id": uuid.uuid4(),
+                    "order_id": order_id,
+                    "status": ProcessingStatus.PROCESSING,
+                    "created_at": now,
+                    "updated_at": now,
+                    **self._lease_values(now, owner, lease_seconds, payloads.get(order_id)),
+                }
+                # Один порядок блокировок строк у всех реплик - без взаимных deadlock
+                for order_id in sorted(set(order_ids))
+            ])
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[OrderProcessingModel.order_id],
+                set_=self._claim_set(stmt, now),
+                where=self._claimable(now, lease_seconds),
+            ).returning(OrderProcessingModel.order_id)
+
+            result = await self._session.execute(stmt)
+            claimed = set(result.scalars().all())
+            await self._commit()
+            return claimed
+        except SQLAlchemyError as exc:
+            await self._session.rollback()
+            raise RepositoryError("Failed to claim processing batch") from exc
+
+    async def extend_leases(
+        self,
+        order_ids: list[UUID],
+        owner: str,
+        lease_seconds: float
+    ) -> set[UUID]:
+        """
+        Продлить аренду заказов владельца. Возвращает order_id, аренда которых продлена.
+        """
+        if not order_ids:
+            return set()
+
+        try:
+            stmt = (
+                update(OrderProcessingModel)
+                .where(
+                    OrderProcessingModel.order_id.in_(order_ids),
+                    OrderProcessingModel.lease_owner == owner,
+                    OrderProcessingModel.status == ProcessingStatus.PROCESSING,
+                )
+                .values(lease_expires_at=datetime.utcnow() + timedelta(seconds=lease_seconds))
+                .returning(OrderProcessingModel.order_id)
+                .execution_options(synchronize_session=False)
+            )
+            result = await self._session.execute(stmt)
+            extended = set(result.scalars().all())
+            await self._commit()
+            return extended
+        except SQLAlchemyError as exc:
+            await self._session.rollback()
+            raise RepositoryError("Failed to extend processing leases") from exc
+
+    async def reclaim_expired(
+        self,
+        owner: str,
+        lease_seconds: float,
+        limit: int = 100
+    ) -> list[tuple[UUID, str]]:
+        """
+        Забрать заказы с истекшей арендой (владелец упал) одним UPDATE.
+        Возвращает (order_id, payload) перехваченных заказов.
+        """
+        try:
+            now = datetime.utcnow()
+            expired = (
+                select(OrderProcessingModel.id)
+                .where(
+                    OrderProcessingModel.status == ProcessingStatus.PROCESSING,
+                    OrderProcessingModel.lease_expires_at < now,
+                    OrderProcessingModel.payload.is_not(None),
+                )
+                .order_by(OrderProcessingModel.lease_expires_at)
+                .limit(limit)
+                .with_for_update(skip_locked=True)
+                .scalar_subquery()
+            )
+            stmt = (
+                update(OrderProcessingModel)
+                .where(OrderProcessingModel.id.in_(expired))
+                .values(
+                    lease_owner=owner,
+                    lease_expires_at=now + timedelta(seconds=lease_seconds),
+                    updated_at=now,
+                )
+                .returning(OrderProcessingModel.order_id, OrderProcessingModel.payload)
+                .execution_options(synchronize_session=False)
+            )
+            result = await self._session.execute(stmt)
+            reclaimed = [(row.order_id, row.payload) for row in result]
+            await self._commit()
+            return reclaimed
+        except SQLAlchemyError as exc:
+            await self._session.rollback()
+            raise RepositoryError("Failed to reclaim expired processing leases") from exc
+
+    async def release_claims(self, order_ids: list[UUID], owner: str | None = None) -> None:
+        """
+        Вернуть незавершенные заказы в PENDING, чтобы повторная доставка
+        сразу захватила их, не дожидаясь истечения аренды.
+        """
+        if not order_ids:
+            return
+
+        try:
+            conditions = [
+                OrderProcessingModel.order_id.in_(order_ids),
+                OrderProcessingModel.status == ProcessingStatus.PROCESSING,
+            ]
+            if owner is not None:
+                conditions.append(OrderProcessingModel.lease_owner == owner)
+
+            stmt = (
+                update(OrderProcessingModel)
+                .where(*conditions)
+                .values(
+                    status=ProcessingStatus.PENDING,
+                    lease_owner=None,
+                    lease_expires_at=None,
+                    updated_at=datetime.utcnow(),
+                )
+                .execution_options(synchronize_session=False)
+            )
+            await self._session.execute(stmt)
+            await self._commit()
+        except SQLAlchemyError as exc:
+            await self._session.rollback()
+            raise RepositoryError("Failed to release processing claims") from exc
+
+    @staticmethod
+    def _lease_values(
+        now: datetime,
+        owner: str | None,
+        lease_seconds: float | None,
+        payload: str | None
+    ) -> dict:
+        if lease_seconds is None:
+            return {}
+        return {
+            "lease_owner": owner,
+            "lease_expires_at": now + timedelta(seconds=lease_seconds),
+            "payload": payload,
+        }
+
+    @staticmethod
+    def _claim_set(stmt, now: datetime) -> dict:
+        return {
+            "status": ProcessingStatus.PROCESSING,
+            "error_message": None,
+            "updated_at": now,
+            "lease_owner": stmt.excluded.lease_owner,
+            "lease_expires_at": stmt.excluded.lease_expires_at,
+            "payload": func.coalesce(stmt.excluded.payload, OrderProcessingModel.payload),
+        }
+
+    @staticmethod
+    def _claimable(now: datetime, lease_seconds: float | None):
+        """
+        Условие перезахвата существующей строки. Без аренды - только PENDING,
+        с арендой - еще и PROCESSING, чья аренда истекла или не выдавалась.
+        """
+        if lease_seconds is None:
+            return OrderProcessingModel.status == ProcessingStatus.PENDING
+        return or_(
+            OrderProcessingModel.status == ProcessingStatus.PENDING,
+            and_(
+                OrderProcessingModel.status == ProcessingStatus.PROCESSING,
+                or_(
+                    OrderProcessingModel.lease_expires_at.is_(None),
+                    OrderProcessingModel.lease_expires_at < now,
+                ),
+            ),
+        )
+
+    async def bulk_finish(
+        self,
+        outcomes: dict[UUID, tuple[ProcessingStatus, str | None]],
+        owner: str | None = None
+    ) -> set[UUID]:
+        """
+        Записать итоговые статусы нескольких заказов одним UPDATE ... FROM (VALUES ...).
+
+        Обновляются только заказы в PROCESSING, аренда которых у owner: заказ,
+        перехваченный другим процессом после истечения аренды, не трогается.
+        Возвращает ID фактически завершенных заказов.
+        """
+        if not outcomes:
+            return set()
+
+        try:
+            finished = values(
+                column("order_id", UUIDColumn(as_uuid=True)),
+                column("status", String),
+                column("error_message", Text),
+                name="finished",
+            ).data([
+                (order_id, status.value, error_message)
+                for order_id, (status, error_message) in outcomes.items()
+            ])
+
+            now = datetime.utcnow()
+            stmt = (
+                update(OrderProcessingModel)
+                .where(
+                    OrderProcessingModel.order_id == finished.c.order_id,
+                    *self._owned(owner),
+                )
+                .values(
+                    status=cast(finished.c.status, OrderProcessingModel.status.type),
+                    error_message=finished.c.error_message,
+                    processed_at=now,
+                    updated_at=now,
+                    lease_owner=None,
+                    lease_expires_at=None,
+                )
+                .returning(OrderProcessingModel.order_id)
+                .execution_options(synchronize_session=False)
+            )
+            result = await self._session.execute(stmt)
+            finished_ids = set(result.scalars().all())
+            await self._commit()
+            return finished_ids
+        except SQLAlchemyError as exc:
+            await self._session.rollback()
+            raise RepositoryError("Failed to bulk update processing statuses") from exc
+
     async def update_status(
         self,
         order_id: UUID,
         status: ProcessingStatus,
-        error_message: str | None = None
-    ) -> OrderProcessing:
+        error_message: str | None = None,
+        owner: str | None = None
+    ) -> OrderProcessing | None:
+        """
+        Обновить статус заказа. Итоговый статус (SUCCESS/FAILED) записывается
+        только поверх PROCESSING с арендой у owner, иначе возвращается None:
+        заказ перехвачен другим процессом или уже завершен.
+        """
+        finishing = status in (ProcessingStatus.SUCCESS, ProcessingStatus.FAILED)
         try:
             stmt = select(OrderProcessingModel).where(
                 OrderProcessingModel.order_id == order_id
             )
+            if finishing:
+                stmt = stmt.where(*self._owned(owner)).with_for_update()
             result = await self._session.execute(stmt)
             db_processing = result.scalar_one_or_none()
             
             if db_processing is None:
+                if finishing:
+                    return None
                 raise RepositoryError(f"Processing not found for order_id: {order_id}")
             
             db_processing.status = status
             db_processing.error_message = error_message
-            if status in (ProcessingStatus.SUCCESS, ProcessingStatus.FAILED):
-                from datetime import datetime
+            if finishing:
                 db_processing.processed_at = datetime.utcnow()
+                db_processing.lease_owner = None
+                db_processing.lease_expires_at = None
             
             await self._commit()
             await self._session.refresh(db_processing)
@@ -75,6 +379,16 @@ class ProcessingRepository:
             await self._session.rollback()
             raise RepositoryError("Failed to update processing status") from exc
 
+    @staticmethod
+    def _owned(owner: str | None) -> list:
+        """
+        Условие владения захватом: заказ в PROCESSING и, при аренде, у owner.
+        """
+        conditions = [OrderProcessingModel.status == ProcessingStatus.PROCESSING]
+        if owner is not None:
+            conditions.append(OrderProcessingModel.lease_owner == owner)
+        return conditions
+
     @staticmethod
     def _to_entity(processing: OrderProcessingModel) -> OrderProcessing:
         """
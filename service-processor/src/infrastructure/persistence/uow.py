@@ -5,6 +5,7 @@ from collections.abc import AsyncGenerator
 from src.exceptions import AppError, UnitOfWorkError, RepositoryError, DatabaseConnectionError
 from src.infrastructure.persistence.db import Database
 from src.infrastructure.persistence.repositories.processing import ProcessingRepository
+from src.infrastructure.persistence.repositories.outbox import OutboxRepository
 from sqlalchemy.exc import SQLAlchemyError
 
 
@@ -14,6 +15,7 @@ class Repository:
     Репозитории доступные для UOW
     """
     processing: ProcessingRepository
+    outbox: OutboxRepository
 
 
 class UnitOfWork:
@@ -31,6 +33,7 @@ class UnitOfWork:
                 try:
                     yield Repository(
                         processing=ProcessingRepository(conn, auto_commit=False),
+                        outbox=OutboxRepository(conn, auto_commit=False),
                     )
                 except AppError:
                     await conn.rollback()
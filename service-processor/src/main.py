@@ -2,21 +2,43 @@ import asyncio
 import signal
 import sys
 from contextlib import asynccontextmanager
+from typing import Callable, Optional
 
 from src.container import Container
 from src.settings import settings
 from src.entity.processing import OrderCreatedEvent
 from src.logger import logger
 from src.usecase.processing.processing_usecase import ProcessingUseCase
+from src.infrastructure.engine.processing_engine import ProcessingEngine
+from src.infrastructure.messaging.outbox_publisher import OutboxPublisher
+from src.infrastructure.cache.finished_orders import FinishedOrdersFilter
+from src.usecase.processing.pipeline import ProcessingPipeline
+from src.infrastructure.persistence.lease_keeper import LeaseKeeper
 from src.exceptions import AppError, ProcessingError, MessagingError, ConnectionError
 
 
 class ProcessorService:
     """Сервис обработки заказов"""
     
-    def __init__(self, container: Container):
+    def __init__(
+        self,
+        container: Container,
+        metrics_sink: Optional[Callable[[dict[str, float]], None]] = None
+    ):
         self.container = container
         self._running = False
+        self._stop_event = asyncio.Event()
+        self._engine: ProcessingEngine | None = None
+        # Куда отдавать снимок метрик (супервизор при запуске нескольких процессов)
+        self._metrics_sink = metrics_sink
+
+    def request_stop(self) -> None:
+        """
+        Запросить плавную остановку (обработчик SIGINT/SIGTERM).
+        """
+        if not self._stop_event.is_set():
+            logger.info("Received shutdown signal, draining...")
+            self._stop_event.set()
         
     async def start(self) -> None:
         self._running = True
@@ -32,47 +54,204 @@ class ProcessorService:
         await rabbitmq_client.connect()
         logger.info("RabbitMQ connected")
 
+        outbox_publisher: OutboxPublisher = self.container.infrastructure.outbox_publisher()
+        await outbox_publisher.start()
+
+        lease_keeper: LeaseKeeper = self.container.infrastructure.lease_keeper()
+        await lease_keeper.start()
+
         processing_usecase: ProcessingUseCase = self.container.usecase.processing_usecase()
 
-        async def handle_order_created(message: dict) -> None:
-            event = OrderCreatedEvent(
+        def to_event(message: dict) -> OrderCreatedEvent:
+            return OrderCreatedEvent(
                 order_id=message.get("order_id"),
                 user_id=message.get("user_id"),
                 products=message.get("products", []),
                 amount=message.get("amount"),
                 created_at=message.get("created_at")
             )
-            await processing_usecase.process_order(event)
+
+        async def handle_order_created(message: dict) -> None:
+            await processing_usecase.process_order(to_event(message))
+
+        async def handle_order_created_batch(messages: list[dict]) -> dict[str, Exception]:
+            return await processing_usecase.process_orders([to_event(message) for message in messages])
+
+        engine: ProcessingEngine | None = None
         
         # Подписываемся на события order.created (это запускает бесконечный цикл)
         logger.info("Subscribed to order.created events")
         
+        if settings.PROCESSING_BATCH_SIZE > 1:
+            subscription = rabbitmq_client.subscribe_to_order_created_batch(
+                handle_order_created_batch,
+                batch_size=settings.PROCESSING_BATCH_SIZE,
+                flush_interval=settings.PROCESSING_BATCH_INTERVAL,
+            )
+        else:
+            engine = ProcessingEngine(
+                handle_order_created,
+                concurrency=settings.PROCESSING_CONCURRENCY,
+                queue_size=settings.PROCESSING_QUEUE_SIZE,
+                stats_interval=settings.PROCESSING_STATS_INTERVAL_SECONDS,
+            )
+            await engine.start()
+            self._engine = engine
+
+            # Брокер отдает не больше сообщений, чем помещается в слоты и
+            # очередь движка, остальные ждут в RabbitMQ
+            subscription = rabbitmq_client.subscribe_to_order_created(
+                engine.submit,
+                prefetch_count=engine.concurrency + engine.queue_size,
+            )
+
         # Запускаем подписку в фоне
-        subscribe_task = asyncio.create_task(
-            rabbitmq_client.subscribe_to_order_created(handle_order_created)
-        )
+        subscribe_task = asyncio.create_task(subscription)
+        stats_task = asyncio.create_task(self._log_stats_loop())
+        sweep_task = asyncio.create_task(self._sweep_expired_leases_loop(processing_usecase))
         
         logger.info("Processor service started. Waiting for messages...")
-        
+
+        stop_task = asyncio.create_task(self._stop_event.wait())
         try:
-            await subscribe_task
-        except asyncio.CancelledError:
-            logger.info("Subscription cancelled")
-        except KeyboardInterrupt:
-            logger.info("Received shutdown signal")
+            await asyncio.wait({subscribe_task, stop_task}, return_when=asyncio.FIRST_COMPLETED)
         finally:
-            if not subscribe_task.done():
-                subscribe_task.cancel()
-                try:
-                    await subscribe_task
-                except asyncio.CancelledError:
-                    pass
-            await self.stop()
+            stop_task.cancel()
+            await self._drain(engine, sweep_task, subscribe_task, stats_task)
+
+        # Подписка завершилась сама, а не по сигналу - ошибку отдаем наверх
+        if not subscribe_task.cancelled() and subscribe_task.exception() is not None:
+            raise subscribe_task.exception()
+
+    async def _drain(
+        self,
+        engine: ProcessingEngine | None,
+        sweep_task: asyncio.Task,
+        *tasks: asyncio.Task
+    ) -> None:
+        """
+        Плавная остановка: перестать брать сообщения и перехватывать аренды,
+        дать начатым заказам PROCESSING_DRAIN_TIMEOUT_SECONDS на завершение,
+        затем опубликовать outbox и закрыть соединения. Прерванные по дедлайну
+        заказы возвращаются в PENDING, их сообщения - в очередь.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.PROCESSING_DRAIN_TIMEOUT_SECONDS
+
+        rabbitmq_client = self.container.infrastructure.rabbitmq_client()
+        await rabbitmq_client.stop_consuming()
+
+        # Sweeper не должен брать новую работу в останавливающийся процесс.
+        # Прерванные им заказы остаются на аренде и достанутся живому процессу
+        sweep_task.cancel()
+        await asyncio.gather(sweep_task, return_exceptions=True)
+
+        if engine is not None:
+            drained = await engine.drain(max(deadline - loop.time(), 0))
+        else:
+            drained = await rabbitmq_client.wait_batches(max(deadline - loop.time(), 0))
+        if not drained:
+            logger.warning("Drain timeout exceeded, in-flight orders were handed back")
+
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        await self.stop(flush_timeout=max(deadline - loop.time(), 0))
     
-    async def stop(self) -> None:
+    def log_stats(self) -> None:
+        pipeline: ProcessingPipeline | None = self.container.usecase.processing_pipeline()
+        if pipeline is not None:
+            for stage in pipeline.stats():
+                logger.info(
+                    "Stage %s: calls=%s failures=%s avg=%.4fs max=%.4fs wait=%.3fs",
+                    stage.name, stage.calls, stage.failures,
+                    stage.avg_seconds, stage.max_seconds, stage.wait_seconds
+                )
+
+        finished_filter: FinishedOrdersFilter = self.container.infrastructure.finished_orders_filter()
+        stats = finished_filter.stats()
+        logger.info(
+            "Finished orders filter: size=%s/%s (~%.1f MB) hit_rate=%.1f%% "
+            "hits=%s misses=%s evictions=%s",
+            stats.size, stats.maxsize, stats.approx_bytes / 2**20,
+            100 * stats.hit_rate, stats.hits, stats.misses, stats.evictions
+        )
+
+    def metrics(self) -> dict[str, float]:
+        """
+        Снимок счетчиков процесса для агрегации супервизором.
+        """
+        metrics: dict[str, float] = {}
+        if self._engine is not None:
+            slots = self._engine.stats()
+            metrics["processed"] = sum(s.processed for s in slots)
+            metrics["failed"] = sum(s.failed for s in slots)
+            metrics["busy_seconds"] = sum(s.busy_seconds for s in slots)
+            metrics["queue_wait_seconds"] = sum(s.queue_wait_seconds for s in slots)
+
+        pipeline: ProcessingPipeline | None = self.container.usecase.processing_pipeline()
+        if pipeline is not None:
+            for stage in pipeline.stats():
+                metrics[f"stage.{stage.name}.calls"] = stage.calls
+                metrics[f"stage.{stage.name}.failures"] = stage.failures
+                metrics[f"stage.{stage.name}.seconds"] = stage.total_seconds
+
+        finished_filter: FinishedOrdersFilter = self.container.infrastructure.finished_orders_filter()
+        stats = finished_filter.stats()
+        metrics["finished_filter.hits"] = stats.hits
+        metrics["finished_filter.misses"] = stats.misses
+        return metrics
+
+    def _report_metrics(self) -> None:
+        if self._metrics_sink is not None:
+            self._metrics_sink(self.metrics())
+
+    async def _log_stats_loop(self) -> None:
+        if settings.PROCESSING_STATS_INTERVAL_SECONDS <= 0:
+            return
+        while True:
+            await asyncio.sleep(settings.PROCESSING_STATS_INTERVAL_SECONDS)
+            self.log_stats()
+            self._report_metrics()
+
+    async def _sweep_expired_leases_loop(self, processing_usecase: ProcessingUseCase) -> None:
+        """
+        Периодически забирать заказы упавших процессов. Пока находятся
+        просроченные аренды, следующая пачка забирается без паузы.
+        """
+        while True:
+            try:
+                recovered = await processing_usecase.recover_expired_orders(
+                    limit=settings.PROCESSING_LEASE_SWEEP_BATCH_SIZE
+                )
+            except AppError as e:
+                logger.error("Failed to recover expired orders: %s", e, exc_info=True)
+                recovered = 0
+            except Exception as e:
+                # Неожиданная ошибка не должна навсегда останавливать перехват аренд
+                logger.error("Unexpected error recovering expired orders: %s", e, exc_info=True)
+                recovered = 0
+            if recovered < settings.PROCESSING_LEASE_SWEEP_BATCH_SIZE:
+                await asyncio.sleep(settings.PROCESSING_LEASE_SWEEP_INTERVAL_SECONDS)
+
+    async def stop(self, flush_timeout: float = 0.0) -> None:
         self._running = False
+        lease_keeper: LeaseKeeper = self.container.infrastructure.lease_keeper()
+        await lease_keeper.stop()
+        outbox_publisher: OutboxPublisher = self.container.infrastructure.outbox_publisher()
+        await outbox_publisher.stop()
+        if flush_timeout > 0:
+            await outbox_publisher.flush(flush_timeout)
+        pipeline: ProcessingPipeline | None = self.container.usecase.processing_pipeline()
+        if pipeline is not None:
+            pipeline.shutdown()
         rabbitmq_client = self.container.infrastructure.rabbitmq_client()
         await rabbitmq_client.disconnect()
+        db = self.container.infrastructure.db()
+        await db.close()
+        self.log_stats()
+        self._report_metrics()
         logger.info("Processor service stopped")
 
 
@@ -82,17 +261,15 @@ def create_container() -> Container:
     return container
 
 
-async def main():
+async def main(metrics_sink: Optional[Callable[[dict[str, float]], None]] = None):
     container = create_container()
-    service = ProcessorService(container)
+    service = ProcessorService(container, metrics_sink=metrics_sink)
 
-    def signal_handler(sig, frame):
-        logger.info("Received signal, shutting down...")
-        asyncio.create_task(service.stop())
-        sys.exit(0)
-    
-    signal.signal(signal.SIGINT, signal_handler)
-    signal.signal(signal.SIGTERM, signal_handler)
+    # Сигнал только запускает drain: sys.exit из обработчика оборвал бы
+    # начатые заказы и оставил их на аренде
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, service.request_stop)
     
     try:
         await service.start()
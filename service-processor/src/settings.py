@@ -24,10 +24,39 @@ class Settings(BaseSettings):
     ORDER_PROCESSED_ROUTING_KEY: str
 
     PROCESSING_SUCCESS_RATE: float
+    PROCESSING_SIMULATION_LATENCY: str = "uniform:0.5,2.0"
+    PROCESSING_SIMULATION_FAILURES: str = ""
+    PROCESSING_SIMULATION_SEED: str = ""
+    PROCESSING_SIMULATION_CPU_BURN_MS: float = 0.0
     MAX_RETRY_ATTEMPTS: int
     RETRY_DELAY_BASE_SECONDS: int
     DLX_NAME: str
     DLQ_NAME: str
+
+    PROCESSING_CONCURRENCY: int = 8
+    PROCESSING_QUEUE_SIZE: int = 16
+    PROCESSING_STATS_INTERVAL_SECONDS: float = 60.0
+    PROCESSING_BATCH_SIZE: int = 1
+    PROCESSING_BATCH_INTERVAL: float = 0.05
+    PROCESSING_FINISHED_CACHE_SIZE: int = 100000
+    PROCESSING_STAGES: str = ""
+    PROCESSING_CPU_WORKERS: int = 2
+    PROCESSING_STAGE_CONCURRENCY: int = 8
+
+    PROCESSING_LEASE_SECONDS: float = 30.0
+    PROCESSING_HEARTBEAT_INTERVAL_SECONDS: float = 10.0
+    PROCESSING_LEASE_SWEEP_INTERVAL_SECONDS: float = 15.0
+    PROCESSING_LEASE_SWEEP_BATCH_SIZE: int = 8
+    PROCESSING_DRAIN_TIMEOUT_SECONDS: float = 30.0
+
+    PROCESSING_WORKERS: int = 1
+    PROCESSING_WORKER_RESTART_BACKOFF_SECONDS: float = 1.0
+    PROCESSING_WORKER_RESTART_BACKOFF_MAX_SECONDS: float = 60.0
+
+    OUTBOX_BATCH_SIZE: int = 100
+    OUTBOX_POLL_INTERVAL: float = 0.5
+    OUTBOX_MAX_RETRIES: int = 3
+    OUTBOX_MAX_BACKOFF: float = 30.0
     
     LOG_LEVEL: str
 
@@ -0,0 +1,199 @@
+import asyncio
+import multiprocessing
+import os
+import queue
+import signal
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from src.main import main
+from src.settings import settings
+from src.logger import logger
+
+
+@dataclass(slots=True)
+class WorkerState:
+    """
+    Состояние процесса-воркера под супервизором
+    """
+    index: int
+    process: Optional[multiprocessing.Process] = None
+    started_at: float = 0.0
+    restarts: int = 0
+    failures: int = 0
+    restart_at: Optional[float] = None
+
+
+def _run_worker(index: int, metrics_queue) -> None:
+    """
+    Точка входа процесса-воркера. Контейнер, соединение с RabbitMQ, пул БД и
+    LeaseKeeper (владелец host:pid) создаются уже в дочернем процессе.
+    """
+    def report(metrics: dict[str, float]) -> None:
+        try:
+            metrics_queue.put_nowait((index, os.getpid(), metrics))
+        except queue.Full:
+            pass
+
+    asyncio.run(main(metrics_sink=report))
+
+
+class Supervisor:
+    """
+    Запуск N процессов-воркеров обработки, чтобы один под использовал все ядра.
+
+    Упавший воркер перезапускается с экспоненциальной задержкой. Воркеры
+    присылают снимки счетчиков, супервизор суммирует их и пишет в лог.
+    По SIGTERM/SIGINT воркерам отправляется SIGTERM, и они проходят drain.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        backoff_seconds: float = 1.0,
+        backoff_max_seconds: float = 60.0,
+        stats_interval: float = 60.0,
+        stop_timeout: float = 40.0
+    ) -> None:
+        self._backoff_seconds = backoff_seconds
+        self._backoff_max_seconds = backoff_max_seconds
+        self._stats_interval = stats_interval
+        self._stop_timeout = stop_timeout
+        # spawn: воркер не наследует состояние родителя (event loop, сокеты)
+        self._context = multiprocessing.get_context("spawn")
+        self._metrics_queue = self._context.Queue()
+        self._workers = [WorkerState(index=i) for i in range(workers)]
+        # Последний снимок счетчиков каждого pid: у перезапущенного воркера
+        # счетчики начинаются с нуля, итог по старому pid сохраняется
+        self._metrics: dict[int, dict[str, float]] = {}
+        self._stopping = False
+
+    def run(self) -> None:
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(sig, self._request_stop)
+
+        for worker in self._workers:
+            self._start_worker(worker)
+        logger.info("Supervisor started %s processing workers", len(self._workers))
+
+        next_stats_at = time.monotonic() + self._stats_interval
+        while not self._stopping:
+            self._collect_metrics(timeout=0.5)
+            self._check_workers()
+            if self._stats_interval > 0 and time.monotonic() >= next_stats_at:
+                self.log_stats()
+                next_stats_at = time.monotonic() + self._stats_interval
+
+        self._shutdown()
+
+    def restart_delay(self, failures: int) -> float:
+        return min(self._backoff_seconds * 2 ** max(failures - 1, 0), self._backoff_max_seconds)
+
+    def aggregate(self) -> dict[str, float]:
+        totals: dict[str, float] = {}
+        for metrics in self._metrics.values():
+            for name, value in metrics.items():
+                totals[name] = totals.get(name, 0) + value
+        return totals
+
+    def log_stats(self) -> None:
+        alive = sum(1 for w in self._workers if w.process is not None and w.process.is_alive())
+        restarts = sum(w.restarts for w in self._workers)
+        totals = self.aggregate()
+        logger.info(
+            "Supervisor: workers alive=%s/%s restarts=%s processed=%s failed=%s",
+            alive, len(self._workers), restarts,
+            int(totals.get("processed", 0)), int(totals.get("failed", 0))
+        )
+        for name, value in sorted(totals.items()):
+            if name.startswith(("stage.", "finished_filter.")):
+                logger.info("Supervisor: %s=%s", name, round(value, 3))
+
+    def _request_stop(self, sig, frame) -> None:
+        if not self._stopping:
+            logger.info("Supervisor received signal %s, stopping workers...", sig)
+        self._stopping = True
+
+    def _start_worker(self, worker: WorkerState) -> None:
+        process = self._context.Process(
+            target=_run_worker,
+            args=(worker.index, self._metrics_queue),
+            name=f"processor-worker-{worker.index}",
+        )
+        process.start()
+        worker.process = process
+        worker.started_at = time.monotonic()
+        worker.restart_at = None
+        logger.info("Started processing worker %s (pid %s)", worker.index, process.pid)
+
+    def _check_workers(self) -> None:
+        now = time.monotonic()
+        for worker in self._workers:
+            if worker.restart_at is not None:
+                if now >= worker.restart_at:
+                    worker.restarts += 1
+                    self._start_worker(worker)
+                continue
+
+            if worker.process is None or worker.process.is_alive():
+                continue
+
+            # Проработал дольше максимальной задержки - считаем, что падения не подряд
+            if now - worker.started_at > self._backoff_max_seconds:
+                worker.failures = 0
+            worker.failures += 1
+            delay = self.restart_delay(worker.failures)
+            worker.restart_at = now + delay
+            logger.error(
+                "Processing worker %s (pid %s) exited with code %s, restarting in %.1fs",
+                worker.index, worker.process.pid, worker.process.exitcode, delay
+            )
+
+    def _collect_metrics(self, timeout: float) -> None:
+        try:
+            _, pid, metrics = self._metrics_queue.get(timeout=timeout)
+        except queue.Empty:
+            return
+        self._record(pid, metrics)
+        while True:
+            try:
+                _, pid, metrics = self._metrics_queue.get_nowait()
+            except queue.Empty:
+                return
+            self._record(pid, metrics)
+
+    def _record(self, pid: int, metrics: dict[str, float]) -> None:
+        self._metrics[pid] = metrics
+
+    def _shutdown(self) -> None:
+        running = [w.process for w in self._workers if w.process is not None and w.process.is_alive()]
+        for process in running:
+            process.terminate()
+
+        # Очередь метрик читаем и во время остановки: воркер с неотправленными
+        # данными в очереди не завершится
+        deadline = time.monotonic() + self._stop_timeout
+        while any(p.is_alive() for p in running) and time.monotonic() < deadline:
+            self._collect_metrics(timeout=0.2)
+
+        for process in running:
+            if process.is_alive():
+                logger.warning("Processing worker pid %s did not stop in time, killing", process.pid)
+                process.kill()
+            process.join()
+
+        self._collect_metrics(timeout=0)
+        self.log_stats()
+        logger.info("Supervisor stopped")
+
+
+def supervise() -> None:
+    Supervisor(
+        workers=settings.PROCESSING_WORKERS,
+        backoff_seconds=settings.PROCESSING_WORKER_RESTART_BACKOFF_SECONDS,
+        backoff_max_seconds=settings.PROCESSING_WORKER_RESTART_BACKOFF_MAX_SECONDS,
+        stats_interval=settings.PROCESSING_STATS_INTERVAL_SECONDS,
+        # Воркеру нужно время на drain и flush outbox
+        stop_timeout=settings.PROCESSING_DRAIN_TIMEOUT_SECONDS + 10,
+    ).run()
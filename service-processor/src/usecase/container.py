@@ -7,7 +7,11 @@ from dependency_injector import containers, providers
 from src.infrastructure.persistence.repositories.processing import ProcessingRepository
 from src.infrastructure.persistence.uow import UnitOfWork
 from src.infrastructure.messaging.rabbitmq_client import RabbitMQClient
+from src.infrastructure.cache.finished_orders import FinishedOrdersFilter
+from src.infrastructure.persistence.lease_keeper import LeaseKeeper
 from src.usecase.processing.processing_usecase import ProcessingUseCase
+from src.usecase.processing.pipeline import build_pipeline
+from src.usecase.processing.simulator import build_simulator
 
 
 class UseCaseContainer(containers.DeclarativeContainer):
@@ -15,10 +19,41 @@ class UseCaseContainer(containers.DeclarativeContainer):
     processing_repository: providers.Dependency[ProcessingRepository] = providers.Dependency()
     uow: providers.Dependency[UnitOfWork] = providers.Dependency()
     rabbitmq_client: providers.Dependency[RabbitMQClient] = providers.Dependency()
+    finished_orders_filter: providers.Dependency[FinishedOrdersFilter] = providers.Dependency()
+    lease_keeper: providers.Dependency[LeaseKeeper] = providers.Dependency()
+    pipeline_stages: providers.Dependency[str] = providers.Dependency(default="")
+    pipeline_cpu_workers: providers.Dependency[int] = providers.Dependency(default=2)
+    pipeline_stage_concurrency: providers.Dependency[int] = providers.Dependency(default=8)
+    simulation_latency: providers.Dependency[str] = providers.Dependency(default="uniform:0.5,2.0")
+    simulation_failures: providers.Dependency[str] = providers.Dependency(default="")
+    simulation_seed: providers.Dependency[str] = providers.Dependency(default="")
+    simulation_cpu_burn_ms: providers.Dependency[float] = providers.Dependency(default=0.0)
+    success_rate: providers.Dependency[float] = providers.Dependency(default=0.8)
+
+    # Один пайплайн (и пул процессов) на процесс
+    processing_pipeline = providers.Singleton(
+        build_pipeline,
+        spec=pipeline_stages,
+        cpu_workers=pipeline_cpu_workers,
+        default_concurrency=pipeline_stage_concurrency,
+    )
+
+    processing_simulator = providers.Singleton(
+        build_simulator,
+        latency=simulation_latency,
+        failures=simulation_failures,
+        seed=simulation_seed,
+        cpu_burn_ms=simulation_cpu_burn_ms,
+        success_rate=success_rate,
+    )
 
     processing_usecase = providers.Factory(
         ProcessingUseCase,
         repository=processing_repository,
         uow=uow,
         rabbitmq_client=rabbitmq_client,
+        finished_filter=finished_orders_filter,
+        pipeline=processing_pipeline,
+        lease_keeper=lease_keeper,
+        simulator=processing_simulator,
     )
@@ -0,0 +1,176 @@
+import asyncio
+import functools
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, Callable, Optional
+
+from src.exceptions import PipelineStageError, ProcessingError
+from src.usecase.processing.stages import price_order, score_fraud
+
+
+class StageKind(str, Enum):
+    """
+    Где выполняется стадия
+    """
+    IO = "io"    # в event loop: корутина или дешевая синхронная функция
+    CPU = "cpu"  # функция в ProcessPoolExecutor
+
+
+@dataclass(slots=True)
+class Stage:
+    """
+    Стадия пайплайна обработки.
+
+    inputs - поля контекста, которые передаются в func. Для CPU стадий только
+    они сериализуются в процесс-воркер, а не весь контекст заказа.
+    """
+    name: str
+    func: Callable[..., Any]
+    kind: StageKind
+    inputs: tuple[str, ...]
+    concurrency: int = 8
+
+
+@dataclass(slots=True)
+class StageStats:
+    """
+    Метрики стадии пайплайна
+    """
+    name: str
+    calls: int = 0
+    failures: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+    wait_seconds: float = 0.0
+
+    @property
+    def avg_seconds(self) -> float:
+        return self.total_seconds / self.calls if self.calls else 0.0
+
+
+# Стадии, доступные в PROCESSING_STAGES
+STAGES: dict[str, tuple[Callable[..., Any], StageKind, tuple[str, ...]]] = {
+    # Пересчет цен дешевле сериализации в процесс-воркер
+    "pricing": (price_order, StageKind.IO, ("products", "amount")),
+    "fraud_score": (score_fraud, StageKind.CPU, ("user_id", "amount", "products")),
+}
+
+
+class ProcessingPipeline:
+    """
+    Последовательность стадий обработки заказа.
+
+    Каждая стадия ограничена своим семафором, CPU стадии выполняются в общем
+    пуле процессов и не блокируют event loop потребителя.
+    """
+
+    def __init__(self, stages: list[Stage], cpu_workers: int = 2) -> None:
+        self._stages = stages
+        self._cpu_workers = cpu_workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._semaphores = {stage.name: asyncio.Semaphore(stage.concurrency) for stage in stages}
+        self._stats = {stage.name: StageStats(name=stage.name) for stage in stages}
+
+    async def run(self, context: dict) -> dict:
+        """
+        Прогнать контекст заказа через все стадии. Результат каждой стадии
+        дописывается в контекст. Ошибка стадии - PipelineStageError.
+        """
+        for stage in self._stages:
+            context.update(await self._run_stage(stage, context))
+        return context
+
+    def stats(self) -> list[StageStats]:
+        return [
+            StageStats(
+                name=s.name,
+                calls=s.calls,
+                failures=s.failures,
+                total_seconds=s.total_seconds,
+                max_seconds=s.max_seconds,
+                wait_seconds=s.wait_seconds,
+            )
+            for s in self._stats.values()
+        ]
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    async def _run_stage(self, stage: Stage, context: dict) -> dict:
+        stats = self._stats[stage.name]
+        kwargs = {name: context[name] for name in stage.inputs}
+
+        queued_at = time.monotonic()
+        async with self._semaphores[stage.name]:
+            started_at = time.monotonic()
+            stats.wait_seconds += started_at - queued_at
+            try:
+                if stage.kind == StageKind.CPU:
+                    result = await asyncio.get_running_loop().run_in_executor(
+                        self._get_executor(), functools.partial(stage.func, **kwargs)
+                    )
+                else:
+                    result = stage.func(**kwargs)
+                    if asyncio.iscoroutine(result):
+                        result = await result
+            except BrokenProcessPool as e:
+                # Упал процесс-воркер, а не стадия: заказ не виноват, пул пересоздается
+                stats.failures += 1
+                self._executor = None
+                raise ProcessingError(
+                    order_id=context.get("order_id"),
+                    message="Process pool is broken: %s" % e
+                ) from e
+            except Exception as e:
+                stats.failures += 1
+                raise PipelineStageError(stage=stage.name, message=str(e)) from e
+            finally:
+                duration = time.monotonic() - started_at
+                stats.calls += 1
+                stats.total_seconds += duration
+                stats.max_seconds = max(stats.max_seconds, duration)
+
+        return result or {}
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        # spawn, а не fork: fork процесса с работающим event loop и потоками aio_pika небезопасен
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self._cpu_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+
+def build_pipeline(
+    spec: str,
+    cpu_workers: int = 2,
+    default_concurrency: int = 8
+) -> Optional[ProcessingPipeline]:
+    """
+    Собрать пайплайн из строки вида "pricing,fraud_score:2" (имя[:concurrency]).
+    Пустая строка - пайплайн не используется.
+    """
+    stages = []
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, concurrency = item.partition(":")
+        if name not in STAGES:
+            raise ValueError(f"Unknown processing stage: {name}")
+        func, kind, inputs = STAGES[name]
+        stages.append(Stage(
+            name=name,
+            func=func,
+            kind=kind,
+            inputs=inputs,
+            concurrency=int(concurrency) if concurrency else default_concurrency,
+        ))
+
+    if not stages:
+        return None
+    return ProcessingPipeline(stages, cpu_workers=cpu_workers)
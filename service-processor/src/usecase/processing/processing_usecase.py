@@ -1,5 +1,7 @@
-import random
+import asyncio
+import json
 import uuid
+from dataclasses import asdict
 from uuid import UUID
 from datetime import datetime
 
@@ -12,13 +14,17 @@ from src.entity.processing import (
 from src.infrastructure.persistence.repositories.processing import ProcessingRepository
 from src.infrastructure.persistence.uow import UnitOfWork
 from src.infrastructure.messaging.rabbitmq_client import RabbitMQClient
+from src.infrastructure.cache.finished_orders import FinishedOrdersFilter
+from src.usecase.processing.pipeline import ProcessingPipeline
+from src.usecase.processing.simulator import ProcessingSimulator, build_simulator
+from src.infrastructure.persistence.lease_keeper import LeaseKeeper
 from src.settings import settings
 from src.logger import logger
 from src.exceptions import (
     ProcessingError, 
+    ProcessingInterruptedError,
     RepositoryError, 
-    MessagingError, 
-    MessagePublishError,
+    PipelineStageError,
     AppError
 )
 
@@ -32,100 +38,368 @@ class ProcessingUseCase:
         self,
         repository: ProcessingRepository,
         uow: UnitOfWork,
-        rabbitmq_client: RabbitMQClient
+        rabbitmq_client: RabbitMQClient,
+        finished_filter: FinishedOrdersFilter | None = None,
+        pipeline: ProcessingPipeline | None = None,
+        lease_keeper: LeaseKeeper | None = None,
+        simulator: ProcessingSimulator | None = None
     ) -> None:
         self._repository = repository
         self._uow = uow
         self._rabbitmq_client = rabbitmq_client
+        self._finished_filter = finished_filter
+        self._pipeline = pipeline
+        self._lease_keeper = lease_keeper
+        self._simulator = simulator or build_simulator(success_rate=settings.PROCESSING_SUCCESS_RATE)
 
     async def process_order(self, event: OrderCreatedEvent) -> None:
         """
         Обработка заказа из события order.created.
         """
         order_id = UUID(event.order_id)
+
+        # Повторная доставка уже завершенного заказа - подтверждаем без БД
+        if self._is_finished(order_id):
+            return
         
         async with self._uow.init() as repositories:
-            existing_processing = await repositories.processing.get_by_order_id(order_id)
+            claim = await repositories.processing.claim(
+                order_id,
+                **self._lease_kwargs(payload=self._event_payload(event))
+            )
+
+        if not claim.claimed:
+            if claim.status in (ProcessingStatus.SUCCESS, ProcessingStatus.FAILED):
+                self._remember_finished(order_id)
+            elif claim.status == ProcessingStatus.PROCESSING:
+                logger.warning(
+                    f"Order {order_id} is already being processed. "
+                    f"Possible duplicate message."
+                )
+            return
+
+        await self._run_claimed(order_id, event)
+
+    async def _run_claimed(
+        self,
+        order_id: UUID,
+        event: OrderCreatedEvent,
+        hand_back: bool = True
+    ) -> None:
+        """
+        Обработка захваченного заказа: стадии, итоговый статус и событие в outbox.
+        При остановке процесса заказ возвращается в PENDING (hand_back), иначе
+        остается на аренде и достается sweeper-у после ее истечения.
+        """
+        self._track(order_id)
+        try:
+            # Стадии пайплайна и псевдослучайная обработка
+            try:
+                try:
+                    success, error_message = await self._process(event)
+                except ProcessingError:
+                    # Сбой инфраструктуры (например, упал пул процессов), а не заказа:
+                    # заказ возвращается в PENDING, чтобы retry сообщения захватил его снова
+                    if hand_back:
+                        await self._hand_back([order_id])
+                    raise
             
-            if existing_processing:
-                if existing_processing.status in (ProcessingStatus.SUCCESS, ProcessingStatus.FAILED):
-                    return
-                elif existing_processing.status == ProcessingStatus.PROCESSING:
-                    logger.warning(
-                        f"Order {order_id} is already being processed. "
-                        f"Possible duplicate message."
-                    )
-                    return
+                if success:
+                    if await self._finish(order_id, ProcessingStatus.SUCCESS):
+                        logger.info(f"Order {order_id} processed successfully")
+                elif await self._finish(order_id, ProcessingStatus.FAILED, error_message):
+                    logger.warning(f"Order {order_id} processing failed: {error_message}")
 
-            if not existing_processing:
-                processing = await repositories.processing.create_processing(order_id)
-            else:
-                processing = existing_processing
+                self._remember_finished(order_id)
+            except RepositoryError as e:
+                logger.error("Error processing order %s: %s", order_id, e, exc_info=True)
+                await self._finish(order_id, ProcessingStatus.FAILED, str(e))
+            
+                raise ProcessingError(order_id=order_id, message=str(e)) from e
+        except asyncio.CancelledError:
+            if hand_back:
+                await self._hand_back([order_id])
+            raise
+        finally:
+            self._release(order_id)
 
+    async def _finish(
+        self,
+        order_id: UUID,
+        status: ProcessingStatus,
+        error_message: str | None = None
+    ) -> bool:
+        """
+        Записать итоговый статус и событие order.processed одной транзакцией.
+        Если аренду перехватил другой процесс, ничего не пишется: событие
+        отправит новый владелец.
+        """
+        async with self._uow.init() as repositories:
             processing = await repositories.processing.update_status(
                 order_id,
-                ProcessingStatus.PROCESSING
+                status,
+                error_message=error_message,
+                owner=self._owner()
             )
-        
-        # Симулируем псевдослучайную обработку
+            if processing is None:
+                logger.warning(f"Order {order_id} lease was lost, result is discarded")
+                return False
+            await self._add_order_processed_event(
+                repositories,
+                order_id=order_id,
+                status=status.value,
+                error_message=error_message
+            )
+        return True
+
+    async def recover_expired_orders(self, limit: int = 100) -> int:
+        """
+        Забрать и довести заказы, аренда которых истекла (обработчик упал).
+        Возвращает число перехваченных заказов.
+        """
+        if self._lease_keeper is None:
+            return 0
+
+        async with self._uow.init() as repositories:
+            reclaimed = await repositories.processing.reclaim_expired(
+                owner=self._lease_keeper.owner,
+                lease_seconds=self._lease_keeper.lease_seconds,
+                limit=limit
+            )
+
+        if not reclaimed:
+            return 0
+
+        logger.warning(f"Recovering {len(reclaimed)} orders with expired processing lease")
+
+        async def recover(order_id: UUID, payload: str) -> None:
+            # Битый payload ломает только свой заказ, а не всю пачку
+            event = OrderCreatedEvent(**json.loads(payload))
+            # Сообщения в брокере у перехваченного заказа может уже не быть:
+            # при остановке он не возвращается в PENDING, а ждет истечения аренды
+            await self._run_claimed(order_id, event, hand_back=False)
+
+        results = await asyncio.gather(
+            *(recover(order_id, payload) for order_id, payload in reclaimed),
+            return_exceptions=True
+        )
+        for (order_id, _), result in zip(reclaimed, results):
+            if isinstance(result, Exception):
+                logger.error("Failed to recover order %s: %s", order_id, result)
+        return len(reclaimed)
+
+    async def process_orders(self, events: list[OrderCreatedEvent]) -> dict[str, Exception]:
+        """
+        Пакетная обработка событий order.created.
+
+        Все заказы пачки захватываются одним upsert, обрабатываются конкурентно,
+        итоговые статусы и события order.processed пишутся одной транзакцией.
+        Возвращает ошибки по отдельным заказам для поштучного retry/DLQ.
+        """
+        failures: dict[str, Exception] = {}
+        order_events: dict[UUID, OrderCreatedEvent] = {}
+
+        for event in events:
+            try:
+                order_id = UUID(event.order_id)
+            except (TypeError, ValueError):
+                logger.error("Invalid order_id format: %s", event.order_id)
+                failures[event.order_id] = ValueError("Invalid order_id format: %s" % event.order_id)
+                continue
+            if not self._is_finished(order_id):
+                order_events[order_id] = event
+
+        if not order_events:
+            return failures
+
+        async with self._uow.init() as repositories:
+            claimed = await repositories.processing.claim_many(
+                list(order_events),
+                **self._lease_kwargs(payloads={
+                    order_id: self._event_payload(event) for order_id, event in order_events.items()
+                })
+            )
+
+        skipped = len(order_events) - len(claimed)
+        if skipped:
+            logger.info(f"Skipped {skipped} already processed or in-flight orders in batch")
+        if not claimed:
+            return failures
+
+        claimed_ids = list(claimed)
+        for order_id in claimed_ids:
+            self._track(order_id)
         try:
-            success = await self._simulate_processing()
-            
-            async with self._uow.init() as repositories:
-                if success:
-                    processing = await repositories.processing.update_status(
-                        order_id,
-                        ProcessingStatus.SUCCESS
-                    )
-                    logger.info(f"Order {order_id} processed successfully")
+            results = await asyncio.gather(
+                *(self._process(order_events[order_id]) for order_id in claimed_ids),
+                return_exceptions=True
+            )
 
-                    await self._rabbitmq_client.publish_order_processed(
-                        order_id=str(order_id),
-                        status="SUCCESS"
+            outcomes: dict[UUID, tuple[ProcessingStatus, str | None]] = {}
+            interrupted: list[UUID] = []
+            for order_id, result in zip(claimed_ids, results):
+                if isinstance(result, ProcessingError):
+                    # Сбой инфраструктуры, а не заказа: не FAILED, а retry сообщения
+                    interrupted.append(order_id)
+                    failures[order_events[order_id].order_id] = result
+                elif isinstance(result, asyncio.CancelledError):
+                    # Отменена задача заказа (например, future пула при shutdown),
+                    # а не весь батч: заказ возвращается в PENDING, сообщение в очередь
+                    interrupted.append(order_id)
+                    failures[order_events[order_id].order_id] = ProcessingInterruptedError(
+                        "Order processing was cancelled"
                     )
+                elif isinstance(result, BaseException):
+                    outcomes[order_id] = (ProcessingStatus.FAILED, str(result))
                 else:
-                    error_message = "Simulated processing failure"
-                    processing = await repositories.processing.update_status(
-                        order_id,
-                        ProcessingStatus.FAILED,
-                        error_message=error_message
+                    success, error_message = result
+                    outcomes[order_id] = (
+                        (ProcessingStatus.SUCCESS, None) if success
+                        else (ProcessingStatus.FAILED, error_message)
                     )
-                    logger.warning(f"Order {order_id} processing failed: {error_message}")
 
-                    await self._rabbitmq_client.publish_order_processed(
-                        order_id=str(order_id),
-                        status="FAILED",
-                        error_message=error_message
-                    )
-        except (RepositoryError, MessagingError, MessagePublishError) as e:
-            logger.error("Error processing order %s: %s", order_id, e, exc_info=True)
-            
-            async with self._uow.init() as repositories:
-                await repositories.processing.update_status(
-                    order_id,
-                    ProcessingStatus.FAILED,
-                    error_message=str(e)
-                )
-            
+            if interrupted:
+                await self._hand_back(interrupted)
+
+            finished: set[UUID] = set()
+            if outcomes:
+                async with self._uow.init() as repositories:
+                    finished = await repositories.processing.bulk_finish(outcomes, owner=self._owner())
+                    # События только по фактически завершенным: перехваченные
+                    # другим процессом после истечения аренды завершит он
+                    if finished:
+                        await repositories.outbox.create_messages([
+                            (
+                                "order.processed",
+                                settings.ORDER_PROCESSED_EXCHANGE,
+                                settings.ORDER_PROCESSED_ROUTING_KEY,
+                                self._order_processed_payload(order_id, status.value, error_message),
+                            )
+                            for order_id, (status, error_message) in outcomes.items()
+                            if order_id in finished
+                        ])
+
+            lost = len(outcomes) - len(finished)
+            if lost:
+                logger.warning(f"Discarded results of {lost} orders whose lease was lost")
+            outcomes = {order_id: outcomes[order_id] for order_id in finished}
+
+            for order_id in outcomes:
+                self._remember_finished(order_id)
+        except asyncio.CancelledError:
+            await self._hand_back(claimed_ids)
+            raise
+        finally:
+            for order_id in claimed_ids:
+                self._release(order_id)
+
+        succeeded = sum(1 for status, _ in outcomes.values() if status == ProcessingStatus.SUCCESS)
+        logger.info(
+            f"Processed batch of {len(outcomes)} orders "
+            f"({succeeded} succeeded, {len(outcomes) - succeeded} failed)"
+        )
+        return failures
+
+    async def _process(self, event: OrderCreatedEvent) -> tuple[bool, str | None]:
+        """
+        Прогнать заказ через стадии пайплайна и симуляцию.
+        Возвращает (успех, причина неудачи).
+        """
+        if self._pipeline is not None:
             try:
-                await self._rabbitmq_client.publish_order_processed(
-                    order_id=str(order_id),
-                    status="FAILED",
-                    error_message=str(e)
-                )
-            except MessagingError:
-                logger.warning("Failed to publish failure event for order %s", order_id)
-            
-            raise ProcessingError(message=str(e)) from e
+                await self._pipeline.run({
+                    "order_id": event.order_id,
+                    "user_id": event.user_id,
+                    "products": event.products,
+                    "amount": event.amount,
+                })
+            except PipelineStageError as e:
+                logger.warning(f"Order {event.order_id} failed at stage {e.stage}: {e.message}")
+                return False, f"{e.stage}: {e.message}"
+
+        return await self._simulate_processing(event.order_id)
+
+    def _lease_kwargs(self, **kwargs) -> dict:
+        """
+        Параметры аренды для claim. Без LeaseKeeper аренда не выдается.
+        """
+        if self._lease_keeper is None:
+            return {}
+        return {
+            "owner": self._lease_keeper.owner,
+            "lease_seconds": self._lease_keeper.lease_seconds,
+            **kwargs,
+        }
+
+    async def _hand_back(self, order_ids: list[UUID]) -> None:
+        """
+        Вернуть прерванные заказы в PENDING: сообщение вернется в очередь,
+        и следующий процесс захватит заказ сразу, а не после истечения аренды.
+        """
+        try:
+            async with self._uow.init() as repositories:
+                await repositories.processing.release_claims(order_ids, owner=self._owner())
+            logger.info(f"Handed back {len(order_ids)} interrupted orders")
+        except AppError as e:
+            logger.error("Failed to hand back orders %s: %s", order_ids, e, exc_info=True)
+
+    def _owner(self) -> str | None:
+        return self._lease_keeper.owner if self._lease_keeper is not None else None
+
+    def _track(self, order_id: UUID) -> None:
+        if self._lease_keeper is not None:
+            self._lease_keeper.track(order_id)
+
+    def _release(self, order_id: UUID) -> None:
+        if self._lease_keeper is not None:
+            self._lease_keeper.release(order_id)
 
+    @staticmethod
+    def _event_payload(event: OrderCreatedEvent) -> str:
+        return json.dumps(asdict(event))
 
-    async def _simulate_processing(self) -> bool:
+    def _is_finished(self, order_id: UUID) -> bool:
+        return self._finished_filter is not None and order_id in self._finished_filter
+
+    def _remember_finished(self, order_id: UUID) -> None:
+        if self._finished_filter is not None:
+            self._finished_filter.add(order_id)
+
+    async def _add_order_processed_event(
+            self,
+            repositories,
+            order_id: UUID,
+            status: str,
+            error_message: str | None = None
+    ) -> None:
         """
-        Симуляция обработки заказа.
+        Создает событие order.processed в outbox в транзакции смены статуса.
         """
+        await repositories.outbox.create_message(
+            event_type="order.processed",
+            exchange=settings.ORDER_PROCESSED_EXCHANGE,
+            routing_key=settings.ORDER_PROCESSED_ROUTING_KEY,
+            payload=self._order_processed_payload(order_id, status, error_message)
+        )
 
-        import asyncio
-        await asyncio.sleep(random.uniform(0.5, 2.0))
+    @staticmethod
+    def _order_processed_payload(
+            order_id: UUID,
+            status: str,
+            error_message: str | None = None
+    ) -> str:
+        return json.dumps({
+            "order_id": str(order_id),
+            "status": status,
+            "error_message": error_message,
+            "processed_at": datetime.utcnow().isoformat()
+        })
 
-        success_rate = settings.PROCESSING_SUCCESS_RATE
-        return random.random() < success_rate
+    async def _simulate_processing(self, order_id: str | None = None) -> tuple[bool, str | None]:
+        """
+        Симуляция обработки заказа. Возвращает (успех, причина неудачи).
+        """
+        error_type = await self._simulator.run(order_id)
+        if error_type is not None:
+            return False, f"Simulated {error_type} failure"
+        return True, None
@@ -0,0 +1,194 @@
+import asyncio
+import bisect
+import hashlib
+import math
+import random
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, Protocol
+
+
+class LatencyDistribution(Protocol):
+    """
+    Распределение задержки обработки заказа, секунды
+    """
+    def sample(self, rng: random.Random) -> float: ...
+
+
+@dataclass(slots=True)
+class FixedLatency:
+    seconds: float
+
+    def sample(self, rng: random.Random) -> float:
+        return self.seconds
+
+
+@dataclass(slots=True)
+class UniformLatency:
+    low: float
+    high: float
+
+    def sample(self, rng: random.Random) -> float:
+        return rng.uniform(self.low, self.high)
+
+
+@dataclass(slots=True)
+class LogNormalLatency:
+    """
+    Лог-нормальное распределение с медианой median и параметром формы sigma
+    """
+    median: float
+    sigma: float
+
+    def sample(self, rng: random.Random) -> float:
+        return rng.lognormvariate(math.log(self.median), self.sigma)
+
+
+class HistogramLatency:
+    """
+    Задержка по гистограмме, снятой с продакшена.
+
+    Файл: строка "верхняя_граница_в_секундах количество" на бакет (пробел или
+    запятая), строки с # пропускаются. Внутри бакета значение равномерно
+    между границей предыдущего и текущего бакета.
+    """
+
+    def __init__(self, buckets: list[tuple[float, float]]) -> None:
+        if not buckets:
+            raise ValueError("Latency histogram is empty")
+        buckets = sorted(buckets)
+        self._bounds = [0.0] + [bound for bound, _ in buckets]
+        self._cumulative: list[float] = []
+        total = 0.0
+        for _, count in buckets:
+            total += count
+            self._cumulative.append(total)
+        if total <= 0:
+            raise ValueError("Latency histogram has no samples")
+
+    @classmethod
+    def from_file(cls, path: str) -> "HistogramLatency":
+        buckets = []
+        for line in Path(path).read_text().splitlines():
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            bound, count = line.replace(",", " ").split()
+            buckets.append((float(bound), float(count)))
+        return cls(buckets)
+
+    def sample(self, rng: random.Random) -> float:
+        index = bisect.bisect_right(self._cumulative, rng.random() * self._cumulative[-1])
+        index = min(index, len(self._cumulative) - 1)
+        return rng.uniform(self._bounds[index], self._bounds[index + 1])
+
+
+@dataclass(slots=True)
+class SimulationOutcome:
+    """
+    Результат симуляции: задержка и тип инжектированной ошибки (None - успех)
+    """
+    latency: float
+    error_type: Optional[str] = None
+
+
+class ProcessingSimulator:
+    """
+    Симуляция обработки заказа для нагрузочного тестирования.
+
+    С seed исход каждого заказа (задержка, ошибка) выводится из пары
+    (seed, order_id), поэтому прогон воспроизводится при любом порядке
+    доставки, числе слотов и процессов. Без seed - обычный random.
+    """
+
+    def __init__(
+        self,
+        latency: LatencyDistribution,
+        failure_rates: dict[str, float],
+        seed: Optional[str] = None,
+        cpu_burn_ms: float = 0.0
+    ) -> None:
+        if sum(failure_rates.values()) > 1:
+            raise ValueError("Sum of simulated failure rates exceeds 1")
+        self._latency = latency
+        self._failure_rates = failure_rates
+        self._seed = seed
+        self._cpu_burn_seconds = cpu_burn_ms / 1000
+
+    def outcome(self, order_id: Optional[str] = None) -> SimulationOutcome:
+        rng = random.Random(f"{self._seed}:{order_id}") if self._seed else random
+        latency = max(self._latency.sample(rng), 0.0)
+
+        # Один бросок на заказ: типы ошибок делят [0, 1) по своим долям
+        roll = rng.random()
+        for error_type, rate in self._failure_rates.items():
+            if roll < rate:
+                return SimulationOutcome(latency=latency, error_type=error_type)
+            roll -= rate
+        return SimulationOutcome(latency=latency)
+
+    async def run(self, order_id: Optional[str] = None) -> Optional[str]:
+        """
+        Симулировать обработку заказа. Возвращает тип ошибки или None.
+        """
+        outcome = self.outcome(order_id)
+        # CPU часть выполняется в event loop, как синхронный код обработчика
+        if self._cpu_burn_seconds > 0:
+            _burn_cpu(self._cpu_burn_seconds)
+        await asyncio.sleep(outcome.latency)
+        return outcome.error_type
+
+
+def _burn_cpu(seconds: float) -> None:
+    deadline = time.perf_counter() + seconds
+    digest = b""
+    while time.perf_counter() < deadline:
+        digest = hashlib.sha256(digest).digest()
+
+
+def parse_latency(spec: str) -> LatencyDistribution:
+    """
+    Распределение из строки: "fixed:1.0", "uniform:0.5,2.0",
+    "lognormal:0.8,0.5" (медиана, sigma), "histogram:/path/to/file".
+    """
+    kind, _, args = spec.partition(":")
+    kind = kind.strip()
+    if kind == "histogram":
+        return HistogramLatency.from_file(args.strip())
+
+    params = [float(arg) for arg in args.split(",") if arg.strip()]
+    if kind == "fixed" and len(params) == 1:
+        return FixedLatency(*params)
+    if kind == "uniform" and len(params) == 2:
+        return UniformLatency(*params)
+    if kind == "lognormal" and len(params) == 2:
+        return LogNormalLatency(*params)
+    raise ValueError(f"Invalid latency distribution: {spec}")
+
+
+def build_simulator(
+    latency: str = "uniform:0.5,2.0",
+    failures: str = "",
+    seed: str = "",
+    cpu_burn_ms: float = 0.0,
+    success_rate: float = 0.8
+) -> ProcessingSimulator:
+    """
+    Собрать симулятор из настроек. failures - строка вида
+    "payment_declined:0.05,out_of_stock:0.02"; пустая строка - одна ошибка
+    processing с долей 1 - success_rate.
+    """
+    failure_rates: dict[str, float] = {}
+    for item in filter(None, (part.strip() for part in failures.split(","))):
+        error_type, _, rate = item.partition(":")
+        failure_rates[error_type.strip()] = float(rate)
+    if not failures.strip():
+        failure_rates = {"processing": 1 - success_rate}
+
+    return ProcessingSimulator(
+        latency=parse_latency(latency),
+        failure_rates=failure_rates,
+        seed=seed or None,
+        cpu_burn_ms=cpu_burn_ms,
+    )
@@ -0,0 +1,47 @@
+"""
+Стадии обработки заказа.
+
+CPU стадии выполняются в отдельных процессах, поэтому это функции уровня
+модуля: они получают только поля из inputs и возвращают словарь, который
+дописывается в контекст заказа.
+"""
+import hashlib
+from decimal import Decimal, ROUND_HALF_UP
+
+# Число раундов хеширования при скоринге и порог отказа
+FRAUD_SCORE_ROUNDS = 20000
+FRAUD_SCORE_THRESHOLD = 0.99
+
+
+def price_order(products: list, amount: float) -> dict:
+    """
+    Пересчет стоимости позиций: распределяет сумму заказа по количеству товаров.
+    """
+    quantities = [int(product.get("quantity", 0)) for product in products]
+    if not quantities or any(quantity <= 0 for quantity in quantities):
+        raise ValueError("Order has no positive quantities")
+
+    total = Decimal(str(amount))
+    if total <= 0:
+        raise ValueError("Order amount must be positive")
+
+    unit_price = (total / sum(quantities)).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+    return {
+        "unit_price": str(unit_price),
+        "line_totals": [str(unit_price * quantity) for quantity in quantities],
+    }
+
+
+def score_fraud(user_id: str, amount: float, products: list) -> dict:
+    """
+    Скоринг заказа: итеративное хеширование признаков, результат в [0, 1).
+    Заказы со скорингом выше порога отклоняются.
+    """
+    digest = f"{user_id}:{amount}:{len(products)}".encode()
+    for _ in range(FRAUD_SCORE_ROUNDS):
+        digest = hashlib.sha256(digest).digest()
+
+    score = int.from_bytes(digest[:8], "big") / 2 ** 64
+    if score > FRAUD_SCORE_THRESHOLD:
+        raise ValueError("Fraud score %.4f is above threshold" % score)
+    return {"fraud_score": score}
@@ -0,0 +1,142 @@
+"""
+Тесты для outbox сервиса обработки заказов.
+"""
+import asyncio
+import contextlib
+import json
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import uuid4
+from sqlalchemy.dialects import postgresql
+
+from src.infrastructure.messaging.outbox_publisher import OutboxPublisher
+from src.infrastructure.persistence.repositories.outbox import OutboxRepository
+from src.exceptions import MessagePublishError
+
+
+def make_message(payload: str, event_type: str = "order.processed"):
+    return MagicMock(id=uuid4(), event_type=event_type, payload=payload, retry_count=0)
+
+
+def processed_payload(status: str = "SUCCESS") -> str:
+    return json.dumps({
+        "order_id": str(uuid4()),
+        "status": status,
+        "error_message": None,
+        "processed_at": "2026-01-01T00:00:00",
+    })
+
+
+@pytest.fixture
+def mock_conn():
+    """Мок сессии outbox транзакции."""
+    return AsyncMock()
+
+
+@pytest.fixture
+def mock_db(mock_conn):
+    """Мок Database, отдающий одну и ту же сессию."""
+    @contextlib.asynccontextmanager
+    async def connection():
+        yield mock_conn
+
+    db = MagicMock()
+    db.connection = connection
+    return db
+
+
+@pytest.fixture
+def mock_outbox_repository():
+    """Мок OutboxRepository."""
+    return AsyncMock()
+
+
+@pytest.mark.asyncio
+async def test_publish_batch_marks_result_in_one_commit(mock_db, mock_conn, mock_outbox_repository):
+    """Тест пачки: блокировка, публикация, отметка опубликованных и ошибочных одной транзакцией."""
+    # Arrange
+    published = make_message(processed_payload())
+    broken = make_message("not json")
+    broker_down = make_message(processed_payload("FAILED"))
+    mock_outbox_repository.get_unpublished_messages = AsyncMock(
+        return_value=[published, broken, broker_down]
+    )
+
+    rabbitmq_client = AsyncMock()
+
+    async def publish_order_processed(order_id, status, error_message=None, processed_at=None):
+        if status == "FAILED":
+            raise MessagePublishError(order_id=order_id, message="Connection reset")
+
+    rabbitmq_client.publish_order_processed = AsyncMock(side_effect=publish_order_processed)
+
+    calls = MagicMock()
+    calls.attach_mock(mock_outbox_repository.get_unpublished_messages, "lock")
+    calls.attach_mock(mock_outbox_repository.mark_as_published, "mark_as_published")
+    calls.attach_mock(mock_outbox_repository.increment_retry_count, "increment_retry_count")
+    calls.attach_mock(mock_conn.commit, "commit")
+
+    publisher = OutboxPublisher(mock_db, rabbitmq_client, batch_size=10, max_retries=3)
+
+    # Act
+    with patch(
+        "src.infrastructure.messaging.outbox_publisher.OutboxRepository",
+        return_value=mock_outbox_repository
+    ):
+        fetched = await publisher._publish_batch()
+
+    # Assert
+    assert fetched == 3
+    assert [call[0] for call in calls.mock_calls] == [
+        "lock", "mark_as_published", "increment_retry_count", "commit"
+    ]
+    mock_outbox_repository.get_unpublished_messages.assert_awaited_once_with(limit=10, max_retries=3)
+    mock_outbox_repository.mark_as_published.assert_awaited_once_with([published.id])
+    # Недоступность брокера не тратит попытку: сообщение остается в outbox
+    mock_outbox_repository.increment_retry_count.assert_awaited_once_with([broken.id])
+    assert publisher._next_delay() == 1.0
+
+
+@pytest.mark.asyncio
+async def test_publish_loop_repolls_full_batch_without_pause(mock_db):
+    """Тест опроса: после полной пачки следующая забирается сразу, после неполной - пауза."""
+    # Arrange
+    publisher = OutboxPublisher(mock_db, AsyncMock(), batch_size=2, poll_interval=0.5)
+    publisher._running = True
+    publisher._publish_batch = AsyncMock(side_effect=[2, 2, 1])
+    sleeps = []
+
+    async def sleep(delay):
+        sleeps.append(delay)
+        publisher._running = False
+
+    # Act
+    with patch.object(asyncio, "sleep", side_effect=sleep):
+        await publisher._publish_loop()
+
+    # Assert
+    assert publisher._publish_batch.await_count == 3
+    assert sleeps == [0.5]
+
+
+@pytest.mark.asyncio
+async def test_outbox_repository_locks_only_retryable_messages():
+    """Тест выборки outbox: FOR UPDATE SKIP LOCKED и лимит попыток."""
+    # Arrange
+    session = AsyncMock()
+    session.execute = AsyncMock(return_value=MagicMock())
+    repository = OutboxRepository(session, auto_commit=False)
+
+    # Act
+    await repository.get_unpublished_messages(limit=50, max_retries=3)
+    await repository.mark_as_published([uuid4(), uuid4()])
+
+    # Assert
+    select_sql = str(session.execute.await_args_list[0].args[0].compile(dialect=postgresql.dialect()))
+    update_sql = str(session.execute.await_args_list[1].args[0].compile(dialect=postgresql.dialect()))
+    assert "FOR UPDATE SKIP LOCKED" in select_sql
+    assert "outbox_messages.retry_count <" in select_sql
+    assert "UPDATE outbox_messages SET published" in update_sql
+    session.commit.assert_not_awaited()
+    session.flush.assert_awaited()
@@ -0,0 +1,88 @@
+"""
+Тесты для репозитория обработки заказов.
+"""
+import asyncio
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+from sqlalchemy.dialects import postgresql
+
+from src.entity.processing import ProcessingStatus
+from src.infrastructure.persistence.lease_keeper import LeaseKeeper
+from src.infrastructure.persistence.repositories.processing import ProcessingRepository
+
+
+@pytest.mark.asyncio
+async def test_claim_many_inserts_orders_in_sorted_order():
+    """Тест пакетного захвата: строки вставляются в порядке order_id, дубликаты схлопываются."""
+    # Arrange
+    session = AsyncMock()
+    session.execute = AsyncMock(return_value=MagicMock())
+    repository = ProcessingRepository(session)
+    order_ids = [uuid4() for _ in range(5)]
+
+    # Act
+    await repository.claim_many(order_ids + order_ids[:2])
+
+    # Assert
+    compiled = session.execute.await_args.args[0].compile(dialect=postgresql.dialect())
+    inserted = [
+        value for name, value in compiled.params.items() if name.startswith("order_id_m")
+    ]
+    assert inserted == sorted(order_ids)
+    assert "ON CONFLICT (order_id) DO UPDATE" in str(compiled)
+
+
+@pytest.mark.asyncio
+async def test_finish_is_fenced_by_lease_owner():
+    """Тест завершения: итоговый статус пишется только владельцем аренды, stale владелец - no-op."""
+    # Arrange
+    order_id = uuid4()
+    finished = MagicMock()
+    finished.scalars = MagicMock(return_value=MagicMock(all=MagicMock(return_value=[])))
+    not_owned = MagicMock()
+    not_owned.scalar_one_or_none = MagicMock(return_value=None)
+    session = AsyncMock()
+    session.execute = AsyncMock(side_effect=[finished, not_owned])
+    repository = ProcessingRepository(session, auto_commit=False)
+
+    # Act
+    finished_ids = await repository.bulk_finish(
+        {order_id: (ProcessingStatus.SUCCESS, None)}, owner="host:1"
+    )
+    processing = await repository.update_status(order_id, ProcessingStatus.FAILED, owner="host:1")
+
+    # Assert
+    assert finished_ids == set()
+    assert processing is None
+    update_sql, select_sql = (
+        str(call.args[0].compile(dialect=postgresql.dialect()))
+        for call in session.execute.await_args_list
+    )
+    for sql in (update_sql, select_sql):
+        assert "order_processing.status = %(status_1)s" in sql
+        assert "order_processing.lease_owner = %(lease_owner_1)s" in sql
+    assert "RETURNING order_processing.order_id" in update_sql
+    assert "FOR UPDATE" in select_sql
+    session.refresh.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_lease_heartbeat_survives_connection_errors():
+    """Тест heartbeat: обрыв соединения с БД не останавливает продление аренды."""
+    # Arrange
+    lease_keeper = LeaseKeeper(MagicMock(), heartbeat_interval=0, owner="host:1")
+    lease_keeper.heartbeat = AsyncMock(side_effect=[
+        ConnectionRefusedError("connection refused"),
+        OSError("connection reset by peer"),
+        None,
+        asyncio.CancelledError(),
+    ])
+
+    # Act
+    with pytest.raises(asyncio.CancelledError):
+        await lease_keeper._heartbeat_loop()
+
+    # Assert
+    assert lease_keeper.heartbeat.await_count == 4
@@ -1,18 +1,36 @@
 """
 Тесты для usecase сервиса обработки заказов.
 """
+import asyncio
+import json
+from concurrent.futures.process import BrokenProcessPool
+
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
 from uuid import UUID, uuid4
 from datetime import datetime
 
 from src.usecase.processing.processing_usecase import ProcessingUseCase
+from src.infrastructure.engine.processing_engine import ProcessingEngine
+from src.infrastructure.cache.finished_orders import FinishedOrdersFilter
+from src.usecase.processing.pipeline import ProcessingPipeline, Stage, StageKind
+from src.usecase.processing.stages import price_order
+from src.usecase.processing.simulator import build_simulator
+from src.supervisor import Supervisor
+from src.main import ProcessorService
+from src.settings import settings
 from src.entity.processing import (
     OrderCreatedEvent,
     OrderProcessing,
+    ProcessingClaim,
     ProcessingStatus
 )
-from src.exceptions import ProcessingError, RepositoryError, MessagingError
+from src.exceptions import (
+    ProcessingError,
+    ProcessingInterruptedError,
+    RepositoryError,
+    MessagingError
+)
 
 
 @pytest.fixture
@@ -40,6 +58,7 @@ def mock_repositories(mock_repository):
     """Мок для репозиториев из UOW."""
     repos = MagicMock()
     repos.processing = mock_repository
+    repos.outbox = AsyncMock()
     return repos
 
 
@@ -72,8 +91,9 @@ async def test_process_order_success(
         created_at=datetime.utcnow()
     )
     
-    mock_repository.get_by_order_id = AsyncMock(return_value=None)
-    mock_repository.create_processing = AsyncMock(return_value=processing)
+    mock_repository.claim = AsyncMock(
+        return_value=ProcessingClaim(claimed=True, status=ProcessingStatus.PROCESSING)
+    )
     mock_repository.update_status = AsyncMock(return_value=processing)
     mock_repositories.processing = mock_repository
     
@@ -89,16 +109,19 @@ async def test_process_order_success(
     )
     
     # Мокаем симуляцию обработки для успешного результата
-    with patch.object(usecase, '_simulate_processing', return_value=True):
+    with patch.object(usecase, '_simulate_processing', return_value=(True, None)):
         # Act
         await usecase.process_order(sample_order_created_event)
     
     # Assert
-    mock_repository.create_processing.assert_called_once_with(order_id)
-    mock_rabbitmq_client.publish_order_processed.assert_called_once_with(
-        order_id=sample_order_created_event.order_id,
-        status="SUCCESS"
-    )
+    mock_repository.claim.assert_called_once_with(order_id)
+    mock_repositories.outbox.create_message.assert_called_once()
+    outbox_call = mock_repositories.outbox.create_message.call_args.kwargs
+    assert outbox_call["event_type"] == "order.processed"
+    payload = json.loads(outbox_call["payload"])
+    assert payload["order_id"] == sample_order_created_event.order_id
+    assert payload["status"] == "SUCCESS"
+    mock_rabbitmq_client.publish_order_processed.assert_not_called()
 
 
 @pytest.mark.asyncio
@@ -112,13 +135,9 @@ async def test_process_order_idempotency(
     """Тест идемпотентности обработки заказа - заказ уже обработан."""
     # Arrange
     order_id = UUID(sample_order_created_event.order_id)
-    existing_processing = OrderProcessing(
-        order_id=order_id,
-        status=ProcessingStatus.SUCCESS,
-        created_at=datetime.utcnow()
+    mock_repository.claim = AsyncMock(
+        return_value=ProcessingClaim(claimed=False, status=ProcessingStatus.SUCCESS)
     )
-    
-    mock_repository.get_by_order_id = AsyncMock(return_value=existing_processing)
     mock_repositories.processing = mock_repository
     
     context_manager = AsyncMock()
@@ -136,8 +155,10 @@ async def test_process_order_idempotency(
     await usecase.process_order(sample_order_created_event)
     
     # Assert
-    # Не должно быть попыток создать новую обработку или опубликовать событие
-    mock_repository.create_processing.assert_not_called()
+    # Не должно быть попыток обработать заказ или опубликовать событие
+    mock_repository.claim.assert_called_once_with(order_id)
+    mock_repository.update_status.assert_not_called()
+    mock_repositories.outbox.create_message.assert_not_called()
     mock_rabbitmq_client.publish_order_processed.assert_not_called()
 
 
@@ -158,8 +179,9 @@ async def test_process_order_failure(
         created_at=datetime.utcnow()
     )
     
-    mock_repository.get_by_order_id = AsyncMock(return_value=None)
-    mock_repository.create_processing = AsyncMock(return_value=processing)
+    mock_repository.claim = AsyncMock(
+        return_value=ProcessingClaim(claimed=True, status=ProcessingStatus.PROCESSING)
+    )
     mock_repository.update_status = AsyncMock(return_value=processing)
     mock_repositories.processing = mock_repository
     
@@ -175,7 +197,7 @@ async def test_process_order_failure(
     )
     
     # Мокаем симуляцию обработки для неуспешного результата
-    with patch.object(usecase, '_simulate_processing', return_value=False):
+    with patch.object(usecase, '_simulate_processing', return_value=(False, "Simulated processing failure")):
         # Act
         await usecase.process_order(sample_order_created_event)
     
@@ -186,11 +208,11 @@ async def test_process_order_failure(
                     if call[0][1] == ProcessingStatus.FAILED]
     assert len(failed_calls) > 0
     
-    mock_rabbitmq_client.publish_order_processed.assert_called_once_with(
-        order_id=sample_order_created_event.order_id,
-        status="FAILED",
-        error_message="Simulated processing failure"
-    )
+    mock_repositories.outbox.create_message.assert_called_once()
+    payload = json.loads(mock_repositories.outbox.create_message.call_args.kwargs["payload"])
+    assert payload["order_id"] == sample_order_created_event.order_id
+    assert payload["status"] == "FAILED"
+    assert payload["error_message"] == "Simulated processing failure"
 
 
 @pytest.mark.asyncio
@@ -205,8 +227,7 @@ async def test_process_order_repository_error(
     # Arrange
     order_id = UUID(sample_order_created_event.order_id)
     
-    mock_repository.get_by_order_id = AsyncMock(return_value=None)
-    mock_repository.create_processing = AsyncMock(side_effect=RepositoryError("Database error"))
+    mock_repository.claim = AsyncMock(side_effect=RepositoryError("Database error"))
     mock_repositories.processing = mock_repository
     
     context_manager = AsyncMock()
@@ -225,3 +246,578 @@ async def test_process_order_repository_error(
         await usecase.process_order(sample_order_created_event)
     
     assert "Database error" in str(exc_info.value)
+
+
+@pytest.mark.asyncio
+async def test_processing_engine_bounds_concurrency():
+    """Тест ограничения числа одновременно обрабатываемых заказов."""
+    # Arrange
+    in_flight = 0
+    max_in_flight = 0
+
+    async def handler(message: dict) -> None:
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        if message["fail"]:
+            raise ProcessingError(order_id=message["order_id"])
+
+    engine = ProcessingEngine(handler, concurrency=3, queue_size=2, stats_interval=0)
+    await engine.start()
+
+    # Act
+    results = await asyncio.gather(
+        *(engine.submit({"order_id": i, "fail": i == 0}) for i in range(10)),
+        return_exceptions=True
+    )
+    await engine.stop()
+
+    # Assert
+    assert max_in_flight == 3
+    assert isinstance(results[0], ProcessingError)
+    assert results[1:] == [None] * 9
+    stats = engine.stats()
+    assert sum(s.processed for s in stats) == 9
+    assert sum(s.failed for s in stats) == 1
+
+
+@pytest.mark.asyncio
+async def test_process_orders_batch(
+    mock_repository,
+    mock_uow,
+    mock_rabbitmq_client,
+    mock_repositories
+):
+    """Тест пакетной обработки: один claim, один UPDATE и одна вставка в outbox."""
+    # Arrange
+    claimed_id, duplicate_id = uuid4(), uuid4()
+    events = [
+        OrderCreatedEvent(
+            order_id=str(order_id),
+            user_id="user_123",
+            products=[],
+            amount=10.0,
+            created_at=datetime.utcnow().isoformat()
+        )
+        for order_id in (claimed_id, duplicate_id, "not-a-uuid")
+    ]
+
+    mock_repository.claim_many = AsyncMock(return_value={claimed_id})
+    mock_repository.bulk_finish = AsyncMock(return_value={claimed_id})
+
+    context_manager = AsyncMock()
+    context_manager.__aenter__ = AsyncMock(return_value=mock_repositories)
+    context_manager.__aexit__ = AsyncMock(return_value=None)
+    mock_uow.init = MagicMock(return_value=context_manager)
+
+    usecase = ProcessingUseCase(
+        repository=mock_repository,
+        uow=mock_uow,
+        rabbitmq_client=mock_rabbitmq_client
+    )
+
+    # Act
+    with patch.object(usecase, '_simulate_processing', return_value=(True, None)):
+        failures = await usecase.process_orders(events)
+
+    # Assert
+    assert list(failures) == ["not-a-uuid"]
+    assert isinstance(failures["not-a-uuid"], ValueError)
+    mock_repository.claim_many.assert_called_once_with([claimed_id, duplicate_id])
+    mock_repository.bulk_finish.assert_called_once_with(
+        {claimed_id: (ProcessingStatus.SUCCESS, None)}, owner=None
+    )
+    outbox_messages = mock_repositories.outbox.create_messages.call_args.args[0]
+    assert len(outbox_messages) == 1
+    assert json.loads(outbox_messages[0][3])["order_id"] == str(claimed_id)
+    mock_repository.update_status.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_process_orders_hands_back_cancelled_orders(
+    mock_repository,
+    mock_uow,
+    mock_rabbitmq_client,
+    mock_repositories
+):
+    """Тест пачки: отмененный заказ (CancelledError) возвращается в PENDING, остальные завершаются."""
+    # Arrange
+    done_id, cancelled_id = uuid4(), uuid4()
+    events = {
+        order_id: OrderCreatedEvent(
+            order_id=str(order_id),
+            user_id="user_123",
+            products=[],
+            amount=10.0,
+            created_at=datetime.utcnow().isoformat()
+        )
+        for order_id in (done_id, cancelled_id)
+    }
+    mock_repository.claim_many = AsyncMock(return_value={done_id, cancelled_id})
+    mock_repository.bulk_finish = AsyncMock(return_value={done_id})
+
+    context_manager = AsyncMock()
+    context_manager.__aenter__ = AsyncMock(return_value=mock_repositories)
+    context_manager.__aexit__ = AsyncMock(return_value=None)
+    mock_uow.init = MagicMock(return_value=context_manager)
+
+    usecase = ProcessingUseCase(
+        repository=mock_repository,
+        uow=mock_uow,
+        rabbitmq_client=mock_rabbitmq_client
+    )
+
+    async def process(event):
+        # Как future пула процессов, отмененный pipeline.shutdown(cancel_futures=True)
+        if event.order_id == str(cancelled_id):
+            raise asyncio.CancelledError()
+        return True, None
+
+    usecase._process = process
+
+    # Act
+    failures = await usecase.process_orders(list(events.values()))
+
+    # Assert
+    assert list(failures) == [str(cancelled_id)]
+    assert isinstance(failures[str(cancelled_id)], ProcessingInterruptedError)
+    mock_repository.release_claims.assert_awaited_once_with([cancelled_id], owner=None)
+    mock_repository.bulk_finish.assert_awaited_once_with(
+        {done_id: (ProcessingStatus.SUCCESS, None)}, owner=None
+    )
+
+
+@pytest.mark.asyncio
+async def test_stale_lease_owner_does_not_publish_result(
+    mock_repository,
+    mock_uow,
+    mock_rabbitmq_client,
+    mock_repositories,
+    sample_order_created_event
+):
+    """Тест fencing: аренду перехватил другой процесс - результат отбрасывается без order.processed."""
+    # Arrange
+    order_id = UUID(sample_order_created_event.order_id)
+    mock_repository.claim = AsyncMock(
+        return_value=ProcessingClaim(claimed=True, status=ProcessingStatus.PROCESSING)
+    )
+    mock_repository.claim_many = AsyncMock(return_value={order_id})
+    mock_repository.update_status = AsyncMock(return_value=None)
+    mock_repository.bulk_finish = AsyncMock(return_value=set())
+
+    context_manager = AsyncMock()
+    context_manager.__aenter__ = AsyncMock(return_value=mock_repositories)
+    context_manager.__aexit__ = AsyncMock(return_value=None)
+    mock_uow.init = MagicMock(return_value=context_manager)
+
+    usecase = ProcessingUseCase(
+        repository=mock_repository,
+        uow=mock_uow,
+        rabbitmq_client=mock_rabbitmq_client,
+        lease_keeper=MagicMock(owner="host:1", lease_seconds=30.0)
+    )
+
+    # Act
+    with patch.object(usecase, '_simulate_processing', return_value=(True, None)):
+        await usecase.process_order(sample_order_created_event)
+        failures = await usecase.process_orders([sample_order_created_event])
+
+    # Assert
+    assert failures == {}
+    mock_repository.update_status.assert_awaited_once_with(
+        order_id, ProcessingStatus.SUCCESS, error_message=None, owner="host:1"
+    )
+    mock_repository.bulk_finish.assert_awaited_once_with(
+        {order_id: (ProcessingStatus.SUCCESS, None)}, owner="host:1"
+    )
+    mock_repositories.outbox.create_message.assert_not_called()
+    mock_repositories.outbox.create_messages.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_process_order_skips_recently_finished(
+    mock_repository,
+    mock_uow,
+    mock_rabbitmq_client,
+    mock_repositories,
+    sample_order_created_event
+):
+    """Тест фильтра завершенных заказов: повторное сообщение не доходит до БД."""
+    # Arrange
+    order_id = UUID(sample_order_created_event.order_id)
+    mock_repository.claim = AsyncMock(
+        return_value=ProcessingClaim(claimed=False, status=ProcessingStatus.SUCCESS)
+    )
+
+    context_manager = AsyncMock()
+    context_manager.__aenter__ = AsyncMock(return_value=mock_repositories)
+    context_manager.__aexit__ = AsyncMock(return_value=None)
+    mock_uow.init = MagicMock(return_value=context_manager)
+
+    finished_filter = FinishedOrdersFilter(maxsize=10)
+    usecase = ProcessingUseCase(
+        repository=mock_repository,
+        uow=mock_uow,
+        rabbitmq_client=mock_rabbitmq_client,
+        finished_filter=finished_filter
+    )
+
+    # Act
+    await usecase.process_order(sample_order_created_event)
+    await usecase.process_order(sample_order_created_event)
+
+    # Assert
+    mock_repository.claim.assert_called_once_with(order_id)
+    assert mock_uow.init.call_count == 1
+    stats = finished_filter.stats()
+    assert (stats.size, stats.hits, stats.misses) == (1, 1, 1)
+
+
+@pytest.mark.asyncio
+async def test_process_order_pipeline_stage_failure(
+    mock_repository,
+    mock_uow,
+    mock_rabbitmq_client,
+    mock_repositories,
+    sample_order_created_event
+):
+    """Тест пайплайна: ошибка стадии завершает заказ статусом FAILED без симуляции."""
+    # Arrange
+    order_id = UUID(sample_order_created_event.order_id)
+    mock_repository.claim = AsyncMock(
+        return_value=ProcessingClaim(claimed=True, status=ProcessingStatus.PROCESSING)
+    )
+
+    context_manager = AsyncMock()
+    context_manager.__aenter__ = AsyncMock(return_value=mock_repositories)
+    context_manager.__aexit__ = AsyncMock(return_value=None)
+    mock_uow.init = MagicMock(return_value=context_manager)
+
+    async def reject(amount: float) -> dict:
+        raise ValueError("amount is too large")
+
+    pipeline = ProcessingPipeline([
+        Stage(name="pricing", func=price_order, kind=StageKind.IO, inputs=("products", "amount")),
+        Stage(name="limits", func=reject, kind=StageKind.IO, inputs=("amount",), concurrency=1),
+    ])
+    usecase = ProcessingUseCase(
+        repository=mock_repository,
+        uow=mock_uow,
+        rabbitmq_client=mock_rabbitmq_client,
+        pipeline=pipeline
+    )
+
+    # Act
+    with patch.object(usecase, '_simulate_processing', return_value=(True, None)) as simulate:
+        await usecase.process_order(sample_order_created_event)
+
+    # Assert
+    simulate.assert_not_called()
+    mock_repository.update_status.assert_called_once_with(
+        order_id,
+        ProcessingStatus.FAILED,
+        error_message="limits: amount is too large",
+        owner=None
+    )
+    stats = {stage.name: stage for stage in pipeline.stats()}
+    assert (stats["pricing"].calls, stats["pricing"].failures) == (1, 0)
+    assert (stats["limits"].calls, stats["limits"].failures) == (1, 1)
+
+
+@pytest.mark.asyncio
+async def test_broken_process_pool_hands_orders_back(
+    mock_repository,
+    mock_uow,
+    mock_rabbitmq_client,
+    mock_repositories,
+    sample_order_created_event
+):
+    """Тест падения пула процессов: заказ возвращается в PENDING, а не FAILED, и уходит в retry."""
+    # Arrange
+    order_id = UUID(sample_order_created_event.order_id)
+    mock_repository.claim = AsyncMock(
+        return_value=ProcessingClaim(claimed=True, status=ProcessingStatus.PROCESSING)
+    )
+    mock_repository.claim_many = AsyncMock(return_value={order_id})
+
+    context_manager = AsyncMock()
+    context_manager.__aenter__ = AsyncMock(return_value=mock_repositories)
+    context_manager.__aexit__ = AsyncMock(return_value=None)
+    mock_uow.init = MagicMock(return_value=context_manager)
+
+    def crash(amount: float) -> dict:
+        raise BrokenProcessPool("A process in the process pool was terminated abruptly")
+
+    pipeline = ProcessingPipeline([
+        Stage(name="fraud_score", func=crash, kind=StageKind.IO, inputs=("amount",)),
+    ])
+    usecase = ProcessingUseCase(
+        repository=mock_repository,
+        uow=mock_uow,
+        rabbitmq_client=mock_rabbitmq_client,
+        pipeline=pipeline
+    )
+
+    # Act
+    with pytest.raises(ProcessingError):
+        await usecase.process_order(sample_order_created_event)
+    failures = await usecase.process_orders([sample_order_created_event])
+
+    # Assert
+    assert mock_repository.release_claims.await_count == 2
+    mock_repository.release_claims.assert_awaited_with([order_id], owner=None)
+    assert isinstance(failures[sample_order_created_event.order_id], ProcessingError)
+    mock_repository.update_status.assert_not_called()
+    mock_repository.bulk_finish.assert_not_called()
+    mock_repositories.outbox.create_message.assert_not_called()
+    mock_repositories.outbox.create_messages.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_recover_expired_orders(
+    mock_repository,
+    mock_uow,
+    mock_rabbitmq_client,
+    mock_repositories,
+    sample_order_created_event
+):
+    """Тест перехвата заказа с истекшей арендой: обработка по сохраненному событию."""
+    # Arrange
+    order_id = UUID(sample_order_created_event.order_id)
+    payload = json.dumps({
+        "order_id": sample_order_created_event.order_id,
+        "user_id": sample_order_created_event.user_id,
+        "products": sample_order_created_event.products,
+        "amount": sample_order_created_event.amount,
+        "created_at": sample_order_created_event.created_at,
+    })
+    # Битый payload не мешает перехвату остальных заказов пачки
+    mock_repository.reclaim_expired = AsyncMock(return_value=[(uuid4(), "not json"), (order_id, payload)])
+    mock_repository.update_status = AsyncMock()
+
+    context_manager = AsyncMock()
+    context_manager.__aenter__ = AsyncMock(return_value=mock_repositories)
+    context_manager.__aexit__ = AsyncMock(return_value=None)
+    mock_uow.init = MagicMock(return_value=context_manager)
+
+    lease_keeper = MagicMock(owner="host:1", lease_seconds=30.0)
+    usecase = ProcessingUseCase(
+        repository=mock_repository,
+        uow=mock_uow,
+        rabbitmq_client=mock_rabbitmq_client,
+        lease_keeper=lease_keeper
+    )
+
+    # Act
+    with patch.object(usecase, '_simulate_processing', return_value=(True, None)):
+        recovered = await usecase.recover_expired_orders(limit=5)
+
+    # Assert
+    assert recovered == 2
+    mock_repository.reclaim_expired.assert_called_once_with(
+        owner="host:1", lease_seconds=30.0, limit=5
+    )
+    mock_repository.update_status.assert_called_once_with(
+        order_id, ProcessingStatus.SUCCESS, error_message=None, owner="host:1"
+    )
+    lease_keeper.track.assert_called_once_with(order_id)
+    lease_keeper.release.assert_called_once_with(order_id)
+
+
+@pytest.mark.asyncio
+async def test_sweep_loop_survives_unexpected_errors():
+    """Тест фонового перехвата аренд: неожиданная ошибка не останавливает цикл."""
+    # Arrange
+    processing_usecase = AsyncMock()
+    processing_usecase.recover_expired_orders = AsyncMock(
+        side_effect=[KeyError("order_id"), 0, asyncio.CancelledError()]
+    )
+    service = ProcessorService(MagicMock())
+
+    # Act
+    with patch.object(settings, "PROCESSING_LEASE_SWEEP_INTERVAL_SECONDS", 0):
+        with pytest.raises(asyncio.CancelledError):
+            await service._sweep_expired_leases_loop(processing_usecase)
+
+    # Assert
+    assert processing_usecase.recover_expired_orders.await_count == 3
+
+
+@pytest.mark.asyncio
+async def test_drain_stops_sweeper_before_waiting_for_orders():
+    """Тест плавной остановки: sweeper останавливается до drain и не берет новую работу."""
+    # Arrange
+    container = MagicMock()
+    container.infrastructure.rabbitmq_client.return_value = AsyncMock()
+    service = ProcessorService(container)
+    service.stop = AsyncMock()
+    sweep_task = asyncio.create_task(asyncio.sleep(3600))
+    sweeper_stopped_before_drain = []
+
+    async def drain(timeout):
+        sweeper_stopped_before_drain.append(sweep_task.done())
+        return True
+
+    engine = MagicMock()
+    engine.drain = AsyncMock(side_effect=drain)
+
+    # Act
+    await service._drain(engine, sweep_task)
+
+    # Assert
+    assert sweeper_stopped_before_drain == [True]
+    assert sweep_task.cancelled()
+    container.infrastructure.rabbitmq_client().stop_consuming.assert_awaited_once()
+    service.stop.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_no_order_processed_twice_across_restart(
+    mock_repository,
+    mock_uow,
+    mock_rabbitmq_client,
+    mock_repositories
+):
+    """Тест плавной остановки: прерванные заказы доводит новый процесс, завершенные не повторяются."""
+    # Arrange
+    statuses: dict[UUID, ProcessingStatus] = {}
+    finished: dict[UUID, int] = {}
+
+    async def claim(order_id, **kwargs):
+        status = statuses.get(order_id, ProcessingStatus.PENDING)
+        if status != ProcessingStatus.PENDING:
+            return ProcessingClaim(claimed=False, status=status)
+        statuses[order_id] = ProcessingStatus.PROCESSING
+        return ProcessingClaim(claimed=True, status=ProcessingStatus.PROCESSING)
+
+    async def update_status(order_id, status, error_message=None, owner=None):
+        # Итоговый статус пишется только поверх PROCESSING, как в репозитории
+        if statuses.get(order_id) != ProcessingStatus.PROCESSING:
+            return None
+        statuses[order_id] = status
+        finished[order_id] = finished.get(order_id, 0) + 1
+        return MagicMock()
+
+    async def release_claims(order_ids, owner=None):
+        for order_id in order_ids:
+            if statuses.get(order_id) == ProcessingStatus.PROCESSING:
+                statuses[order_id] = ProcessingStatus.PENDING
+
+    mock_repository.claim = AsyncMock(side_effect=claim)
+    mock_repository.update_status = AsyncMock(side_effect=update_status)
+    mock_repository.release_claims = AsyncMock(side_effect=release_claims)
+
+    context_manager = AsyncMock()
+    context_manager.__aenter__ = AsyncMock(return_value=mock_repositories)
+    context_manager.__aexit__ = AsyncMock(return_value=None)
+    mock_uow.init = MagicMock(return_value=context_manager)
+
+    async def process(event):
+        await asyncio.sleep(0.05)
+        return True, None
+
+    events = [
+        OrderCreatedEvent(
+            order_id=str(uuid4()),
+            user_id="user_123",
+            products=[],
+            amount=10.0,
+            created_at=datetime.utcnow().isoformat()
+        )
+        for _ in range(6)
+    ]
+
+    async def run_process(events_to_deliver, drain_after=None):
+        usecase = ProcessingUseCase(
+            repository=mock_repository,
+            uow=mock_uow,
+            rabbitmq_client=mock_rabbitmq_client
+        )
+        usecase._process = process
+        engine = ProcessingEngine(usecase.process_order, concurrency=2, queue_size=4, stats_interval=0)
+        await engine.start()
+
+        requeued = []
+
+        async def deliver(event):
+            # Как message_handler RabbitMQ клиента: прерванное сообщение - nack(requeue=True)
+            try:
+                await engine.submit(event)
+            except ProcessingInterruptedError:
+                requeued.append(event)
+
+        deliveries = asyncio.gather(*(deliver(event) for event in events_to_deliver))
+        if drain_after is None:
+            await deliveries
+            await engine.stop()
+        else:
+            await asyncio.sleep(drain_after)
+            await engine.drain(timeout=0.01)
+            await deliveries
+        return requeued
+
+    # Act: остановка посреди обработки, затем новый процесс получает возвращенные сообщения
+    requeued = await run_process(events, drain_after=0.02)
+    await run_process(requeued)
+
+    # Assert
+    assert len(requeued) == 6
+    assert all(status == ProcessingStatus.SUCCESS for status in statuses.values())
+    assert finished == {UUID(event.order_id): 1 for event in events}
+    assert mock_repositories.outbox.create_message.await_count == 6
+    assert mock_repository.release_claims.await_count == 2
+
+
+def test_supervisor_aggregates_metrics_across_restarts():
+    """Тест агрегации метрик воркеров: счетчики перезапущенного воркера не теряются."""
+    # Arrange
+    supervisor = Supervisor(workers=2, backoff_seconds=1.0, backoff_max_seconds=8.0)
+
+    # Act: воркер с pid 101 упал и был перезапущен как pid 103
+    supervisor._record(101, {"processed": 5, "failed": 1})
+    supervisor._record(102, {"processed": 7, "failed": 0})
+    supervisor._record(101, {"processed": 6, "failed": 1})
+    supervisor._record(103, {"processed": 2, "failed": 2, "stage.pricing.calls": 4})
+
+    # Assert
+    assert supervisor.aggregate() == {"processed": 15, "failed": 3, "stage.pricing.calls": 4}
+    assert [supervisor.restart_delay(n) for n in range(1, 6)] == [1.0, 2.0, 4.0, 8.0, 8.0]
+
+
+@pytest.mark.asyncio
+async def test_seeded_simulator_is_reproducible(
+    mock_repository,
+    mock_uow,
+    mock_rabbitmq_client,
+    sample_order_created_event
+):
+    """Тест симулятора с seed: исход заказа не зависит от порядка обработки, ошибки типизированы."""
+    # Arrange
+    order_ids = [str(uuid4()) for _ in range(200)]
+
+    def simulator():
+        return build_simulator(
+            latency="lognormal:0.001,0.5",
+            failures="payment_declined:0.2,out_of_stock:0.1",
+            seed="capacity-test"
+        )
+
+    usecase = ProcessingUseCase(
+        repository=mock_repository,
+        uow=mock_uow,
+        rabbitmq_client=mock_rabbitmq_client,
+        simulator=build_simulator(latency="fixed:0", failures="payment_declined:1", seed="1")
+    )
+
+    # Act
+    first = [simulator().outcome(order_id) for order_id in order_ids]
+    second = {order_id: simulator().outcome(order_id) for order_id in reversed(order_ids)}
+    result = await usecase._process(sample_order_created_event)
+
+    # Assert
+    assert first == [second[order_id] for order_id in order_ids]
+    error_types = {outcome.error_type for outcome in first}
+    assert error_types == {None, "payment_declined", "out_of_stock"}
+    assert result == (False, "Simulated payment_declined failure")
@@ -0,0 +1,63 @@
+"""
+Тесты для RabbitMQ клиента сервиса обработки заказов.
+"""
+import json
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from src.infrastructure.messaging.rabbitmq_client import RabbitMQClient
+from src.exceptions import ProcessingInterruptedError
+
+
+def make_message(body: bytes):
+    message = MagicMock()
+    message.body = body
+    message.headers = {}
+    message.ack = AsyncMock()
+    message.nack = AsyncMock()
+    return message
+
+
+@pytest.mark.asyncio
+async def test_order_created_batch_unexpected_error_retries_messages():
+    """Тест пачки order.created: не-объект уходит в DLQ, неожиданная ошибка - в retry, ничего не зависает."""
+    # Arrange
+    client = RabbitMQClient()
+    client._publish_to_dlq = AsyncMock()
+    client._retry_or_dead_letter = AsyncMock()
+
+    not_an_object = make_message(b'"order"')
+    first = make_message(json.dumps({"order_id": "1"}).encode())
+    second = make_message(json.dumps({"order_id": "2"}).encode())
+    callback = AsyncMock(side_effect=AttributeError("'str' object has no attribute 'get'"))
+
+    # Act
+    await client._handle_order_created_batch([not_an_object, first, second], callback)
+
+    # Assert
+    not_an_object.ack.assert_awaited_once()
+    client._publish_to_dlq.assert_awaited_once()
+    callback.assert_awaited_once_with([{"order_id": "1"}, {"order_id": "2"}])
+    retried = [call.args[0] for call in client._retry_or_dead_letter.await_args_list]
+    assert retried == [first, second]
+
+
+@pytest.mark.asyncio
+async def test_order_created_batch_requeues_interrupted_orders():
+    """Тест пачки order.created: прерванный заказ возвращается в очередь без траты попытки."""
+    # Arrange
+    client = RabbitMQClient()
+    client._retry_or_dead_letter = AsyncMock()
+
+    done = make_message(json.dumps({"order_id": "1"}).encode())
+    interrupted = make_message(json.dumps({"order_id": "2"}).encode())
+    callback = AsyncMock(return_value={"2": ProcessingInterruptedError("Order processing was cancelled")})
+
+    # Act
+    await client._handle_order_created_batch([done, interrupted], callback)
+
+    # Assert
+    done.ack.assert_awaited_once()
+    interrupted.nack.assert_awaited_once_with(requeue=True)
+    client._retry_or_dead_letter.assert_not_awaited()